@@ -0,0 +1,55 @@
+import argparse
+import logging
+import time
+from modules.database import DB
+from src.main import Usuario, Perfil, Categoria, Produto, Tag
+
+DESCRICAO = "Carga de benchmark"
+
+
+def make_produtos(n):
+    return [
+        Produto(nome=f"Produto {i}", preco=float(i % 1000) + 0.9, descricao=DESCRICAO)
+        for i in range(n)
+    ]
+
+
+def save_loop(objs):
+    for obj in objs:
+        obj.save()
+
+
+def cleanup():
+    DB.execute_query(f"DELETE FROM {Produto.__tablename__} WHERE descricao = %s", (DESCRICAO,))
+
+
+def run(label, insert, n):
+    objs = make_produtos(n)
+    started = time.perf_counter()
+    insert(objs)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<24} {n:>8} linhas {elapsed:9.3f}s {n / elapsed:12.0f} linhas/s")
+    cleanup()
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara save() em loop com bulk_create")
+    parser.add_argument("-n", type=int, default=10000, help="quantidade de produtos")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    for name in ("DB", "DatabaseConnection", "BaseModel"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    DB.create_tables([Usuario, Perfil, Categoria, Tag, Produto])
+    cleanup()
+
+    baseline = run("save() em loop", save_loop, args.n)
+    for method in ("values", "copy"):
+        elapsed = run(
+            f"bulk_create({method})",
+            lambda objs: Produto.bulk_create(objs, batch_size=args.batch_size, method=method),
+            args.n,
+        )
+        print(f"{'':<24} {baseline / elapsed:.1f}x mais rápido que save()")
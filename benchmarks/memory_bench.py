@@ -0,0 +1,67 @@
+import argparse
+import gc
+import logging
+import time
+import tracemalloc
+from src.main import Produto
+
+
+class DictProduto:
+    """Layout antigo: cada coluna e cache de relação vira chave do __dict__."""
+
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+def make_row(i):
+    return {
+        "id": i,
+        "nome": f"Produto {i}",
+        "preco": float(i % 1000) + 0.9,
+        "descricao": "Carga de benchmark",
+        "categoria_id": i % 50,
+    }
+
+
+def build_dict(row):
+    instance = DictProduto(**row)
+    instance._loaded_values = {key: value for key, value in row.items() if key != "id"}
+    instance._categoria_cache = None
+    return instance
+
+
+def build_model(row):
+    instance = Produto.from_db_row(row)
+    instance._categoria_cache = None
+    return instance
+
+
+def measure(label, build, rows):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    instances = [build(row) for row in rows]
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # O próprio list e as linhas de entrada não contam por instância
+    per_instance = (size - len(instances) * 8) / len(instances)
+    print(f"{label:<24} {per_instance:10.0f} bytes/instância {len(rows) / elapsed:12.0f} instâncias/s")
+    del instances
+    return per_instance
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede o custo de memória por instância de modelo")
+    parser.add_argument("-n", type=int, default=100000, help="quantidade de instâncias")
+    args = parser.parse_args()
+
+    for name in ("DB", "DatabaseConnection", "BaseModel"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    rows = [make_row(i) for i in range(args.n)]
+    before = measure("__dict__ (antes)", build_dict, rows)
+    after = measure("__slots__ (Produto)", build_model, rows)
+    print(f"{'':<24} {before / after:.1f}x menos memória por instância")
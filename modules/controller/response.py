@@ -1,6 +1,17 @@
 import json
+from datetime import date
 from typing import Type, List, Optional, Any, Dict, Tuple
 
+
+def _json_default(value):
+    """Serializa modelos, páginas e datas que o json não conhece."""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Objeto do tipo {type(value).__name__} não é serializável em JSON")
+
+
 class Response:
     """Representa uma resposta HTTP."""
     def __init__(self, status: str = "200 OK", body: str = "", 
@@ -22,11 +33,15 @@ class Response:
     @classmethod
     def json(cls, data: Any, status: str = "200 OK"):
         """Cria uma resposta JSON."""
-        return cls(
+        response = cls(
             status=status,
-            body=json.dumps(data),
+            body=json.dumps(data, default=_json_default),
             content_type="application/json"
         )
+        next_cursor = getattr(data, "next_cursor", None)
+        if next_cursor is not None:
+            response.add_header("X-Next-Cursor", next_cursor)
+        return response
         
     @classmethod
     def html(cls, content: str, status: str = "200 OK"):
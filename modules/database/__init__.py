@@ -1,5 +1,9 @@
 from modules.database.fields import Field, StringField, IntegerField, FloatField, BooleanField, DateField
 from modules.database.relationships import OneToOneField, ForeignKey, ManyToManyField
 from modules.database.base_model import BaseModel
-from modules.database.db import DB
+from modules.database.db import DB, atomic
 from modules.database.abstract.model_register import ModelRegistry
+from modules.database.queryset import QuerySet
+from modules.database.async_db import AsyncDB
+from modules.database.aggregates import Count, Sum, Avg, Min, Max
+from modules.database.indexes import Index
@@ -1,46 +1,135 @@
+from abc import ABC
+from modules.utils.logger import Logger
+
+# Chave do pg_advisory_lock que serializa migrações concorrentes (deploys em paralelo)
+MIGRATION_LOCK_KEY = 7_340_118_526
+
+
 class Migration(ABC):
-    @abstractmethod
+    """Migração; por padrão executa a lista de operations."""
+
+    operations = []
+
+    @property
+    def atomic(self):
+        return all(operation.atomic for operation in self.operations)
+
     def up(self, connection):
-        pass
-    
-    @abstractmethod
+        for operation in self.operations:
+            operation.forwards(connection)
+
     def down(self, connection):
-        pass
+        for operation in reversed(self.operations):
+            operation.backwards(connection)
+
 
 class MigrationManager:
-    def __init__(self, connection):
+    def __init__(self, connection=None):
+        if connection is None:
+            from modules.database.db import DB
+
+            connection = DB.get_connection()
         self.connection = connection
-        self._ensure_migrations_table()
-    
-    def _ensure_migrations_table(self):
-        query = """
+        self._logger = Logger("MigrationManager")
+
+    def _ensure_migrations_table(self, cursor):
+        cursor.execute("""
             CREATE TABLE IF NOT EXISTS migrations (
                 id SERIAL PRIMARY KEY,
                 name VARCHAR(255) UNIQUE,
                 applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """
-        self.connection.execute(query)
-    
+            );
+            ALTER TABLE migrations ADD COLUMN IF NOT EXISTS checkpoint BIGINT
+        """)
+
+    def _load_applied(self, conn):
+        with conn.cursor() as cursor:
+            self._ensure_migrations_table(cursor)
+            # Linhas sem applied_at são checkpoints de backfills em andamento
+            cursor.execute("SELECT name FROM migrations WHERE applied_at IS NOT NULL")
+            applied = {row[0] for row in cursor.fetchall()}
+        conn.commit()
+        return applied
+
     def get_applied_migrations(self):
-        query = "SELECT name FROM migrations"
-        results = self.connection.execute(query)
-        return [row["name"] for row in results]
-    
+        with self.connection.connection() as conn:
+            return self._load_applied(conn)
+
+    def _lock(self, conn, function):
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT {function}(%s)", (MIGRATION_LOCK_KEY,))
+        conn.commit()
+
+    def _run_locked(self, work):
+        with self.connection.connection() as conn:
+            # Lock de sessão: continua valendo entre as transações da migração
+            self._lock(conn, "pg_advisory_lock")
+            try:
+                return work(conn, self._load_applied(conn))
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.autocommit = False
+                self._lock(conn, "pg_advisory_unlock")
+
+    def _apply_batch(self, conn, batch):
+        if not batch:
+            return []
+        names = [name for name, _ in batch]
+        self._logger.info(f"Aplicando migrações {', '.join(names)}")
+        for _, migration in batch:
+            migration.up(conn)
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO migrations (name) SELECT unnest(%s::text[])", (names,))
+        conn.commit()
+        return names
+
+    def _apply_non_atomic(self, conn, name, migration):
+        # CREATE INDEX CONCURRENTLY e backfills em lotes não rodam dentro de transação
+        self._logger.info(f"Aplicando migração {name} fora de transação")
+        conn.autocommit = True
+        try:
+            migration.up(conn)
+            with conn.cursor() as cursor:
+                cursor.execute("INSERT INTO migrations (name) VALUES (%s)", (name,))
+        finally:
+            conn.autocommit = False
+        return [name]
+
+    def migrate(self, migrations):
+        """Aplica as migrações pendentes de uma lista ordenada de (nome, migração)."""
+
+        def work(conn, applied):
+            done = []
+            batch = []
+            for name, migration in migrations:
+                if name in applied:
+                    continue
+                if migration.atomic:
+                    batch.append((name, migration))
+                    continue
+                done += self._apply_batch(conn, batch)
+                batch = []
+                done += self._apply_non_atomic(conn, name, migration)
+            done += self._apply_batch(conn, batch)
+            return done
+
+        return self._run_locked(work)
+
     def apply_migration(self, migration, name):
-        if name in self.get_applied_migrations():
-            return False
-        
-        migration.up(self.connection)
-        query = "INSERT INTO migrations (name) VALUES (%s)"
-        self.connection.execute(query, (name,))
-        return True
-    
+        return bool(self.migrate([(name, migration)]))
+
     def revert_migration(self, migration, name):
-        if name not in self.get_applied_migrations():
-            return False
-        
-        migration.down(self.connection)
-        query = "DELETE FROM migrations WHERE name = %s"
-        self.connection.execute(query, (name,))
-        return True
\ No newline at end of file
+        def work(conn, applied):
+            if name not in applied:
+                return False
+            self._logger.info(f"Revertendo migração {name}")
+            conn.autocommit = not migration.atomic
+            migration.down(conn)
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM migrations WHERE name = %s", (name,))
+            conn.commit()
+            return True
+
+        return self._run_locked(work)
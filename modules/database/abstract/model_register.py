@@ -11,4 +11,17 @@ class ModelRegistry:
     
     @classmethod
     def get_all_models(cls):
-        return list(cls._models.values())
\ No newline at end of file
+        return list(cls._models.values())
+    
+    @classmethod
+    def check(cls, models=None):
+        """Resolve as relações dos modelos e devolve as referências não resolvidas."""
+        from modules.database.relationships import AbstractRelationship
+
+        errors = []
+        # Resolver um ManyToMany pode registrar o modelo intermediário
+        for model in list(cls._models.values() if models is None else models):
+            for field in model._fields.values():
+                if isinstance(field, AbstractRelationship):
+                    errors.extend(field.resolve())
+        return errors
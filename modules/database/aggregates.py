@@ -0,0 +1,69 @@
+from psycopg2 import sql
+
+
+class Aggregate:
+    """Função de agregação calculada no PostgreSQL."""
+
+    function = None
+
+    def __init__(self, field="*", distinct=False):
+        self.field = field
+        self.distinct = distinct
+
+    @property
+    def default_alias(self):
+        if self.field == "*":
+            return self.function.lower()
+        return f"{self.field}__{self.function.lower()}"
+
+    def as_sql(self, builder, table=None):
+        if self.field == "*":
+            argument = sql.SQL("*")
+        elif table is not None and builder._has_annotation(self.field):
+            argument = sql.Identifier(table, self.field)
+        else:
+            column = "id" if self.field == "id" else builder._resolve_column(self.field)[0]
+            argument = sql.Identifier(table or builder._table_name, column)
+        template = "{}(DISTINCT {})" if self.distinct else "{}({})"
+        return sql.SQL(template).format(sql.SQL(self.function), argument)
+
+    def empty_result(self):
+        return None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.field!r})"
+
+
+class Count(Aggregate):
+    function = "COUNT"
+
+    def empty_result(self):
+        return 0
+
+
+class Sum(Aggregate):
+    function = "SUM"
+
+    def __init__(self, field, distinct=False):
+        super().__init__(field, distinct)
+
+
+class Avg(Aggregate):
+    function = "AVG"
+
+    def __init__(self, field, distinct=False):
+        super().__init__(field, distinct)
+
+
+class Min(Aggregate):
+    function = "MIN"
+
+    def __init__(self, field):
+        super().__init__(field)
+
+
+class Max(Aggregate):
+    function = "MAX"
+
+    def __init__(self, field):
+        super().__init__(field)
@@ -0,0 +1,125 @@
+import uuid
+from contextlib import asynccontextmanager
+from psycopg2 import sql as pg2_sql
+from modules.utils.logger import Logger
+from modules.database.connection import DatabaseError
+from modules.database.pool import PoolTimeoutError
+
+try:
+    import psycopg
+    from psycopg import sql as pg3_sql
+    from psycopg.conninfo import make_conninfo
+    from psycopg.rows import dict_row, tuple_row
+    from psycopg_pool import AsyncConnectionPool, PoolTimeout
+except ImportError:
+    psycopg = None
+
+
+def to_async_sql(query):
+    """Converte um Composable do psycopg2 no equivalente do psycopg 3."""
+    if isinstance(query, str):
+        return query
+    if isinstance(query, pg2_sql.Composed):
+        return pg3_sql.Composed([to_async_sql(part) for part in query.seq])
+    if isinstance(query, pg2_sql.Identifier):
+        return pg3_sql.Identifier(*query.strings)
+    if isinstance(query, pg2_sql.Literal):
+        return pg3_sql.Literal(query.wrapped)
+    if isinstance(query, pg2_sql.Placeholder):
+        return pg3_sql.Placeholder(query.name)
+    if isinstance(query, pg2_sql.SQL):
+        return pg3_sql.SQL(query.string)
+    raise TypeError(f"Tipo de SQL não suportado: {type(query).__name__}")
+
+
+class AsyncDB:
+    """Contraparte assíncrona do DB, com pool próprio sobre o psycopg 3."""
+
+    _pool = None
+    _logger = Logger("AsyncDB")
+
+    @classmethod
+    async def connect(cls, host="localhost", database="teste", user="admin", password="admin",
+                      min_size=1, max_size=10, timeout=30.0, max_idle=300.0, prepare_threshold=5):
+        if psycopg is None:
+            raise ImportError("AsyncDB requer os pacotes psycopg e psycopg_pool (pip install 'psycopg[binary]' psycopg_pool)")
+        if cls._pool is not None:
+            return cls._pool
+
+        cls._logger.info(f"Conectando (async) ao banco de dados {database} em {host}")
+        pool = AsyncConnectionPool(
+            make_conninfo(dbname=database, user=user, password=password, host=host, keepalives=1),
+            min_size=min_size,
+            max_size=max_size,
+            timeout=timeout,
+            max_idle=max_idle,
+            kwargs={"prepare_threshold": prepare_threshold},
+            open=False,
+        )
+        await pool.open()
+        cls._pool = pool
+        return pool
+
+    @classmethod
+    @asynccontextmanager
+    async def connection(cls):
+        if cls._pool is None:
+            raise DatabaseError("AsyncDB não está conectado; chame await AsyncDB.connect()")
+        try:
+            async with cls._pool.connection() as conn:
+                yield conn
+        except PoolTimeout as e:
+            raise PoolTimeoutError(str(e)) from e
+
+    @classmethod
+    def pool_stats(cls):
+        if cls._pool is None:
+            return None
+        return cls._pool.get_stats()
+
+    @classmethod
+    async def execute_query(cls, query, params=None, as_dicts=True):
+        cls._logger.debug(f"Executando query (async): {query} com parâmetros: {params}")
+        async with cls.connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row if as_dicts else tuple_row) as cursor:
+                    await cursor.execute(to_async_sql(query), params or None)
+                    if cursor.description is not None:
+                        results = await cursor.fetchall()
+                        if not (isinstance(query, str) and query.strip().upper().startswith("SELECT")):
+                            await conn.commit()
+                        return results
+                    await conn.commit()
+                    return cursor.rowcount
+            except psycopg.Error as e:
+                await conn.rollback()
+                raise DatabaseError(str(e)) from e
+
+    @classmethod
+    async def iterate_query(cls, query, params=None, batch_size=2000, as_dicts=True):
+        async with cls.connection() as conn:
+            try:
+                row_factory = dict_row if as_dicts else tuple_row
+                async with conn.cursor(name=f"stream_{uuid.uuid4().hex}", row_factory=row_factory) as cursor:
+                    cursor.itersize = batch_size
+                    await cursor.execute(to_async_sql(query), params or None)
+                    while True:
+                        rows = await cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        yield rows
+            finally:
+                await conn.rollback()
+
+    @classmethod
+    def batch(cls):
+        """Agrupa leituras em pipeline: async with AsyncDB.batch() as batch: ..."""
+        from modules.database.batch import AsyncBatch
+
+        return AsyncBatch()
+
+    @classmethod
+    async def close(cls):
+        if cls._pool is not None:
+            await cls._pool.close()
+            cls._pool = None
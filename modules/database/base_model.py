@@ -1,5 +1,18 @@
+import io
+from functools import partial
 from modules.utils.logger import Logger
 from modules.database.abstract.model_register import ModelRegistry
+from modules.database.identity_map import current_identity_map
+
+
+_MISSING = object()
+
+
+def _copy_value(value):
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
 
 class ModelMeta(type):
     def __new__(cls, name, bases, attrs):
@@ -13,6 +26,13 @@ class ModelMeta(type):
             if "__tablename__" not in attrs:
                 attrs["__tablename__"] = name.lower()
 
+            if "__slots__" not in attrs:
+                attrs["__slots__"] = cls._build_slots(fields, bases)
+                # Colunas simples viram slots; a definição do campo fica em _fields
+                for key, value in fields.items():
+                    if not hasattr(value, 'contribute_to_class'):
+                        del attrs[key]
+
         new_class = super().__new__(cls, name, bases, attrs)
 
         if name != "BaseModel":
@@ -23,85 +43,259 @@ class ModelMeta(type):
                 if hasattr(value, 'contribute_to_class'):
                     value.contribute_to_class(new_class, key)
 
+            new_class._column_plan = cls._build_column_plan(fields)
+            new_class._compile_statements()
+            new_class._configure_cache()
+
         return new_class
 
+    @staticmethod
+    def _build_slots(fields, bases):
+        from modules.database.relationships import OneToOneField, ForeignKey, ManyToManyField
+
+        inherited = set()
+        for base in bases:
+            for klass in base.__mro__:
+                slots = getattr(klass, "__slots__", ())
+                inherited.update([slots] if isinstance(slots, str) else slots)
+
+        slots = ["id", "_loaded_values"]
+        for key, field in fields.items():
+            if isinstance(field, ManyToManyField):
+                slots.append(f"_{key}_prefetch")
+            elif isinstance(field, (OneToOneField, ForeignKey)):
+                slots.extend([f"{key}_id", f"_{key}_cache"])
+            else:
+                slots.append(key)
+        return tuple(slot for slot in dict.fromkeys(slots) if slot not in inherited)
+
+    @staticmethod
+    def _build_column_plan(fields):
+        from modules.database.relationships import Relationship, OneToOneField, ForeignKey
+
+        plan = []
+        for key, field in fields.items():
+            if isinstance(field, (OneToOneField, ForeignKey)):
+                plan.append((f"{key}_id", f"_{key}_cache"))
+            elif not isinstance(field, Relationship):
+                plan.append((key, None))
+        return plan
+
 class BaseModel(metaclass=ModelMeta):
+    # __dict__ só é alocado se algo fora das colunas for atribuído à instância
+    __slots__ = ("__dict__", "__weakref__")
+
     _logger = Logger("BaseModel")
+    _model_cache = None
 
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
             setattr(self, key, value)
 
+    def __getattr__(self, name):
+        # Slots de colunas ainda não atribuídas se comportam como None
+        if not name.startswith("_") and name in self._fields and name != "id":
+            return None
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    @classmethod
+    def from_db_row(cls, row):
+        identity_map = current_identity_map()
+        if identity_map is not None and row.get("id") is not None:
+            instance = identity_map.get(cls, row["id"])
+            if instance is not None:
+                return instance
+            # Linhas de only()/defer() não entram no mapa: as colunas ausentes leriam None
+            if any(column not in row for column, _ in cls._column_plan):
+                identity_map = None
+
+        # Caminho rápido: as linhas do banco só trazem colunas, então não
+        # é preciso passar pelo __init__ nem pelos descritores de relação
+        instance = cls.__new__(cls)
+        for key, value in row.items():
+            setattr(instance, key, value)
+        instance._loaded_values = tuple(
+            row.get(column, None if cache_name is None else _MISSING)
+            for column, cache_name in cls._column_plan
+        )
+        if identity_map is not None:
+            identity_map.add(instance)
+        return instance
+
+    @classmethod
+    def _from_identity_map(cls, id):
+        identity_map = current_identity_map()
+        if identity_map is None or id is None:
+            return None
+        return identity_map.get(cls, id)
+
     def __str__(self):
         if hasattr(self, "id"):
             return f"{self.__class__.__name__}(id={self.id})"
         return f"{self.__class__.__name__}(não salvo)"
 
+    def _column_snapshot(self):
+        """Valores das colunas na ordem de _column_plan; _MISSING se ausente."""
+        snapshot = []
+        for column, cache_name in self._column_plan:
+            if cache_name is None:
+                snapshot.append(getattr(self, column, None))
+                continue
+            related_obj = getattr(self, cache_name, None)
+            if related_obj is not None:
+                snapshot.append(getattr(related_obj, "id", None))
+            else:
+                snapshot.append(getattr(self, column, _MISSING))
+        return snapshot
+
+    def to_dict(self):
+        return {"id": getattr(self, "id", None), **self._get_column_values()}
+
+    def _get_column_values(self):
+        return {
+            column: value
+            for (column, _), value in zip(self._column_plan, self._column_snapshot())
+            if value is not _MISSING
+        }
+
+    def _mark_clean(self, columns=None):
+        # Tupla alinhada a _column_plan: bem menor que um dict por instância
+        snapshot = self._column_snapshot()
+        if columns is not None:
+            # Só as colunas gravadas passam a refletir o banco; as demais mantêm o estado anterior
+            loaded = getattr(self, "_loaded_values", None) or (_MISSING,) * len(snapshot)
+            snapshot = [
+                value if column in columns else old
+                for (column, _), value, old in zip(self._column_plan, snapshot, loaded)
+            ]
+        self._loaded_values = tuple(snapshot)
+
+    def get_dirty_fields(self):
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None:
+            return self._get_column_values()
+        return {
+            column: value
+            for (column, _), value, old in zip(self._column_plan, self._column_snapshot(), loaded)
+            if value is not _MISSING and (old is _MISSING or old != value)
+        }
+
+    def _save_statement(self):
+        is_insert = not hasattr(self, "id") or self.id is None
+
+        if is_insert:
+            fields = self._get_column_values()
+        else:
+            fields = self.get_dirty_fields()
+        if not fields:
+            return None, None, is_insert, fields
+
+        if list(fields) == self._statement_columns:
+            query = self._statements["insert" if is_insert else "update"]
+        elif is_insert:
+            query = self._build_insert(list(fields))
+        else:
+            query = self._build_update(list(fields))
+
+        params = list(fields.values())
+        if not is_insert:
+            params.append(self.id)
+        return query, params, is_insert, fields
+
     def save(self):
         self.validate()
         
         from modules.database.db import DB
-        from modules.database.relationships import Relationship, OneToOneField, ForeignKey
         
-        is_insert = not hasattr(self, "id") or self.id is None
+        query, params, is_insert, fields = self._save_statement()
+        if query is None and not is_insert:
+            return self
 
-        fields = {}
-        for field_name, field in self._fields.items():
-            if hasattr(self, field_name) and not isinstance(field, Relationship):
-                value = getattr(self, field_name)
-                fields[field_name] = value
-            elif isinstance(field, (OneToOneField, ForeignKey)):
-                related_obj = getattr(self, f"_{field_name}_cache", None)
-                if related_obj is not None:
-                    fields[f"{field_name}_id"] = getattr(related_obj, "id", None)
-                elif hasattr(self, f"{field_name}_id"):
-                    fields[f"{field_name}_id"] = getattr(self, f"{field_name}_id")
+        if query is not None:
+            result = DB.execute_query(query, params)
+            if is_insert and result:
+                self.id = result[0]["id"]
+                self._register_identity()
 
-        if is_insert:
-            if fields:
-                columns = ", ".join(fields.keys())
-                placeholders = ", ".join(["%s"] * len(fields))
-                values = list(fields.values())
-
-                query = f"""
-                    INSERT INTO {self.__tablename__} ({columns})
-                    VALUES ({placeholders})
-                    RETURNING id
-                """
-                result = DB.execute_query(query, values)
-
-                if result and result > 0:
-                    self.id = result
-        else:
-            if fields:
-                set_clause = ", ".join([f"{key} = %s" for key in fields.keys()])
-                values = list(fields.values()) + [self.id]
+        for query, params in self._reverse_relation_updates(None if is_insert else fields):
+            DB.execute_query(query, params)
+        self._invalidate_cache()
+        self._mark_clean()
+
+        return self
 
-                query = f"""
-                    UPDATE {self.__tablename__}
-                    SET {set_clause}
-                    WHERE id = %s
-                """
-                DB.execute_query(query, values)
+    async def asave(self):
+        self.validate()
+
+        from modules.database.async_db import AsyncDB
+
+        query, params, is_insert, fields = self._save_statement()
+        if query is None and not is_insert:
+            return self
 
-        self._update_reverse_relations()
+        if query is not None:
+            result = await AsyncDB.execute_query(query, params)
+            if is_insert and result:
+                self.id = result[0]["id"]
+                self._register_identity()
+
+        for query, params in self._reverse_relation_updates(None if is_insert else fields):
+            await AsyncDB.execute_query(query, params)
+        # AsyncDB confirma cada comando na hora; não há commit para esperar
+        self._invalidate_cache(immediate=True)
+        self._mark_clean()
 
         return self
 
+    def _invalidate_cache(self, immediate=False):
+        from modules.database.db import DB
+
+        if self._model_cache is None or getattr(self, "id", None) is None:
+            return
+        if immediate:
+            self._model_cache.invalidate(self.id)
+            return
+        # Invalidar antes do commit deixaria um leitor concorrente recolocar a linha antiga no cache
+        DB.on_commit(partial(self._model_cache.invalidate, self.id))
+
+    @classmethod
+    def _cached_row(cls, field, value):
+        from modules.database.db import DB
+
+        # Na transação o cache ainda tem a versão anterior às escritas dela
+        if cls._model_cache is None or DB.in_transaction():
+            return None
+        return cls._model_cache.get(field, value)
+
+    def _cache_row(self):
+        loaded = getattr(self, "_loaded_values", ())
+        row = {"id": self.id}
+        for (column, _), value in zip(self._column_plan, loaded):
+            if value is not _MISSING:
+                row[column] = value
+        return row
+
+    def _register_identity(self):
+        identity_map = current_identity_map()
+        if identity_map is not None:
+            identity_map.add(self)
+
     def validate(self):
+        from modules.database.relationships import Relationship
+
         for field_name, field in self._fields.items():
-            value = getattr(self, field_name, None)
-            from modules.database.relationships import Relationship
             if not isinstance(field, Relationship):
-                field.validate(value)
+                field.validate(getattr(self, field_name, None))
 
     
-    def _update_reverse_relations(self):
-        from modules.database.db import DB
+    def _reverse_relation_updates(self, changed=None):
         from modules.database.relationships import OneToOneField
 
+        updates = []
         for field_name, field in self._fields.items():
             if isinstance(field, OneToOneField) and field.back_populates:
+                if changed is not None and f"{field_name}_id" not in changed:
+                    continue
                 related_obj = getattr(self, field_name, None)
                 if related_obj is not None:
                     related_model = field.get_related_model()
@@ -122,38 +316,357 @@ class BaseModel(metaclass=ModelMeta):
                                     SET {field.back_populates}_id = %s
                                     WHERE id = %s
                                 """
-                                DB.execute_query(query, (self.id, related_obj.id))
+                                updates.append((query, (self.id, related_obj.id)))
+        return updates
     
+    @classmethod
+    def bulk_create(cls, objs, batch_size=1000, method="values"):
+        from modules.database.db import DB
+        from psycopg2.extras import execute_values
+
+        if method not in ("values", "copy"):
+            raise ValueError(f"Método de inserção em lote inválido: {method}")
+
+        objs = list(objs)
+        if not objs:
+            return objs
+
+        for obj in objs:
+            obj.validate()
+
+        columns, values = cls._collect_rows(objs)
+        query = f"INSERT INTO {cls.__tablename__} ({', '.join(columns)}) VALUES %s RETURNING id"
+
+        with DB.get_connection().get_cursor() as cursor:
+            for start in range(0, len(objs), batch_size):
+                batch = objs[start:start + batch_size]
+                batch_values = values[start:start + batch_size]
+
+                if method == "copy":
+                    ids = cls._copy_batch(cursor, columns, batch_values)
+                else:
+                    result = execute_values(
+                        cursor, query, batch_values, page_size=len(batch_values), fetch=True
+                    )
+                    ids = [row[0] for row in result]
+
+                for obj, new_id in zip(batch, ids):
+                    obj.id = new_id
+                    obj._mark_clean()
+                    obj._register_identity()
+        DB.record_write()
+
+        cls._logger.debug(f"{len(objs)} registros inseridos em lote em {cls.__tablename__}")
+        return objs
+
+    @classmethod
+    def bulk_update(cls, objs, fields, batch_size=1000):
+        from modules.database.db import DB
+        from psycopg2.extras import execute_values
+
+        objs = list(objs)
+        if not objs:
+            return 0
+        if not fields:
+            raise ValueError("bulk_update exige ao menos um campo")
+
+        for obj in objs:
+            if getattr(obj, "id", None) is None:
+                raise ValueError("Todos os objetos devem ser salvos antes de bulk_update")
+            obj.validate()
+
+        columns = [cls._resolve_column(field_name) for field_name in fields]
+        names = [column for column, _ in columns]
+        template = "(%s::INTEGER, " + ", ".join(f"%s::{sql_type}" for _, sql_type in columns) + ")"
+        set_clause = ", ".join(f"{column} = v.{column}" for column in names)
+        query = f"""
+            UPDATE {cls.__tablename__} AS t SET {set_clause}
+            FROM (VALUES %s) AS v (id, {', '.join(names)})
+            WHERE t.id = v.id
+        """
+
+        values = []
+        for obj in objs:
+            row = obj._get_column_values()
+            values.append(tuple([obj.id] + [row.get(column) for column in names]))
+
+        updated = 0
+        with DB.get_connection().get_cursor() as cursor:
+            for start in range(0, len(values), batch_size):
+                batch_values = values[start:start + batch_size]
+                execute_values(cursor, query, batch_values, template=template, page_size=len(batch_values))
+                updated += cursor.rowcount
+        DB.record_write()
+
+        for obj in objs:
+            obj._mark_clean(names)
+            obj._invalidate_cache()
+
+        cls._logger.debug(f"{updated} registros atualizados em lote em {cls.__tablename__}")
+        return updated
+
+    @classmethod
+    def upsert(cls, objs, conflict_fields, update_fields=None, batch_size=1000):
+        from modules.database.db import DB
+        from psycopg2.extras import execute_values
+
+        objs = list(objs)
+        if not objs:
+            return objs
+        if not conflict_fields:
+            raise ValueError("upsert exige ao menos um campo de conflito")
+
+        for obj in objs:
+            obj.validate()
+
+        columns, values = cls._collect_rows(objs)
+        conflict_columns = [cls._resolve_column(field_name)[0] for field_name in conflict_fields]
+        update_columns = [cls._resolve_column(field_name)[0] for field_name in update_fields or []]
+
+        if update_columns:
+            action = "DO UPDATE SET " + ", ".join(f"{column} = EXCLUDED.{column}" for column in update_columns)
+        else:
+            action = "DO NOTHING"
+        query = f"""
+            INSERT INTO {cls.__tablename__} ({', '.join(columns)}) VALUES %s
+            ON CONFLICT ({', '.join(conflict_columns)}) {action}
+            RETURNING id, (xmax = 0) AS inserted
+        """
+        # Numa linha que já existia só as colunas do conflito e do UPDATE refletem o objeto
+        written_columns = set(conflict_columns + update_columns)
+
+        with DB.get_connection().get_cursor() as cursor:
+            for start in range(0, len(objs), batch_size):
+                batch = objs[start:start + batch_size]
+                batch_values = values[start:start + batch_size]
+                result = execute_values(cursor, query, batch_values, page_size=len(batch_values), fetch=True)
+
+                # Com DO NOTHING as linhas em conflito não são retornadas,
+                # então os ids só podem ser associados na ordem com DO UPDATE
+                if update_columns:
+                    for obj, (new_id, inserted) in zip(batch, result):
+                        obj.id = new_id
+                        obj._mark_clean(None if inserted else written_columns)
+                        obj._register_identity()
+        DB.record_write()
+
+        # Não há como saber quais linhas foram alteradas pelo ON CONFLICT
+        if cls._model_cache is not None:
+            cls._model_cache.clear()
+
+        cls._logger.debug(f"{len(objs)} registros enviados via upsert para {cls.__tablename__}")
+        return objs
+
+    @classmethod
+    def _resolve_column(cls, field_name):
+        from modules.database.relationships import OneToOneField, ForeignKey, ManyToManyField
+
+        field = cls._fields.get(field_name)
+        if field is None:
+            raise ValueError(f"Campo {field_name} não existe em {cls.__name__}")
+        if isinstance(field, ManyToManyField):
+            raise ValueError(f"Campo {field_name} é ManyToMany e não possui coluna")
+        if isinstance(field, (OneToOneField, ForeignKey)):
+            return f"{field_name}_id", "INTEGER"
+        return field_name, field.get_sql_definition()
+
+    @classmethod
+    def _build_insert(cls, columns):
+        placeholders = ", ".join(["%s"] * len(columns))
+        return f"INSERT INTO {cls.__tablename__} ({', '.join(columns)}) VALUES ({placeholders}) RETURNING id"
+
+    @classmethod
+    def _build_update(cls, columns):
+        set_clause = ", ".join(f"{column} = %s" for column in columns)
+        return f"UPDATE {cls.__tablename__} SET {set_clause} WHERE id = %s"
+
+    @classmethod
+    def _compile_statements(cls):
+        columns = cls._column_names()[1:]
+        cls._statement_columns = columns
+        cls._statements = {
+            "select_by_id": f"SELECT * FROM {cls.__tablename__} WHERE id = %s",
+            "delete": f"DELETE FROM {cls.__tablename__} WHERE id = %s",
+        }
+        if columns:
+            cls._statements["insert"] = cls._build_insert(columns)
+            cls._statements["update"] = cls._build_update(columns)
+
+    @classmethod
+    def _configure_cache(cls):
+        from modules.database.model_cache import ModelCache
+
+        options = getattr(getattr(cls, "Meta", None), "cache", None)
+        if not options:
+            cls._model_cache = None
+            return
+        cls._model_cache = ModelCache(**({} if options is True else options))
+
+    @classmethod
+    def cache_stats(cls):
+        if cls._model_cache is None:
+            return None
+        return cls._model_cache.stats()
+
+    @classmethod
+    def _cache_lookup(cls, conditions):
+        from modules.database.relationships import Relationship
+
+        if cls._model_cache is None or len(conditions) != 1:
+            return None
+        field_name, value = next(iter(conditions.items()))
+        if value is None or isinstance(value, (tuple, list, dict, set)):
+            return None
+        if field_name != "id":
+            field = cls._fields.get(field_name)
+            if field is None or isinstance(field, Relationship) or not field.unique:
+                return None
+        return field_name, value
+
+    @classmethod
+    def _collect_indexes(cls):
+        from modules.database.indexes import Index
+        from modules.database.relationships import Relationship, OneToOneField, ForeignKey
+
+        indexes = []
+        for field_name, field in cls._fields.items():
+            if isinstance(field, (OneToOneField, ForeignKey)):
+                if field.unique:
+                    indexes.append(Index(field_name, unique=True))
+                elif field.index is not False:
+                    indexes.append(Index(field_name))
+            elif not isinstance(field, Relationship):
+                if field.unique:
+                    indexes.append(Index(field_name, unique=True))
+                elif field.index:
+                    indexes.append(Index(field_name))
+
+        indexes.extend(getattr(getattr(cls, "Meta", None), "indexes", ()))
+        return indexes
+
+    @classmethod
+    def _column_names(cls):
+        from modules.database.relationships import ManyToManyField
+
+        return ["id"] + [
+            cls._resolve_column(field_name)[0]
+            for field_name, field in cls._fields.items()
+            if not isinstance(field, ManyToManyField)
+        ]
+
+    @classmethod
+    def _collect_rows(cls, objs):
+        rows = [obj._get_column_values() for obj in objs]
+        columns = []
+        for row in rows:
+            for column in row:
+                if column not in columns:
+                    columns.append(column)
+        if not columns:
+            raise ValueError(f"Nenhuma coluna para inserir em {cls.__tablename__}")
+
+        values = [tuple(row.get(column) for column in columns) for row in rows]
+        return columns, values
+
+    @classmethod
+    def _copy_batch(cls, cursor, columns, values):
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            (cls.__tablename__, len(values)),
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+
+        buffer = io.StringIO()
+        for new_id, row in zip(ids, values):
+            buffer.write(",".join([str(new_id)] + [_copy_value(value) for value in row]))
+            buffer.write("\n")
+        buffer.seek(0)
+
+        cursor.copy_expert(
+            f"COPY {cls.__tablename__} (id, {', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+        return ids
+
+    @classmethod
+    def query(cls):
+        from modules.database.queryset import QuerySet
+
+        return QuerySet(cls)
+
+    @classmethod
+    def prefetch_related(cls, instances, *names):
+        for name in names:
+            field = cls._fields.get(name)
+            if not hasattr(field, "prefetch"):
+                raise ValueError(f"prefetch_related: {name} não é um relacionamento de {cls.__name__}")
+            field.prefetch(instances)
+        return instances
+
+    @classmethod
+    async def aprefetch_related(cls, instances, *names):
+        for name in names:
+            field = cls._fields.get(name)
+            if not hasattr(field, "aprefetch"):
+                raise ValueError(f"prefetch_related: {name} não é um relacionamento de {cls.__name__}")
+            await field.aprefetch(instances)
+        return instances
+
     @classmethod
     def find_by_id(cls, id):
         from modules.database.db import DB
         
-        query = f"SELECT * FROM {cls.__tablename__} WHERE id = %s"
-        results = DB.execute_query(query, (id,))
+        instance = cls._from_identity_map(id)
+        if instance is not None:
+            return instance
+
+        row = cls._cached_row("id", id)
+        if row is not None:
+            return cls.from_db_row(row)
+
+        results = DB.execute_read(cls._statements["select_by_id"], (id,))
         if results and len(results) > 0:
-            return cls(**results[0])
+            # Dentro de uma transação a linha pode ainda não estar confirmada
+            if cls._model_cache is not None and not DB.in_transaction():
+                cls._model_cache.set("id", id, results[0])
+            return cls.from_db_row(results[0])
+        return None
+
+    @classmethod
+    async def afind_by_id(cls, id):
+        from modules.database.async_db import AsyncDB
+
+        instance = cls._from_identity_map(id)
+        if instance is not None:
+            return instance
+
+        if cls._model_cache is not None:
+            row = cls._model_cache.get("id", id)
+            if row is not None:
+                return cls.from_db_row(row)
+
+        results = await AsyncDB.execute_query(cls._statements["select_by_id"], (id,))
+        if results:
+            if cls._model_cache is not None:
+                cls._model_cache.set("id", id, results[0])
+            return cls.from_db_row(results[0])
         return None
 
     @classmethod
     def find_all(cls):
-        from modules.database.db import DB
-        
-        query = f"SELECT * FROM {cls.__tablename__}"
-        results = DB.execute_query(query)
-        return [cls(**row) for row in results]
+        return cls.query()
+
+    @classmethod
+    def iterate(cls, batch_size=2000):
+        return cls.query().iterator(batch_size)
 
     @classmethod
     def find_by(cls, **kwargs):
-        from modules.database.db import DB
-        
         if not kwargs:
-            return []
-
-        conditions = " AND ".join([f"{key} = %s" for key in kwargs.keys()])
-        values = list(kwargs.values())
-        query = f"SELECT * FROM {cls.__tablename__} WHERE {conditions}"
-        results = DB.execute_query(query, values)
-        return [cls(**row) for row in results]
+            return cls.query().none()
+        queryset = cls.query().filter(**kwargs)
+        queryset._cache_key = cls._cache_lookup(kwargs)
+        return queryset
 
     def delete(self):
         from modules.database.db import DB
@@ -161,6 +674,22 @@ class BaseModel(metaclass=ModelMeta):
         if not hasattr(self, "id") or self.id is None:
             return False
 
-        query = f"DELETE FROM {self.__tablename__} WHERE id = %s"
-        DB.execute_query(query, (self.id,))
-        return True
\ No newline at end of file
+        DB.execute_query(self._statements["delete"], (self.id,))
+        self._invalidate_cache()
+        identity_map = current_identity_map()
+        if identity_map is not None:
+            identity_map.remove(self)
+        return True
+
+    async def adelete(self):
+        from modules.database.async_db import AsyncDB
+
+        if not hasattr(self, "id") or self.id is None:
+            return False
+
+        await AsyncDB.execute_query(self._statements["delete"], (self.id,))
+        self._invalidate_cache(immediate=True)
+        identity_map = current_identity_map()
+        if identity_map is not None:
+            identity_map.remove(self)
+        return True
@@ -0,0 +1,201 @@
+from modules.utils.logger import Logger
+
+_logger = Logger("Batch")
+
+
+class BatchFuture:
+    """Resultado de uma leitura enfileirada em um lote."""
+
+    def __init__(self, batch):
+        self._batch = batch
+        self._done = False
+        self._value = None
+        self._error = None
+
+    def done(self):
+        return self._done
+
+    def result(self):
+        if not self._done:
+            # Pedir o resultado antes do fim do bloco envia o lote na hora
+            self._batch.flush()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def _set_result(self, value):
+        self._value = value
+        self._done = True
+
+    def _set_exception(self, error):
+        self._error = error
+        self._done = True
+
+    def __repr__(self):
+        state = "pendente" if not self._done else ("erro" if self._error else "pronto")
+        return f"<BatchFuture {state}>"
+
+
+def _decode_json_row(model, row):
+    # json_agg devolve datas como texto; cada campo sabe restaurar o próprio tipo
+    for name, field in model._fields.items():
+        value = row.get(name)
+        if value is not None:
+            row[name] = field.from_json(value)
+    return row
+
+
+class Batch:
+    """Enfileira leituras independentes e as envia ao banco em uma única ida."""
+
+    def __init__(self):
+        self._lookups = {}
+        self._statements = []
+
+    def find_by_id(self, model, id):
+        future = BatchFuture(self)
+
+        instance = model._from_identity_map(id)
+        if instance is None:
+            row = model._cached_row("id", id)
+            instance = None if row is None else model.from_db_row(row)
+        if instance is not None:
+            future._set_result(instance)
+            return future
+
+        self._lookups.setdefault(model, {}).setdefault(id, []).append(future)
+        return future
+
+    def execute(self, query, params=None, model=None):
+        """Enfileira um SELECT (texto, não Composable).
+
+        As linhas chegam como JSON: datas e timestamps em texto, numeric como float.
+        Com model viram instâncias e cada campo restaura o próprio tipo.
+        """
+        future = BatchFuture(self)
+        self._statements.append((query.strip().rstrip(";"), tuple(params or ()), model, future))
+        return future
+
+    def __len__(self):
+        return sum(len(ids) for ids in self._lookups.values()) + len(self._statements)
+
+    def _take_parts(self):
+        """Lista de (query, params, model, resolver, futures) e esvazia a fila."""
+        from modules.database.db import DB
+
+        parts = []
+        for model, futures_by_id in self._lookups.items():
+            def resolve(rows, model=model, futures_by_id=futures_by_id):
+                by_id = {}
+                for row in rows:
+                    # Dentro de uma transação a linha pode ainda não estar confirmada
+                    if model._model_cache is not None and not DB.in_transaction():
+                        model._model_cache.set("id", row["id"], row)
+                    by_id[row["id"]] = model.from_db_row(row)
+                for id, futures in futures_by_id.items():
+                    for future in futures:
+                        future._set_result(by_id.get(id))
+
+            query = f"SELECT * FROM {model.__tablename__} WHERE id = ANY(%s)"
+            futures = [future for group in futures_by_id.values() for future in group]
+            parts.append((query, (list(futures_by_id),), model, resolve, futures))
+
+        for query, params, model, future in self._statements:
+            def resolve(rows, model=model, future=future):
+                future._set_result([model.from_db_row(row) for row in rows] if model else list(rows))
+
+            parts.append((query, params, model, resolve, [future]))
+
+        self._lookups = {}
+        self._statements = []
+        return parts
+
+    def _fail(self, parts, error):
+        for *_, futures in parts:
+            for future in futures:
+                if not future.done():
+                    future._set_exception(error)
+
+    @staticmethod
+    def _json_column(query, index):
+        # O resultado de cada leitura vira uma coluna json_agg; o tipo não depende do tamanho do lote
+        return f"(SELECT COALESCE(json_agg(_b{index}), '[]'::json) FROM ({query}) AS _b{index}) AS r{index}"
+
+    @staticmethod
+    def _resolve_all(parts, results):
+        for (_, _, model, resolve, _), rows in zip(parts, results):
+            if model is not None:
+                rows = [_decode_json_row(model, item) for item in rows]
+            resolve(rows)
+
+    def flush(self):
+        from modules.database.db import DB
+
+        parts = self._take_parts()
+        if not parts:
+            return
+        _logger.debug(f"Enviando lote com {len(parts)} leituras")
+        columns = []
+        params = []
+        for index, (query, part_params, *_) in enumerate(parts):
+            columns.append(self._json_column(query, index))
+            params.extend(part_params)
+        try:
+            # Cada composição de lote gera um SQL novo; preparar só expulsaria statements quentes do cache
+            row = DB.execute_read(f"SELECT {', '.join(columns)}", tuple(params), prepare=False)[0]
+            self._resolve_all(parts, [row[f"r{index}"] for index in range(len(parts))])
+        except Exception as e:
+            self._fail(parts, e)
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._fail(self._take_parts(), RuntimeError("Lote descartado por uma exceção no bloco"))
+        return False
+
+
+class AsyncBatch(Batch):
+    """Lote do AsyncDB: envia as consultas separadas no modo pipeline do psycopg 3."""
+
+    def flush(self):
+        raise RuntimeError("Lote assíncrono ainda não enviado; use await batch.aflush() ou async with")
+
+    async def aflush(self):
+        from modules.database.async_db import AsyncDB, dict_row
+
+        parts = self._take_parts()
+        if not parts:
+            return
+        _logger.debug(f"Enviando lote assíncrono com {len(parts)} leituras em pipeline")
+        try:
+            async with AsyncDB.connection() as conn:
+                cursors = []
+                async with conn.pipeline():
+                    for query, params, *_ in parts:
+                        cursor = conn.cursor(row_factory=dict_row)
+                        await cursor.execute(f"SELECT {self._json_column(query, 0)}", params or None, prepare=False)
+                        cursors.append(cursor)
+                results = []
+                for cursor in cursors:
+                    results.append((await cursor.fetchone())["r0"])
+                    await cursor.close()
+                await conn.rollback()
+            self._resolve_all(parts, results)
+        except Exception as e:
+            self._fail(parts, e)
+            raise
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.aflush()
+        else:
+            self._fail(self._take_parts(), RuntimeError("Lote descartado por uma exceção no bloco"))
+        return False
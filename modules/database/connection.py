@@ -1,52 +1,312 @@
+import threading
+import uuid
+import weakref
 import psycopg2
+from contextlib import contextmanager
+from psycopg2 import extensions
 from psycopg2.extras import RealDictCursor
 from modules.utils.logger import Logger
+from modules.database.statement_cache import StatementCache, is_preparable, to_positional
+
+
+class DatabaseError(Exception):
+    pass
+
 
 class DatabaseConnection:
     _instance = None
-    
+
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super(DatabaseConnection, cls).__new__(cls)
             cls._instance._initialized = False
         return cls._instance
-    
-    def __init__(self, host="localhost", database="teste", user="admin", password="admin"):
+
+    def __init__(self, host="localhost", database="teste", user="admin", password="admin", pool=None):
         if getattr(self, '_initialized', False):
             return
-        
+
         self.host = host
         self.database = database
         self.user = user
         self.password = password
-        self._connection = None
+        self._conn = None
+        self._pool = None
+        self._statement_caches = weakref.WeakKeyDictionary()
+        self.prepare_statements = True
+        self.statement_cache_size = 100
+        self._local = threading.local()
         self._logger = Logger("DatabaseConnection")
         self._initialized = True
-    
-    def connect(self):
+
+        if pool is not None:
+            self.configure_pool(**pool)
+
+    def _create_connection(self):
+        try:
+            return psycopg2.connect(
+                dbname=self.database,
+                user=self.user,
+                password=self.password,
+                host=self.host,
+                keepalives=1
+            )
+        except psycopg2.OperationalError as e:
+            raise ConnectionError(f"Não foi possível conectar ao banco {self.database} em {self.host}: {e}") from e
+
+    def _initialize_connection(self):
         self._logger.info(f"Conectando ao banco de dados {self.database} em {self.host}")
-        self._connection = psycopg2.connect(
-            host=self.host,
-            database=self.database,
-            user=self.user,
-            password=self.password
+        self._conn = self._create_connection()
+        return self._conn
+
+    def connect(self):
+        return self._initialize_connection()
+
+    def configure_pool(self, min_size=1, max_size=10, timeout=30.0, max_idle=300.0, health_check_interval=30.0):
+        from modules.database.pool import ConnectionPool
+
+        if self._pool is not None:
+            self._pool.close()
+        self._logger.info(f"Habilitando pool de conexões ({min_size}..{max_size}) para {self.database} em {self.host}")
+        self._pool = ConnectionPool(
+            self._create_connection,
+            min_size=min_size,
+            max_size=max_size,
+            timeout=timeout,
+            max_idle=max_idle,
+            health_check_interval=health_check_interval,
         )
-        return self._connection
-    
+        return self._pool
+
+    @property
+    def pooled(self):
+        return self._pool is not None
+
+    def pool_stats(self):
+        if self._pool is None:
+            return None
+        return self._pool.stats()
+
+    def configure_statement_cache(self, max_size=100, enabled=True):
+        self.prepare_statements = enabled
+        self.statement_cache_size = max_size
+        for cache in list(self._statement_caches.values()):
+            cache.max_size = max_size
+
+    def statement_cache_stats(self):
+        caches = list(self._statement_caches.values())
+        hits = sum(cache.hits for cache in caches)
+        misses = sum(cache.misses for cache in caches)
+        return {
+            "connections": len(caches),
+            "prepared": sum(len(cache) for cache in caches),
+            "hits": hits,
+            "misses": misses,
+            "evictions": sum(cache.evictions for cache in caches),
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    def _statement_cache(self, conn):
+        cache = self._statement_caches.get(conn)
+        if cache is None:
+            cache = self._statement_caches[conn] = StatementCache(self.statement_cache_size)
+        return cache
+
+    def _execute(self, conn, cursor, query, params, prepare=True):
+        if not (prepare and self.prepare_statements) or not is_preparable(query, params):
+            cursor.execute(query, params or ())
+            return
+
+        cache = self._statement_cache(conn)
+        deallocations = cache.take_deallocations() + self._existing_statements(conn, cache.take_unverified())
+        name = cache.get(query)
+        statements = [f"DEALLOCATE {evicted}" for evicted in deallocations]
+        if name is None:
+            name = cache.add(query)
+            positional, _ = to_positional(query)
+            statements.append(f"PREPARE {name} AS {positional}")
+        statements.append(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})")
+
+        try:
+            cursor.execute("; ".join(statements), params)
+        except Exception:
+            # Não se sabe até onde o comando combinado rodou; os nomes são conferidos na próxima execução
+            cache.discard(query, deallocations)
+            raise
+
+    def _existing_statements(self, conn, names):
+        # DEALLOCATE de um nome inexistente falha e não há IF EXISTS
+        if not names:
+            return []
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT name FROM pg_prepared_statements WHERE name = ANY(%s)", (names,))
+            return [row[0] for row in cursor.fetchall()]
+
     def get_connection(self):
-        if self._connection is None or self._connection.closed:
-            self.connect()
-        return self._connection
-    
-    def execute_query(self, query, params=None):
+        if self._pool is not None:
+            conn = self._pool.current()
+            if conn is None:
+                raise DatabaseError("Nenhuma conexão emprestada do pool nesta thread; use connection()")
+            return conn
+        if self._conn is None or self._conn.closed:
+            self._initialize_connection()
+        return self._conn
+
+    @contextmanager
+    def connection(self):
+        if self._pool is None:
+            yield self.get_connection()
+            return
+        with self._pool.connection() as conn:
+            yield conn
+
+    def in_transaction(self):
+        return getattr(self._local, "depth", 0) > 0
+
+    @contextmanager
+    def _stream_connection(self):
+        # O cursor no servidor atravessa yields; com a conexão emprestada da thread,
+        # outro bloco poderia devolvê-la ao pool no meio da leitura
+        if self._pool is None or self.in_transaction():
+            with self.connection() as conn:
+                yield conn
+            return
+        conn = self._pool.getconn()
+        autocommit = conn.autocommit
+        try:
+            # Transação explícita só para a leitura: o cursor vive até o rollback, sem WITH HOLD
+            conn.autocommit = False
+            yield conn
+        finally:
+            if not conn.closed:
+                conn.rollback()
+                conn.autocommit = autocommit
+            self._pool.putconn(conn)
+
+    def _run_savepoint_command(self, conn, command):
+        with conn.cursor() as cursor:
+            cursor.execute(command)
+
+    @contextmanager
+    def transaction(self):
+        local = self._local
+        if self.in_transaction():
+            local.savepoints += 1
+            name = f"sp_{local.savepoints}"
+            conn = local.conn
+            self._run_savepoint_command(conn, f"SAVEPOINT {name}")
+            local.depth += 1
+            try:
+                yield conn
+            except Exception:
+                self._run_savepoint_command(conn, f"ROLLBACK TO SAVEPOINT {name}")
+                raise
+            else:
+                self._run_savepoint_command(conn, f"RELEASE SAVEPOINT {name}")
+            finally:
+                local.depth -= 1
+            return
+
+        callbacks = []
+        committing = False
+        try:
+            # A conexão fica presa à thread até o fim do bloco; tudo que rodar dentro dele a reutiliza
+            with self.connection() as conn:
+                local.conn = conn
+                local.depth = 1
+                local.savepoints = 0
+                local.on_commit = callbacks
+                try:
+                    yield conn
+                except Exception:
+                    conn.rollback()
+                    raise
+                else:
+                    if conn.get_transaction_status() == extensions.TRANSACTION_STATUS_INERROR:
+                        # COMMIT de uma transação abortada vira ROLLBACK sem erro; não engolir a perda
+                        conn.rollback()
+                        raise DatabaseError("Transação abortada por um erro anterior; alterações descartadas")
+                    committing = True
+                    conn.commit()
+                finally:
+                    local.depth = 0
+                    local.conn = None
+                    local.on_commit = None
+        finally:
+            # Se o COMMIT falhar não se sabe se ele valeu; os callbacks rodam mesmo assim
+            if committing:
+                for callback in callbacks:
+                    callback()
+
+    def on_commit(self, callback):
+        """Adia callback até o commit da transação externa; fora de uma transação roda na hora."""
+        if not self.in_transaction():
+            callback()
+            return
+        self._local.on_commit.append(callback)
+
+    @contextmanager
+    def get_cursor(self, commit=True, cursor_factory=None):
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=cursor_factory)
+            in_transaction = self.in_transaction()
+            try:
+                yield cursor
+                if commit and not in_transaction:
+                    conn.commit()
+            except Exception as e:
+                if not in_transaction:
+                    conn.rollback()
+                raise DatabaseError(str(e)) from e
+            finally:
+                cursor.close()
+
+    def execute_query(self, query, params=None, prepare=True):
         self._logger.debug(f"Executando query: {query} com parâmetros: {params}")
-        conn = self.get_connection()
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(query, params or ())
-            if query.strip().upper().startswith(("SELECT", "RETURNING")):
-                results = [dict(row) for row in cursor.fetchall()]
-                self._logger.debug(f"Resultados da query: {results}")
-                return results
-            conn.commit()
-            self._logger.debug(f"Query executada com sucesso, {cursor.rowcount} linhas afetadas")
-            return cursor.rowcount
\ No newline at end of file
+        with self.connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                self._execute(conn, cursor, query, params, prepare)
+                if cursor.description is not None:
+                    # RealDictRow já é um dict; copiar cada linha só gasta memória
+                    results = cursor.fetchall()
+                    if not self.in_transaction() and not query.strip().upper().startswith("SELECT"):
+                        conn.commit()
+                    self._logger.debug(f"Resultados da query: {results}")
+                    return results
+                if not self.in_transaction():
+                    conn.commit()
+                self._logger.debug(f"Query executada com sucesso, {cursor.rowcount} linhas afetadas")
+                return cursor.rowcount
+
+    def iterate_query(self, query, params=None, batch_size=2000, as_dicts=True):
+        self._logger.debug(f"Iterando query com cursor no servidor: {query} com parâmetros: {params}")
+        # Sem pool e fora de transação a conexão é a mesma dos outros comandos, que fazem
+        # commit no meio da leitura; só aí o cursor precisa sobreviver com WITH HOLD
+        withhold = self._pool is None and not self.in_transaction()
+        with self._stream_connection() as conn:
+            cursor = conn.cursor(name=f"stream_{uuid.uuid4().hex}", withhold=withhold)
+            cursor.itersize = batch_size
+            try:
+                cursor.execute(query, params or ())
+                columns = None
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    if not as_dicts:
+                        yield rows
+                        continue
+                    if columns is None:
+                        columns = [desc[0] for desc in cursor.description]
+                    yield [dict(zip(columns, row)) for row in rows]
+            finally:
+                if not conn.closed:
+                    cursor.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+        if self._conn is not None and not self._conn.closed:
+            self._conn.close()
+        self._conn = None
@@ -1,21 +1,53 @@
+from contextlib import contextmanager
+from functools import wraps
 from modules.utils.logger import Logger
 from modules.database.connection import DatabaseConnection
 from modules.database.abstract.model_register import ModelRegistry
 
 class DB:
     _connection = None
+    _router = None
     _logger = Logger("DB")
-
+    
     @classmethod
-    def connect(
-        cls, host="localhost", database="teste", user="admin", password="admin"
-    ):
+    def connect(cls, host="localhost", database="teste", user="admin", password="admin", pool=None,
+                statement_cache=None, replicas=None, router=None):
         cls._logger.info(f"Conectando ao banco de dados {database} em {host}")
-        cls._connection = psycopg2.connect(
-            host=host, database=database, user=user, password=password
-        )
+        cls._connection = DatabaseConnection(host, database, user, password)
+        if pool is not None and not cls._connection.pooled:
+            cls._connection.configure_pool(**pool)
+        if statement_cache is not None:
+            cls._connection.configure_statement_cache(**statement_cache)
+        if replicas:
+            cls._configure_replicas(replicas, database, user, password, pool, statement_cache, router or {})
         return cls._connection
 
+    @classmethod
+    def _configure_replicas(cls, replicas, database, user, password, pool, statement_cache, options):
+        from modules.database.router import ReplicaConnection, ReplicaRouter
+
+        if cls._router is not None:
+            cls._router.close()
+        connections = []
+        for replica in replicas:
+            # Uma réplica pode ser só o host ou um dict que sobrescreve credenciais e pool
+            settings = {"host": replica} if isinstance(replica, str) else dict(replica)
+            replica_pool = settings.pop("pool", pool)
+            connection = ReplicaConnection(
+                settings.pop("host"),
+                settings.pop("database", database),
+                settings.pop("user", user),
+                settings.pop("password", password),
+            )
+            if replica_pool is not None:
+                connection.configure_pool(**replica_pool)
+            if statement_cache is not None:
+                connection.configure_statement_cache(**statement_cache)
+            connections.append(connection)
+        cls._logger.info(f"Roteando leituras para {len(connections)} réplica(s)")
+        cls._router = ReplicaRouter(cls._connection, connections, **options)
+        return cls._router
+
     @classmethod
     def get_connection(cls):
         if cls._connection is None:
@@ -23,260 +55,172 @@ class DB:
         return cls._connection
 
     @classmethod
-    def execute_query(cls, query, params=None):
-        cls._logger.debug(f"Executando query: {query} com parâmetros: {params}")
-        conn = cls.get_connection()
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(query, params or ())
-            if query.strip().upper().startswith(("SELECT", "RETURNING")):
-                results = [dict(row) for row in cursor.fetchall()]
-                cls._logger.debug(f"Resultados da query: {results}")
-                return results
-            conn.commit()
-            cls._logger.debug(
-                f"Query executada com sucesso, {cursor.rowcount} linhas afetadas"
-            )
-            return cursor.rowcount
+    def connection(cls):
+        return cls.get_connection().connection()
 
     @classmethod
-    def create_tables(cls, models):
-        conn = cls.get_connection()
-        with conn.cursor() as cursor:
-            for model in models:
-                cls._create_table_without_fks(cursor, model)
-
-            for model in models:
-                cls._add_foreign_keys(cursor, model)
-
-            for model in models:
-
-                if hasattr(model, "_m2m_fields"):
-                    for field_name, field in model._m2m_fields.items():
-                        through_model = field.get_through_model()
-                        table_name = through_model.__tablename__
-
-                        cursor.execute(
-                            """
-                            SELECT EXISTS (
-                                SELECT FROM information_schema.tables 
-                                WHERE table_name = %s
-                            );
-                        """,
-                            (table_name,),
-                        )
-
-                        if not cursor.fetchone()[0]:
-                            model1 = model.__name__.lower()
-                            model2 = field.model_class.lower()
-
-                            cursor.execute(
-                                f"""
-                                CREATE TABLE {table_name} (
-                                    id SERIAL PRIMARY KEY,
-                                    {model1}_id INTEGER REFERENCES {model.__tablename__}(id),
-                                    {model2}_id INTEGER REFERENCES {field.get_related_model().__tablename__}(id),
-                                    UNIQUE({model1}_id, {model2}_id)
-                                )
-                            """
-                            )
-
-            conn.commit()
+    def pool_stats(cls):
+        return cls.get_connection().pool_stats()
 
     @classmethod
-    def _create_table_without_fks(cls, cursor, model):
-        table_name = model.__tablename__
-        columns = ["id SERIAL PRIMARY KEY"]
-
-        for field_name, field in model._fields.items():
-            if isinstance(field, StringField):
-                columns.append(f"{field_name} VARCHAR({field.max_length})")
-            elif isinstance(field, IntegerField):
-                columns.append(f"{field_name} INTEGER")
-            elif isinstance(field, FloatField):
-                columns.append(f"{field_name} REAL")
-            elif isinstance(field, BooleanField):
-                columns.append(f"{field_name} BOOLEAN")
-            elif isinstance(field, DateField):
-                columns.append(f"{field_name} DATE")
-            elif isinstance(field, (OneToOneField, ForeignKey)):
-                columns.append(
-                    f"{field_name}_id INTEGER"
-                )
-
-        create_table_sql = (
-            f"CREATE TABLE IF NOT EXISTS {table_name} ({', '.join(columns)})"
-        )
-        cursor.execute(create_table_sql)
+    def session(cls):
+        from modules.database.identity_map import session
+
+        return session()
 
     @classmethod
-    def _add_foreign_keys(cls, cursor, model):
-        table_name = model.__tablename__
-        foreign_keys = []
+    def statement_cache_stats(cls):
+        return cls.get_connection().statement_cache_stats()
 
-        for field_name, field in model._fields.items():
-            if isinstance(field, (OneToOneField, ForeignKey)):
-                related_model = field.get_related_model()
-                foreign_keys.append(
-                    f"ALTER TABLE {table_name} ADD FOREIGN KEY ({field_name}_id) REFERENCES {related_model.__tablename__}(id)"
-                )
+    @classmethod
+    @contextmanager
+    def transaction(cls):
+        from modules.database.router import _last_write
+
+        before = _last_write.get()
+        with cls.get_connection().transaction() as conn:
+            yield conn
+        # Transações só de leitura não prendem a requisição ao primário;
+        # com escrita, a janela de leitura conta a partir do commit
+        if _last_write.get() != before:
+            cls.record_write()
 
-        for fk_sql in foreign_keys:
-            cursor.execute(fk_sql)
+    @classmethod
+    def on_commit(cls, callback):
+        if not cls.in_transaction():
+            callback()
+            return
+        cls._connection.on_commit(callback)
 
     @classmethod
-    def _create_table_for_model(cls, cursor, model):
-        table_name = model.__tablename__
-
-        columns = []
-        foreign_keys = []
-
-        columns.append("id SERIAL PRIMARY KEY")
-
-        for field_name, field in model._fields.items():
-            if isinstance(field, StringField):
-                columns.append(f"{field_name} VARCHAR({field.max_length})")
-            elif isinstance(field, IntegerField):
-                columns.append(f"{field_name} INTEGER")
-            elif isinstance(field, FloatField):
-                columns.append(f"{field_name} REAL")
-            elif isinstance(field, BooleanField):
-                columns.append(f"{field_name} BOOLEAN")
-            elif isinstance(field, DateField):
-                columns.append(f"{field_name} DATE")
-            elif isinstance(field, (OneToOneField, ForeignKey)):
-                columns.append(f"{field_name}_id INTEGER")
-                related_model = field.get_related_model()
-                foreign_keys.append(
-                    f"FOREIGN KEY ({field_name}_id) REFERENCES {related_model.__tablename__}(id)"
-                )
-
-        all_columns = columns + foreign_keys
-
-        create_table_sql = f"""
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                {', '.join(all_columns)}
-            )
-        """
-        print(create_table_sql)
-        cursor.execute(create_table_sql)
+    def record_write(cls):
+        if cls._router is not None:
+            from modules.database.router import record_write
+
+            record_write()
 
     @classmethod
-    def _create_m2m_table(cls, cursor, model, m2m_field):
-        through_model = m2m_field.get_through_model()
-
-        if m2m_field.through:
-            table_exists_query = """
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = %s
-                );
-            """
-            cursor.execute(table_exists_query, (through_model.__tablename__,))
-            table_exists = cursor.fetchone()[0]
-
-            if not table_exists:
-                cls._create_table_for_model(cursor, through_model)
-            return
+    def read_connection(cls):
+        if cls._router is None:
+            return cls.get_connection()
+        return cls._router.read_connection()
 
-    _connection = None
-    _logger = Logger("DB")
-    
     @classmethod
-    def connect(cls, host="localhost", database="teste", user="admin", password="admin"):
-        cls._logger.info(f"Conectando ao banco de dados {database} em {host}")
-        cls._connection = DatabaseConnection(host, database, user, password)
-        return cls._connection
+    def run_read(cls, operation):
+        if cls._router is None:
+            return operation(cls.get_connection())
+        return cls._router.run_read(operation)
 
     @classmethod
-    def get_connection(cls):
-        if cls._connection is None:
-            cls.connect()
-        return cls._connection
+    def router_stats(cls):
+        return None if cls._router is None else cls._router.stats()
 
     @classmethod
-    def execute_query(cls, query, params=None):
-        return cls.get_connection().execute_query(query, params)
-    
+    def in_transaction(cls):
+        return cls._connection is not None and cls._connection.in_transaction()
+
     @classmethod
-    def create_tables(cls, models):
-        try:
-            conn = cls.get_connection().get_connection()
-            with conn.cursor() as cursor:
-                for model in models:
-                    cls._create_table_without_fks(cursor, model)
-
-                for model in models:
-                    cls._add_foreign_keys(cursor, model)
-
-                for model in models:
-                    if hasattr(model, "_m2m_fields"):
-                        for field_name, field in model._m2m_fields.items():
-                            through_model = field.get_through_model()
-                            table_name = through_model.__tablename__
-
-                            cursor.execute(
-                                """
-                                SELECT EXISTS (
-                                    SELECT FROM information_schema.tables 
-                                    WHERE table_name = %s
-                                );
-                                """,
-                                (table_name,),
-                            )
-
-                            if not cursor.fetchone()[0]:
-                                model1 = model.__name__.lower()
-                                model2 = field.model_class.lower()
-
-                                cursor.execute(
-                                    f"""
-                                    CREATE TABLE {table_name} (
-                                        id SERIAL PRIMARY KEY,
-                                        {model1}_id INTEGER REFERENCES {model.__tablename__}(id),
-                                        {model2}_id INTEGER REFERENCES {field.get_related_model().__tablename__}(id),
-                                        UNIQUE({model1}_id, {model2}_id)
-                                    )
-                                    """
-                                )
-
-                conn.commit()
-        except Exception as e:
-            print(f"Erro ao criar tabelas: {e}")
-            conn.rollback()
-    
+    def cache_stats(cls):
+        return {
+            model.__name__: model.cache_stats()
+            for model in ModelRegistry.get_all_models()
+            if getattr(model, "_model_cache", None) is not None
+        }
+
+    @classmethod
+    def execute_query(cls, query, params=None, prepare=True):
+        from modules.database.router import is_read_query
+
+        result = cls.get_connection().execute_query(query, params, prepare=prepare)
+        if not (isinstance(result, list) and is_read_query(query)):
+            cls.record_write()
+        return result
+
     @classmethod
-    def _create_table_without_fks(cls, cursor, model):
-        table_name = model.__tablename__
-        columns = ["id SERIAL PRIMARY KEY"]
-        
-        from modules.database.relationships import Relationship, OneToOneField, ForeignKey
-        
-        for field_name, field in model._fields.items():
-            if not isinstance(field, Relationship):
-                columns.append(f"{field_name} {field.get_sql_definition()}")
-            elif isinstance(field, (OneToOneField, ForeignKey)):
-                columns.append(f"{field_name}_id INTEGER")
-        
-        create_table_sql = f"CREATE TABLE IF NOT EXISTS {table_name} ({', '.join(columns)})"
-        cursor.execute(create_table_sql)
+    def execute_read(cls, query, params=None, prepare=True):
+        """prepare=False evita PREPARE para SQL montado sob demanda, que só ocuparia o cache de statements."""
+        if cls._router is None:
+            return cls.execute_query(query, params, prepare=prepare)
+        return cls._router.run_read(lambda connection: connection.execute_query(query, params, prepare=prepare))
     
     @classmethod
-    def _add_foreign_keys(cls, cursor, model):
-        table_name = model.__tablename__
-        foreign_keys = []
-        
-        from modules.database.relationships import OneToOneField, ForeignKey
-        
-        for field_name, field in model._fields.items():
-            if isinstance(field, (OneToOneField, ForeignKey)):
-                related_model = field.get_related_model()
-                foreign_keys.append(
-                    f"ALTER TABLE {table_name} ADD CONSTRAINT fk_{table_name}_{field_name} " + 
-                    f"FOREIGN KEY ({field_name}_id) REFERENCES {related_model.__tablename__}(id) ON DELETE CASCADE"
-                )
-        
-        for fk_sql in foreign_keys:
+    def batch(cls):
+        """Agrupa leituras independentes em uma ida ao banco: with DB.batch() as batch: ..."""
+        from modules.database.batch import Batch
+
+        return Batch()
+
+    @classmethod
+    def check_models(cls, models=None):
+        errors = ModelRegistry.check(models)
+        for error in errors:
+            cls._logger.error(error)
+        if errors:
+            raise ValueError("Relações não resolvidas:\n" + "\n".join(errors))
+
+    @classmethod
+    def create_tables(cls, models=None, concurrently=False):
+        if models is None:
+            models = ModelRegistry.get_all_models()
+        cls.check_models(models)
+        with cls.connection() as conn:
             try:
-                cursor.execute(fk_sql)
+                plan = cls._create_tables(conn, models, concurrently)
             except Exception as e:
-                cls._logger.error(f"Erro ao adicionar chave estrangeira: {str(e)}")
\ No newline at end of file
+                print(f"Erro ao criar tabelas: {e}")
+                conn.rollback()
+                return
+
+            if plan.concurrent_indexes:
+                try:
+                    cls._create_indexes_concurrently(conn, plan.concurrent_indexes)
+                except Exception as e:
+                    cls._logger.error(f"Erro ao criar índices: {e}")
+            return plan
+
+    @classmethod
+    def _create_tables(cls, conn, models, concurrently=False):
+        from modules.database.schema import SchemaSnapshot, plan_schema
+
+        with conn.cursor() as cursor:
+            snapshot = SchemaSnapshot.load(cursor)
+            plan = plan_schema(snapshot, models, concurrently=concurrently)
+            statements = plan.statements
+            if statements:
+                cls._logger.info(f"Aplicando {len(statements)} comandos de schema")
+                # Um único lote: ou o schema inteiro é aplicado, ou nada é
+                cursor.execute(";\n".join(statements))
+        conn.commit()
+        return plan
+
+    @classmethod
+    def _create_indexes_concurrently(cls, conn, statements):
+        # CREATE INDEX CONCURRENTLY não roda dentro de transação
+        autocommit = conn.autocommit
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+        finally:
+            conn.autocommit = autocommit
+
+
+def atomic(handler):
+    """Executa o handler dentro de DB.transaction(); respostas 5xx também desfazem as escritas."""
+
+    class _Rollback(Exception):
+        pass
+
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        result = None
+        try:
+            with DB.transaction():
+                result = handler(*args, **kwargs)
+                if str(getattr(result, "status", "")).startswith("5"):
+                    raise _Rollback()
+        except _Rollback:
+            pass
+        return result
+    return wrapper
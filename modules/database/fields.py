@@ -2,9 +2,11 @@ from abc import ABC, abstractmethod
 from datetime import date
 
 class AbstractField(ABC):
-    def __init__(self, required=False, unique=False):
+    def __init__(self, required=False, unique=False, index=None):
         self.required = required
         self.unique = unique
+        # None deixa o padrão do tipo de campo: só chaves estrangeiras são indexadas
+        self.index = index
     
     def validate(self, value):
         if self.required and value is None:
@@ -16,11 +18,20 @@ class AbstractField(ABC):
         pass
 
 class Field(AbstractField):
-    def __init__(self, required=False, unique=False):
-        super().__init__(required=required, unique=unique)
-    
+    def __init__(self, required=False, unique=False, index=None):
+        super().__init__(required=required, unique=unique, index=index)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return None
+
     def validate(self, value):
         super().validate(value)
+
+    def from_json(self, value):
+        """Converte o valor lido de um json_agg de volta ao tipo do campo."""
+        return value
     
     def get_sql_definition(self):
         return "VARCHAR(255)"  # Implementação padrão
@@ -74,6 +85,9 @@ class DateField(Field):
         super().validate(value)
         if value is not None and not isinstance(value, date):
             raise ValueError(f"Valor deve ser uma data")
+
+    def from_json(self, value):
+        return date.fromisoformat(value) if isinstance(value, str) else value
     
     def get_sql_definition(self):
         return "DATE"
\ No newline at end of file
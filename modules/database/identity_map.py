@@ -0,0 +1,74 @@
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current_map = ContextVar("identity_map", default=None)
+
+
+class IdentityMap:
+    """Garante uma única instância por (modelo, id) dentro de uma unidade de trabalho."""
+
+    def __init__(self):
+        self._instances = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model, id):
+        instance = self._instances.get((model, id))
+        if instance is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return instance
+
+    def add(self, instance):
+        id = getattr(instance, "id", None)
+        if id is not None:
+            self._instances[(type(instance), id)] = instance
+        return instance
+
+    def remove(self, instance):
+        self._instances.pop((type(instance), getattr(instance, "id", None)), None)
+
+    def clear(self):
+        self._instances.clear()
+
+    def __contains__(self, key):
+        return key in self._instances
+
+    def __len__(self):
+        return len(self._instances)
+
+
+def current_identity_map():
+    return _current_map.get()
+
+
+@contextmanager
+def session():
+    """Abre uma unidade de trabalho; sessões aninhadas reaproveitam o mapa externo."""
+    identity_map = _current_map.get()
+    if identity_map is not None:
+        yield identity_map
+        return
+
+    token = _current_map.set(IdentityMap())
+    try:
+        yield _current_map.get()
+    finally:
+        _current_map.reset(token)
+
+
+class IdentityMapMiddleware:
+    """Middleware do Router que abre um mapa de identidade por requisição."""
+
+    def process_request(self, request):
+        request.identity_map_token = _current_map.set(IdentityMap())
+        return request
+
+    def process_response(self, request, response):
+        token = getattr(request, "identity_map_token", None)
+        if token is not None:
+            _current_map.reset(token)
+            request.identity_map_token = None
+        return response
@@ -0,0 +1,65 @@
+import hashlib
+
+MAX_IDENTIFIER_LENGTH = 63
+
+
+def index_name(prefix, table, columns):
+    name = f"{prefix}_{table}_{'_'.join(columns)}"
+    if len(name) <= MAX_IDENTIFIER_LENGTH:
+        return name
+    # Nomes longos seriam truncados pelo PostgreSQL; um sufixo de hash evita colisões
+    digest = hashlib.md5(name.encode("utf-8")).hexdigest()[:8]
+    return f"{name[:MAX_IDENTIFIER_LENGTH - 9]}_{digest}"
+
+
+class Index:
+    """Índice declarado em Meta.indexes; aceita índices compostos, parciais e de cobertura."""
+
+    def __init__(self, *fields, name=None, unique=False, where=None, include=(), method=None):
+        if not fields:
+            raise ValueError("Index exige ao menos um campo")
+        self.fields = fields
+        self.name = name
+        self.unique = unique
+        self.where = where
+        self.include = tuple(include)
+        self.method = method
+
+    def _column(self, model, field):
+        if field == "id":
+            return "id"
+        return model._resolve_column(field)[0]
+
+    def get_name(self, model):
+        if self.name:
+            return self.name
+        columns = [self._column(model, field.lstrip("-")) for field in self.fields]
+        return index_name("ux" if self.unique else "ix", model.__tablename__, columns)
+
+    def get_sql(self, model, concurrently=False):
+        columns = []
+        for field in self.fields:
+            column = self._column(model, field.lstrip("-"))
+            columns.append(f"{column} DESC" if field.startswith("-") else column)
+
+        parts = ["CREATE"]
+        if self.unique:
+            parts.append("UNIQUE")
+        parts.append("INDEX")
+        if concurrently:
+            parts.append("CONCURRENTLY")
+        parts.append(f"IF NOT EXISTS {self.get_name(model)} ON {model.__tablename__}")
+        if self.method:
+            parts.append(f"USING {self.method}")
+        parts.append(f"({', '.join(columns)})")
+        if self.include:
+            parts.append(f"INCLUDE ({', '.join(self._column(model, field) for field in self.include)})")
+        if self.where:
+            parts.append(f"WHERE {self.where}")
+        return " ".join(parts)
+
+    def __eq__(self, other):
+        return isinstance(other, Index) and vars(self) == vars(other)
+
+    def __repr__(self):
+        return f"Index({', '.join(map(repr, self.fields))}, name={self.name!r})"
@@ -0,0 +1,134 @@
+import argparse
+import importlib
+import importlib.util
+import os
+import re
+from modules.utils.logger import Logger
+from modules.database.abstract.migration import MigrationManager
+from modules.database.operations import RunSQL
+
+_logger = Logger("Migrations")
+
+_FILE_PATTERN = re.compile(r"^(\d{4})_\w+\.py$")
+
+TEMPLATE = '''from modules.database.abstract.migration import Migration as BaseMigration
+from modules.database.operations import RunSQL
+
+
+class Migration(BaseMigration):
+    operations = [
+{operations}
+    ]
+'''
+
+
+def _migration_files(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if _FILE_PATTERN.match(name))
+
+
+def load_migrations(directory="migrations"):
+    """Lista ordenada de (nome, migração) a partir dos arquivos do diretório."""
+    migrations = []
+    for filename in _migration_files(directory):
+        name = filename[:-3]
+        spec = importlib.util.spec_from_file_location(f"_migration_{name}", os.path.join(directory, filename))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        migrations.append((name, module.Migration()))
+    return migrations
+
+
+def render_migration(operations):
+    lines = "\n".join(f"        {operation!r}," for operation in operations)
+    return TEMPLATE.format(operations=lines)
+
+
+def _write(directory, number, name, operations):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{number:04d}_{name}.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_migration(operations))
+    _logger.info(f"Migração criada: {path} ({len(operations)} operações)")
+    return path
+
+
+def plan_operations(plan):
+    atomic = [RunSQL(statement, reverse_sql=plan.reverse.get(statement)) for statement in plan.statements]
+    concurrent = [
+        RunSQL(statement, reverse_sql=plan.reverse.get(statement), atomic=False)
+        for statement in plan.concurrent_indexes
+    ]
+    return atomic, concurrent
+
+
+def make_migrations(directory="migrations", models=None, name="auto", concurrently=False, manager=None):
+    """Compara os modelos com o schema do banco e grava o DDL que falta como migração."""
+    from modules.database.db import DB
+    from modules.database.abstract.model_register import ModelRegistry
+    from modules.database.schema import SchemaSnapshot, plan_schema
+
+    manager = manager or MigrationManager()
+    applied = manager.get_applied_migrations()
+    pending = [migration for migration, _ in load_migrations(directory) if migration not in applied]
+    if pending:
+        # O schema ao vivo ainda não reflete essas migrações; gerar agora duplicaria o DDL
+        raise RuntimeError(f"Há migrações pendentes: {', '.join(pending)}; aplique-as antes de gerar novas")
+
+    if models is None:
+        models = ModelRegistry.get_all_models()
+    with DB.connection() as conn:
+        with conn.cursor() as cursor:
+            snapshot = SchemaSnapshot.load(cursor)
+        conn.commit()
+
+    atomic, concurrent = plan_operations(plan_schema(snapshot, models, concurrently=concurrently))
+    if not atomic and not concurrent:
+        _logger.info("Nenhuma alteração detectada")
+        return []
+
+    files = _migration_files(directory)
+    number = int(files[-1][:4]) + 1 if files else 1
+    paths = []
+    if atomic:
+        paths.append(_write(directory, number, name, atomic))
+        number += 1
+    if concurrent:
+        # Índices concorrentes ficam em uma migração própria, aplicada fora de transação
+        paths.append(_write(directory, number, f"{name}_indexes", concurrent))
+    return paths
+
+
+def migrate(directory="migrations", manager=None):
+    manager = manager or MigrationManager()
+    applied = manager.migrate(load_migrations(directory))
+    if not applied:
+        _logger.info("Nenhuma migração pendente")
+    return applied
+
+
+def main(argv=None):
+    from modules.database.db import DB
+
+    parser = argparse.ArgumentParser(description="Gera e aplica migrações a partir dos modelos")
+    parser.add_argument("command", choices=["makemigrations", "migrate"])
+    parser.add_argument("--dir", default="migrations", help="diretório das migrações")
+    parser.add_argument("--models", default="src.main", help="módulo que declara os modelos")
+    parser.add_argument("--name", default="auto", help="sufixo do arquivo gerado")
+    parser.add_argument("--concurrently", action="store_true", help="gera índices com CREATE INDEX CONCURRENTLY")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--database", default="teste")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", default="admin")
+    args = parser.parse_args(argv)
+
+    DB.connect(args.host, args.database, args.user, args.password)
+    if args.command == "makemigrations":
+        importlib.import_module(args.models)
+        return make_migrations(args.dir, name=args.name, concurrently=args.concurrently)
+    return migrate(args.dir)
+
+
+if __name__ == "__main__":
+    main()
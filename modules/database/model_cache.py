@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ModelCache:
+    """Cache LRU com TTL das linhas de um modelo, compartilhado entre requisições."""
+
+    def __init__(self, ttl=60, max_entries=10000):
+        if max_entries < 1:
+            raise ValueError("max_entries deve ser maior que zero")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._keys_by_id = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, field, value):
+        key = (field, value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, row = entry
+            if self.ttl is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(row)
+
+    def set(self, field, value, row):
+        id = row.get("id")
+        if id is None:
+            return
+        key = (field, value)
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires_at, dict(row))
+            self._keys_by_id.setdefault(id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, id):
+        with self._lock:
+            keys = self._keys_by_id.pop(id, ())
+            for key in keys:
+                self._entries.pop(key, None)
+            if keys:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_id.clear()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        id = entry[1].get("id")
+        keys = self._keys_by_id.get(id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_id[id]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,194 @@
+import hashlib
+import time
+from modules.utils.logger import Logger
+
+
+class Operation:
+    """Passo de uma migração."""
+
+    # Operações não atômicas rodam fora de transação (autocommit)
+    atomic = True
+    reversible = True
+
+    def forwards(self, connection):
+        raise NotImplementedError
+
+    def backwards(self, connection):
+        raise NotImplementedError(f"{self!r} não pode ser revertida")
+
+    def describe(self):
+        return repr(self)
+
+
+class RunSQL(Operation):
+    """Executa SQL bruto; reverse_sql desfaz o comando na reversão."""
+
+    def __init__(self, sql, reverse_sql=None, atomic=True):
+        self.sql = sql
+        self.reverse_sql = reverse_sql
+        self.atomic = atomic
+
+    @property
+    def reversible(self):
+        return self.reverse_sql is not None
+
+    def _run(self, connection, statement):
+        with connection.cursor() as cursor:
+            cursor.execute(statement)
+
+    def forwards(self, connection):
+        self._run(connection, self.sql)
+
+    def backwards(self, connection):
+        if self.reverse_sql is None:
+            return super().backwards(connection)
+        self._run(connection, self.reverse_sql)
+
+    def describe(self):
+        return self.sql.split("(")[0].strip()
+
+    def __repr__(self):
+        args = [repr(self.sql)]
+        if self.reverse_sql is not None:
+            args.append(f"reverse_sql={self.reverse_sql!r}")
+        if not self.atomic:
+            args.append("atomic=False")
+        return f"RunSQL({', '.join(args)})"
+
+    def __eq__(self, other):
+        return isinstance(other, RunSQL) and vars(self) == vars(other)
+
+
+class Backfill(Operation):
+    """Atualiza uma tabela grande em faixas de id, com um commit por lote.
+
+    O último id processado fica salvo na tabela migrations; uma execução
+    interrompida recomeça de onde parou. rows_per_second limita a vazão e
+    max_lag pausa enquanto o atraso das réplicas passar do limite (segundos).
+    """
+
+    atomic = False
+
+    LAG_QUERY = "SELECT COALESCE(EXTRACT(EPOCH FROM max(replay_lag)), 0) FROM pg_stat_replication"
+
+    def __init__(self, table, set_sql, where=None, batch_size=1000, rows_per_second=None,
+                 max_lag=None, lag_pause=1.0, reverse_set_sql=None, name=None, on_progress=None):
+        if batch_size <= 0:
+            raise ValueError("batch_size deve ser positivo")
+        self.table = table
+        self.set_sql = set_sql
+        self.where = where
+        self.batch_size = batch_size
+        self.rows_per_second = rows_per_second
+        self.max_lag = max_lag
+        self.lag_pause = lag_pause
+        self.reverse_set_sql = reverse_set_sql
+        self.name = name
+        self.on_progress = on_progress
+        self._logger = Logger("Backfill")
+
+    @property
+    def reversible(self):
+        return self.reverse_set_sql is not None
+
+    @property
+    def checkpoint_name(self):
+        if self.name:
+            return f"backfill:{self.name}"
+        digest = hashlib.md5(f"{self.set_sql}|{self.where}".encode("utf-8")).hexdigest()[:8]
+        return f"backfill:{self.table}:{digest}"
+
+    def _load_checkpoint(self, cursor, name):
+        cursor.execute("SELECT checkpoint FROM migrations WHERE name = %s AND applied_at IS NULL", (name,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _wait_for_replicas(self, cursor):
+        while True:
+            cursor.execute(self.LAG_QUERY)
+            lag = float(cursor.fetchone()[0] or 0)
+            if lag <= self.max_lag:
+                return
+            self._logger.info(f"Atraso de réplica {lag:.1f}s acima de {self.max_lag}s; aguardando")
+            time.sleep(self.lag_pause)
+
+    def _run(self, connection, set_sql, name):
+        autocommit = connection.autocommit
+        connection.autocommit = False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT min(id), max(id) FROM {self.table}")
+                first, last = cursor.fetchone()
+                checkpoint = self._load_checkpoint(cursor, name)
+                connection.commit()
+                if first is None:
+                    return 0
+
+                start = first if checkpoint is None else checkpoint + 1
+                if checkpoint is not None:
+                    self._logger.info(f"Retomando backfill de {self.table} a partir do id {start}")
+                condition = f" AND ({self.where})" if self.where else ""
+                update = f"UPDATE {self.table} SET {set_sql} WHERE id BETWEEN %s AND %s{condition}"
+                total = last - first + 1
+                updated = 0
+                started = time.monotonic()
+
+                while start <= last:
+                    end = min(start + self.batch_size - 1, last)
+                    cursor.execute(update, (start, end))
+                    updated += max(cursor.rowcount, 0)
+                    # Lote e checkpoint no mesmo commit: retomar nunca repete nem pula linhas
+                    cursor.execute(
+                        "INSERT INTO migrations (name, applied_at, checkpoint) VALUES (%s, NULL, %s) "
+                        "ON CONFLICT (name) DO UPDATE SET checkpoint = EXCLUDED.checkpoint",
+                        (name, end),
+                    )
+                    connection.commit()
+
+                    done = end - first + 1
+                    elapsed = time.monotonic() - started
+                    self._logger.info(
+                        f"Backfill {self.table}: {done}/{total} ids ({done * 100 // total}%), "
+                        f"{updated} linhas, {updated / elapsed if elapsed else 0:.0f} linhas/s"
+                    )
+                    if self.on_progress is not None:
+                        self.on_progress(done, total, updated)
+
+                    if self.rows_per_second:
+                        delay = updated / self.rows_per_second - (time.monotonic() - started)
+                        if delay > 0:
+                            time.sleep(delay)
+                    if self.max_lag is not None:
+                        self._wait_for_replicas(cursor)
+                        connection.commit()
+                    start = end + 1
+
+                cursor.execute("DELETE FROM migrations WHERE name = %s", (name,))
+                connection.commit()
+                return updated
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.autocommit = autocommit
+
+    def forwards(self, connection):
+        return self._run(connection, self.set_sql, self.checkpoint_name)
+
+    def backwards(self, connection):
+        if self.reverse_set_sql is None:
+            return super().backwards(connection)
+        return self._run(connection, self.reverse_set_sql, f"{self.checkpoint_name}:reverse")
+
+    def describe(self):
+        return f"Backfill {self.table}"
+
+    def __repr__(self):
+        args = [repr(self.table), repr(self.set_sql)]
+        for key in ("where", "reverse_set_sql", "name"):
+            if getattr(self, key) is not None:
+                args.append(f"{key}={getattr(self, key)!r}")
+        for key, default in (("batch_size", 1000), ("rows_per_second", None), ("max_lag", None), ("lag_pause", 1.0)):
+            if getattr(self, key) != default:
+                args.append(f"{key}={getattr(self, key)!r}")
+        return f"Backfill({', '.join(args)})"
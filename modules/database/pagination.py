@@ -0,0 +1,48 @@
+import base64
+import binascii
+import json
+
+
+def encode_cursor(values):
+    payload = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError) as e:
+        raise ValueError("Cursor de paginação inválido") from e
+    if not isinstance(values, list):
+        raise ValueError("Cursor de paginação inválido")
+    return values
+
+
+class Page:
+    """Página de resultados paginada por chave (keyset)."""
+
+    def __init__(self, items, next_cursor, size):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.size = size
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def to_dict(self):
+        return {
+            "items": self.items,
+            "next_cursor": self.next_cursor,
+            "has_next": self.has_next,
+        }
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __repr__(self):
+        return f"<Page {len(self.items)} itens, next_cursor={self.next_cursor!r}>"
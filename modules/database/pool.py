@@ -0,0 +1,226 @@
+import threading
+import time
+from contextlib import contextmanager
+from psycopg2 import extensions
+from modules.utils.logger import Logger
+from modules.database.connection import DatabaseError
+
+
+class PoolTimeoutError(DatabaseError):
+    pass
+
+
+class ConnectionPool:
+    """Pool de conexões thread-safe com empréstimo por thread."""
+
+    def __init__(self, connect, min_size=1, max_size=10, timeout=30.0,
+                 max_idle=300.0, health_check_interval=30.0):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Tamanhos do pool inválidos: exige 0 <= min_size <= max_size e max_size >= 1")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+
+        self._idle = []
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._logger = Logger("ConnectionPool")
+
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+
+        for _ in range(min_size):
+            conn = self._new_connection()
+            self._size += 1
+            self._idle.append((conn, time.monotonic()))
+
+    def _new_connection(self):
+        conn = self._connect()
+        with self._cond:
+            self._created += 1
+        return conn
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception as e:
+            self._logger.warning(f"Erro ao fechar conexão do pool: {e}")
+
+    def _is_healthy(self, conn, last_used):
+        if conn.closed:
+            return False
+        if self.health_check_interval is None:
+            return True
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception as e:
+            self._logger.warning(f"Conexão ociosa falhou na verificação de saúde: {e}")
+            return False
+
+    def getconn(self):
+        started = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise DatabaseError("Pool de conexões encerrado")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._size < self.max_size:
+                    conn, last_used = None, None
+                    self._size += 1
+                    self._in_use += 1
+                    break
+
+                now = time.monotonic()
+                if started is None:
+                    started = now
+                    self._waits += 1
+                remaining = started + self.timeout - now
+                if remaining <= 0:
+                    self._timeouts += 1
+                    self._wait_time += now - started
+                    raise PoolTimeoutError(
+                        f"Tempo de espera por conexão esgotado após {self.timeout}s "
+                        f"({self._in_use}/{self.max_size} em uso)"
+                    )
+                self._cond.wait(remaining)
+
+            if started is not None:
+                self._wait_time += time.monotonic() - started
+
+        try:
+            if conn is None:
+                conn = self._new_connection()
+            elif not self._is_healthy(conn, last_used):
+                self._close_quietly(conn)
+                with self._cond:
+                    self._discarded += 1
+                conn = self._new_connection()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def putconn(self, conn, discard=False):
+        if not discard:
+            if conn.closed:
+                discard = True
+            else:
+                try:
+                    status = conn.get_transaction_status()
+                    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                        discard = True
+                    elif status != extensions.TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                except Exception as e:
+                    self._logger.warning(f"Descartando conexão em estado inválido: {e}")
+                    discard = True
+
+        if discard:
+            self._close_quietly(conn)
+
+        to_close = []
+        with self._cond:
+            self._in_use -= 1
+            if discard:
+                self._size -= 1
+                self._discarded += 1
+            elif self._closed:
+                self._size -= 1
+                to_close.append(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+                to_close.extend(self._collect_idle_locked())
+            self._cond.notify()
+
+        for idle_conn in to_close:
+            self._close_quietly(idle_conn)
+
+    def _collect_idle_locked(self):
+        if self.max_idle is None:
+            return []
+        now = time.monotonic()
+        reaped = []
+        while self._size > self.min_size and self._idle:
+            conn, last_used = self._idle[0]
+            if now - last_used < self.max_idle:
+                break
+            self._idle.pop(0)
+            self._size -= 1
+            self._discarded += 1
+            reaped.append(conn)
+        return reaped
+
+    def reap_idle(self):
+        """Fecha conexões ociosas há mais de max_idle segundos, preservando min_size."""
+        with self._cond:
+            reaped = self._collect_idle_locked()
+        for conn in reaped:
+            self._close_quietly(conn)
+        return len(reaped)
+
+    def current(self):
+        return getattr(self._local, "conn", None)
+
+    @contextmanager
+    def connection(self):
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = self.getconn()
+            local.conn = conn
+            local.depth = 0
+        local.depth += 1
+        try:
+            yield conn
+        finally:
+            # Geradores podem sair fora de ordem; só o último empréstimo devolve a conexão
+            local.depth -= 1
+            if local.depth == 0:
+                local.conn = None
+                self.putconn(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "waits": self._waits,
+                "wait_time": self._wait_time,
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "discarded": self._discarded,
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._size -= len(idle)
+            self._idle = []
+            self._cond.notify_all()
+        for conn in idle:
+            self._close_quietly(conn)
@@ -1,87 +1,463 @@
+import copy
 from psycopg2 import sql
 from typing import Type, List, Any, Optional, Dict, Union
 from contextlib import contextmanager
-from modules.database import DatabaseConnection
+
 
 class QueryBuilder:
     def __init__(self, model_class):
         self.model = model_class
-        self._query = []
+        self._columns = None
+        self._where = []
         self._params = []
-        self._table_name = getattr(model_class, '_table_name', model_class.__name__.lower())
+        self._table_name = getattr(model_class, '__tablename__', model_class.__name__.lower())
         self._joins = []
+        self._related = []
+        self._prefetch = []
+        self._annotations = []
         self._group_by = None
-        self._having = None
+        self._having = []
+        self._having_params = []
+        self._order_by = []
+        self._limit = None
+        self._offset = None
+
+    def clone(self):
+        clone = copy.copy(self)
+        clone._columns = list(self._columns) if self._columns is not None else None
+        clone._where = list(self._where)
+        clone._params = list(self._params)
+        clone._joins = list(self._joins)
+        clone._related = list(self._related)
+        clone._prefetch = list(self._prefetch)
+        clone._order_by = list(self._order_by)
+        clone._annotations = list(self._annotations)
+        clone._having = list(self._having)
+        clone._having_params = list(self._having_params)
+        return clone
+
+    def _resolve_column(self, field, value=None):
+        from modules.database.relationships import OneToOneField, ForeignKey
+
+        if isinstance(getattr(self.model, "_fields", {}).get(field), (OneToOneField, ForeignKey)):
+            field = f"{field}_id"
+            if hasattr(value, "_fields"):
+                value = getattr(value, "id", None)
+        return field, value
+
+    def _conditions(self, conditions):
+        parts = []
+        params = []
+        for field, value in conditions.items():
+            column, value = self._resolve_column(field, value)
+            identifier = sql.Identifier(self._table_name, column)
+            if isinstance(value, tuple) and len(value) == 2:
+                operator, val = value
+                parts.append(sql.SQL("{} {} %s").format(identifier, sql.SQL(operator)))
+                params.append(val)
+            elif value is None:
+                parts.append(sql.SQL("{} IS NULL").format(identifier))
+            else:
+                parts.append(sql.SQL("{} = %s").format(identifier))
+                params.append(value)
+        return parts, params
 
     def select(self, *columns):
-        if not columns:
-            columns = ('*',)
-        self._query.append(sql.SQL("SELECT {} FROM {}").format(
-            sql.SQL(', ').join(map(sql.Identifier, columns)),
-            sql.Identifier(self._table_name)
-        ))
+        if not columns or columns == ('*',):
+            self._columns = None
+        else:
+            self._columns = list(columns)
         return self
 
     def where(self, **conditions):
         if not conditions:
             return self
-            
-        where_parts = []
-        for field, value in conditions.items():
-            if isinstance(value, tuple) and len(value) == 2:
-                operator, val = value
-                where_parts.append(sql.SQL("{} {} %s").format(
-                    sql.Identifier(field), sql.SQL(operator)
-                ))
-                self._params.append(val)
-            else:
-                where_parts.append(sql.SQL("{} = %s").format(sql.Identifier(field)))
-                self._params.append(value)
-                
-        self._query.append(sql.SQL("WHERE {}").format(
-            sql.SQL(" AND ").join(where_parts)
-        ))
+
+        parts, params = self._conditions(conditions)
+        self._where.extend(parts)
+        self._params.extend(params)
+        return self
+
+    def where_not(self, **conditions):
+        if not conditions:
+            return self
+
+        parts, params = self._conditions(conditions)
+        self._where.append(sql.SQL("NOT ({})").format(sql.SQL(" AND ").join(parts)))
+        self._params.extend(params)
         return self
 
     def where_raw(self, condition: str, *params):
-        self._query.append(sql.SQL("WHERE {}").format(sql.SQL(condition)))
+        self._where.append(sql.SQL(condition))
         self._params.extend(params)
         return self
 
+    def _typed_placeholder(self, field):
+        from modules.database.relationships import OneToOneField, ForeignKey
+
+        model_field = getattr(self.model, "_fields", {}).get(field)
+        if field == "id" or isinstance(model_field, (OneToOneField, ForeignKey)):
+            return sql.SQL("%s::INTEGER")
+        if model_field is None:
+            return sql.SQL("%s")
+        return sql.SQL("%s::" + model_field.get_sql_definition())
+
+    def where_after(self, fields, values, descending=False):
+        columns = [sql.Identifier(self._table_name, self._resolve_column(field)[0]) for field in fields]
+        # Sem o cast, uma coluna REAL seria comparada a um numeric e o empate no limite da página se perderia
+        self._where.append(sql.SQL("({}) {} ({})").format(
+            sql.SQL(", ").join(columns),
+            sql.SQL("<" if descending else ">"),
+            sql.SQL(", ").join(self._typed_placeholder(field) for field in fields)
+        ))
+        self._params.extend(values)
+        return self
+
+    def order_by(self, *fields):
+        for field in fields:
+            descending = field.startswith("-")
+            name = field.lstrip("-")
+            if self._has_annotation(name):
+                identifier = sql.Identifier(name)
+            else:
+                identifier = sql.Identifier(self._table_name, self._resolve_column(name)[0])
+            self._order_by.append(sql.SQL("{} DESC" if descending else "{} ASC").format(identifier))
+        return self
+
     def limit(self, count: int):
-        self._query.append(sql.SQL("LIMIT {}").format(sql.Literal(count)))
-        return self 
+        self._limit = count
+        return self
+
+    def offset(self, count: int):
+        self._offset = count
+        return self
+
+    def annotate(self, **annotations):
+        for alias, aggregate in annotations.items():
+            if self._has_annotation(alias):
+                raise ValueError(f"Anotação {alias} já definida")
+            self._annotations.append((alias, aggregate))
+        return self
+
+    def _has_annotation(self, alias):
+        return any(name == alias for name, _ in self._annotations)
+
+    def _annotation(self, alias):
+        for name, aggregate in self._annotations:
+            if name == alias:
+                return aggregate
+        raise ValueError(f"Anotação {alias} não definida")
+
+    def group_by(self, *fields):
+        columns = [
+            sql.Identifier(self._table_name, "id" if field == "id" else self._resolve_column(field)[0])
+            for field in fields
+        ]
+        self._group_by = sql.SQL("GROUP BY {}").format(sql.SQL(", ").join(columns))
+        return self
+
+    def having(self, **conditions):
+        for alias, value in conditions.items():
+            operator = "="
+            if isinstance(value, tuple) and len(value) == 2:
+                operator, value = value
+            self._having.append(sql.SQL("{} {} %s").format(
+                self._annotation(alias).as_sql(self), sql.SQL(operator)
+            ))
+            self._having_params.append(value)
+        return self
+
+    def select_related(self, *paths):
+        for path in paths:
+            if path not in self._related:
+                self._related.append(path)
+        return self
+
+    def prefetch_related(self, *names):
+        for name in names:
+            if name not in self._prefetch:
+                self._prefetch.append(name)
+        return self
+
+    def _resolve_joins(self):
+        from modules.database.relationships import OneToOneField, ForeignKey
+
+        joins = []
+        seen = {}
+        for path in self._related:
+            model = self.model
+            parent_path = None
+            prefix = []
+            for attr in path.split("__"):
+                prefix.append(attr)
+                key = "__".join(prefix)
+                if key not in seen:
+                    field = model._fields.get(attr)
+                    if not isinstance(field, (OneToOneField, ForeignKey)):
+                        raise ValueError(
+                            f"select_related: {attr} não é ForeignKey/OneToOneField de {model.__name__}"
+                        )
+                    seen[key] = (field.get_related_model(), parent_path, attr)
+                    joins.append(key)
+                model = seen[key][0]
+                parent_path = key
+        return [(key,) + seen[key] for key in joins]
+
+    def _alias(self, path):
+        if path is None:
+            return self._table_name
+        return f"r_{path}"
+
+    def _build_select_list(self, joins):
+        if self._columns is None:
+            columns = [sql.SQL("{}.*").format(sql.Identifier(self._table_name))]
+        else:
+            columns = [sql.Identifier(self._table_name, column) for column in self._columns]
+
+        for path, related_model, _, _ in joins:
+            for column in related_model._column_names():
+                columns.append(sql.SQL("{} AS {}").format(
+                    sql.Identifier(self._alias(path), column),
+                    sql.Identifier(f"{path}__{column}")
+                ))
+
+        for alias, aggregate in self._annotations:
+            columns.append(sql.SQL("{} AS {}").format(aggregate.as_sql(self), sql.Identifier(alias)))
+        return sql.SQL(", ").join(columns)
+
+    def _build_from(self, joins):
+        query = [sql.SQL("FROM {}").format(sql.Identifier(self._table_name))]
+
+        for path, related_model, parent_path, attr in joins:
+            query.append(sql.SQL("LEFT JOIN {} AS {} ON {} = {}").format(
+                sql.Identifier(related_model.__tablename__),
+                sql.Identifier(self._alias(path)),
+                sql.Identifier(self._alias(path), "id"),
+                sql.Identifier(self._alias(parent_path), f"{attr}_id")
+            ))
+        query.extend(self._joins)
+
+        if self._where:
+            query.append(sql.SQL("WHERE {}").format(sql.SQL(" AND ").join(self._where)))
+        return query
+
+    def _build_group_by(self, joins):
+        if self._group_by is not None or not self._annotations:
+            return self._group_by
+
+        # Agrupar pela chave primária libera as demais colunas da tabela
+        if self._columns is None:
+            columns = [sql.Identifier(self._table_name, "id")]
+        else:
+            columns = [sql.Identifier(self._table_name, column) for column in self._columns]
+        for path, _, _, _ in joins:
+            columns.append(sql.Identifier(self._alias(path), "id"))
+        return sql.SQL("GROUP BY {}").format(sql.SQL(", ").join(columns))
+
+    def _is_simple(self):
+        return (
+            self._limit is None and not self._offset
+            and not self._annotations and self._group_by is None
+        )
 
     def build(self) -> tuple:
+        joins = self._resolve_joins()
+
+        query = [sql.SQL("SELECT {}").format(self._build_select_list(joins))]
+        query.extend(self._build_from(joins))
 
-        if self._joins:
-            self._query[1:1] = self._joins
-            
-        if self._group_by:
-            self._query.append(self._group_by)
+        group_by = self._build_group_by(joins)
+        if group_by is not None:
+            query.append(group_by)
         if self._having:
-            self._query.append(self._having)
-            
-        full_query = sql.SQL(' ').join(self._query)
-        return full_query, self._params
+            query.append(sql.SQL("HAVING {}").format(sql.SQL(" AND ").join(self._having)))
+        if self._order_by:
+            query.append(sql.SQL("ORDER BY {}").format(sql.SQL(", ").join(self._order_by)))
+        if self._limit is not None:
+            query.append(sql.SQL("LIMIT {}").format(sql.Literal(self._limit)))
+        if self._offset:
+            query.append(sql.SQL("OFFSET {}").format(sql.Literal(self._offset)))
+
+        full_query = sql.SQL(' ').join(query)
+        return full_query, self._params + self._having_params
+
+    def count_query(self):
+        builder = self.clone()
+        builder._related = []
+        builder._prefetch = []
+        if builder._is_simple():
+            query = [sql.SQL("SELECT COUNT(*)")] + builder._build_from([])
+            return sql.SQL(" ").join(query), builder._params
+
+        inner, params = builder.build()
+        return sql.SQL("SELECT COUNT(*) FROM ({}) AS {}").format(inner, sql.Identifier("_sub")), params
+
+    def aggregate_query(self, aggregates):
+        builder = self.clone()
+        builder._related = []
+        builder._prefetch = []
+        if builder._is_simple():
+            select = sql.SQL(", ").join(
+                sql.SQL("{} AS {}").format(aggregate.as_sql(builder), sql.Identifier(alias))
+                for alias, aggregate in aggregates.items()
+            )
+            query = [sql.SQL("SELECT {}").format(select)] + builder._build_from([])
+            return sql.SQL(" ").join(query), builder._params
+
+        # Consultas fatiadas ou agrupadas são agregadas como subconsulta
+        inner, params = builder.build()
+        select = sql.SQL(", ").join(
+            sql.SQL("{} AS {}").format(aggregate.as_sql(builder, table="_sub"), sql.Identifier(alias))
+            for alias, aggregate in aggregates.items()
+        )
+        return sql.SQL("SELECT {} FROM ({}) AS {}").format(select, inner, sql.Identifier("_sub")), params
+
+    def _fetch_one(self, query, params):
+        from modules.database.db import DB
+
+        def fetch(connection):
+            with connection.get_cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchone()
+
+        return DB.run_read(fetch)
+
+    async def _afetch_one(self, query, params):
+        from modules.database.async_db import AsyncDB
+
+        rows = await AsyncDB.execute_query(query, params, as_dicts=False)
+        return rows[0]
+
+    def count(self):
+        return self._fetch_one(*self.count_query())[0]
+
+    async def acount(self):
+        return (await self._afetch_one(*self.count_query()))[0]
+
+    def aggregate(self, aggregates):
+        return dict(zip(aggregates, self._fetch_one(*self.aggregate_query(aggregates))))
+
+    async def aaggregate(self, aggregates):
+        return dict(zip(aggregates, await self._afetch_one(*self.aggregate_query(aggregates))))
 
     def execute(self):
-        db = DatabaseConnection()
-        with db.get_cursor() as cursor:
-            query, params = self.build()
-            cursor.execute(query, params)
-            return cursor
+        from modules.database.db import DB
+
+        query, params = self.build()
+
+        def fetch(connection):
+            with connection.get_cursor() as cursor:
+                cursor.execute(query, params)
+                if cursor.description is None:
+                    return cursor.rowcount
+                columns = [desc[0] for desc in cursor.description]
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        return DB.run_read(fetch)
+
+    async def aexecute(self):
+        from modules.database.async_db import AsyncDB
+
+        query, params = self.build()
+        return await AsyncDB.execute_query(query, params)
+
+    def execute_tuples(self):
+        from modules.database.db import DB
+
+        query, params = self.build()
+
+        def fetch(connection):
+            with connection.get_cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+
+        return DB.run_read(fetch)
+
+    async def aexecute_tuples(self):
+        from modules.database.async_db import AsyncDB
+
+        query, params = self.build()
+        return await AsyncDB.execute_query(query, params, as_dicts=False)
+
+    def iterate_tuples(self, batch_size=2000):
+        from modules.database.db import DB
+
+        query, params = self.build()
+        yield from DB.read_connection().iterate_query(query, params, batch_size, as_dicts=False)
+
+    async def aiterate_tuples(self, batch_size=2000):
+        from modules.database.async_db import AsyncDB
+
+        query, params = self.build()
+        async for rows in AsyncDB.iterate_query(query, params, batch_size, as_dicts=False):
+            yield rows
+
+    def _hydrate_related(self, row, joins):
+        base_row = {key: value for key, value in row.items() if "__" not in key}
+        instances = {None: self.model.from_db_row(base_row)}
+
+        for path, related_model, parent_path, attr in joins:
+            prefix = f"{path}__"
+            related = None
+            if row.get(f"{prefix}id") is not None:
+                related = related_model.from_db_row({
+                    key[len(prefix):]: value for key, value in row.items()
+                    if key.startswith(prefix) and "__" not in key[len(prefix):]
+                })
+            instances[path] = related
+
+            parent = instances[parent_path]
+            if parent is not None:
+                setattr(parent, f"_{attr}_cache", related)
+
+        return instances[None]
+
+    def _hydrate(self, rows, prefetch=True):
+        if self._related:
+            joins = self._resolve_joins()
+            instances = [self._hydrate_related(row, joins) for row in rows]
+        elif hasattr(self.model, 'from_db_row'):
+            instances = [self.model.from_db_row(row) for row in rows]
+        else:
+            return rows
+
+        # Instâncias vindas do mapa de identidade não recebem as colunas extras
+        for alias, _ in self._annotations:
+            for instance, row in zip(instances, rows):
+                setattr(instance, alias, row[alias])
+
+        if self._prefetch and prefetch:
+            self.model.prefetch_related(instances, *self._prefetch)
+        return instances
+
+    async def _ahydrate(self, rows):
+        instances = self._hydrate(rows, prefetch=False)
+        if self._prefetch:
+            await self.model.aprefetch_related(instances, *self._prefetch)
+        return instances
 
     def get_all(self):
-        cursor = self.execute()
-        results = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
-        
-        if hasattr(self.model, 'from_db_row'):
-            return [self.model.from_db_row(dict(zip(columns, row))) for row in results]
-        return [dict(zip(columns, row)) for row in results]
+        return self._hydrate(self.execute())
+
+    def iterate(self, batch_size=2000):
+        from modules.database.db import DB
+
+        query, params = self.build()
+        for rows in DB.read_connection().iterate_query(query, params, batch_size):
+            yield from self._hydrate(rows)
+
+    async def aget_all(self):
+        return await self._ahydrate(await self.aexecute())
+
+    async def aiterate(self, batch_size=2000):
+        from modules.database.async_db import AsyncDB
+
+        query, params = self.build()
+        async for rows in AsyncDB.iterate_query(query, params, batch_size):
+            for instance in await self._ahydrate(rows):
+                yield instance
 
     def get_one(self):
         self.limit(1)
         results = self.get_all()
-        return results[0] if results else None
\ No newline at end of file
+        return results[0] if results else None
@@ -0,0 +1,386 @@
+from modules.database.pagination import Page, decode_cursor, encode_cursor
+from modules.database.query_builder import QueryBuilder
+
+
+class QuerySet:
+    """Consulta preguiçosa e encadeável sobre um modelo."""
+
+    def __init__(self, model, builder=None):
+        self.model = model
+        self._builder = builder or QueryBuilder(model)
+        self._result_cache = None
+        self._empty = False
+        self._cache_key = None
+        self._shape = None
+        self._shape_fields = None
+
+    def _clone(self):
+        clone = QuerySet(self.model, self._builder.clone())
+        clone._empty = self._empty
+        clone._shape = self._shape
+        clone._shape_fields = self._shape_fields
+        return clone
+
+    def _shape_rows(self, rows):
+        if self._shape == "values":
+            names = self._shape_fields
+            return [dict(zip(names, row)) for row in rows]
+        if self._shape == "flat":
+            return [row[0] for row in rows]
+        return rows
+
+    def _cached_results(self):
+        row = self.model._cached_row(*self._cache_key)
+        return None if row is None else [self.model.from_db_row(row)]
+
+    def _store_results(self, results):
+        from modules.database.db import DB
+
+        if DB.in_transaction():
+            return results
+        for instance in results:
+            self.model._model_cache.set(*self._cache_key, instance._cache_row())
+        return results
+
+    def _fetch_all(self):
+        if self._result_cache is None:
+            if self._empty:
+                self._result_cache = []
+            elif self._shape is not None:
+                self._result_cache = self._shape_rows(self._builder.execute_tuples())
+            elif self._cache_key is not None:
+                self._result_cache = self._cached_results() or self._store_results(self._builder.get_all())
+            else:
+                self._result_cache = self._builder.get_all()
+        return self._result_cache
+
+    async def _afetch_all(self):
+        if self._result_cache is None:
+            if self._empty:
+                self._result_cache = []
+            elif self._shape is not None:
+                self._result_cache = self._shape_rows(await self._builder.aexecute_tuples())
+            elif self._cache_key is not None:
+                self._result_cache = self._cached_results() or self._store_results(await self._builder.aget_all())
+            else:
+                self._result_cache = await self._builder.aget_all()
+        return self._result_cache
+
+    def all(self):
+        return self._clone()
+
+    def none(self):
+        clone = self._clone()
+        clone._empty = True
+        return clone
+
+    def filter(self, **conditions):
+        clone = self._clone()
+        clone._builder.where(**conditions)
+        return clone
+
+    def exclude(self, **conditions):
+        clone = self._clone()
+        clone._builder.where_not(**conditions)
+        return clone
+
+    def order_by(self, *fields):
+        clone = self._clone()
+        clone._builder.order_by(*fields)
+        return clone
+
+    def limit(self, count):
+        clone = self._clone()
+        clone._builder.limit(count)
+        return clone
+
+    def offset(self, count):
+        clone = self._clone()
+        clone._builder.offset(count)
+        return clone
+
+    def only(self, *fields):
+        columns = ["id"] + [self.model._resolve_column(field)[0] for field in fields if field != "id"]
+        clone = self._clone()
+        clone._builder.select(*columns)
+        return clone
+
+    def defer(self, *fields):
+        deferred = {self.model._resolve_column(field)[0] for field in fields if field != "id"}
+        current = self._builder._columns or self.model._column_names()
+        clone = self._clone()
+        clone._builder.select(*[column for column in current if column not in deferred])
+        return clone
+
+    def _values_clone(self, shape, fields):
+        if fields:
+            names = list(fields)
+            columns = ["id" if name == "id" else self.model._resolve_column(name)[0] for name in names]
+        else:
+            names = columns = self.model._column_names()
+        clone = self._clone()
+        clone._builder.select(*columns)
+        clone._builder._related = []
+        clone._builder._prefetch = []
+        clone._shape = shape
+        clone._shape_fields = names + [alias for alias, _ in self._builder._annotations]
+        return clone
+
+    def values(self, *fields):
+        """Linhas como dicts {campo: valor}, sem instanciar modelos."""
+        return self._values_clone("values", fields)
+
+    def values_list(self, *fields, flat=False):
+        """Linhas como tuplas do cursor; com flat=True, apenas os valores do único campo."""
+        if flat and len(fields) != 1:
+            raise ValueError("values_list(flat=True) exige exatamente um campo")
+        return self._values_clone("flat" if flat else "values_list", fields)
+
+    def columns(self, *fields, numpy=False, batch_size=10000):
+        """Resultado colunar {campo: lista}, ou arrays do NumPy com numpy=True."""
+        queryset = self._values_clone("values_list", fields)
+        names = queryset._shape_fields
+        data = [[] for _ in names]
+        if not queryset._empty:
+            # Transpõe lote a lote para não manter todas as tuplas em memória
+            for rows in queryset._builder.iterate_tuples(batch_size):
+                for column, values in zip(data, zip(*rows)):
+                    column.extend(values)
+
+        if numpy:
+            try:
+                import numpy as np
+            except ImportError as e:
+                raise ImportError("columns(numpy=True) requer o pacote numpy") from e
+            data = [np.array(column) for column in data]
+        return dict(zip(names, data))
+
+    @staticmethod
+    def _named_aggregates(aggregates, named):
+        result = {aggregate.default_alias: aggregate for aggregate in aggregates}
+        result.update(named)
+        return result
+
+    def annotate(self, *aggregates, **named):
+        """Adiciona agregações por linha; com values() agrupa pelos campos escolhidos."""
+        annotations = self._named_aggregates(aggregates, named)
+        clone = self._clone()
+        clone._builder.annotate(**annotations)
+        if clone._shape is not None:
+            clone._shape_fields = clone._shape_fields + list(annotations)
+        return clone
+
+    def having(self, **conditions):
+        clone = self._clone()
+        clone._builder.having(**conditions)
+        return clone
+
+    def count(self):
+        if self._result_cache is not None:
+            return len(self._result_cache)
+        if self._empty:
+            return 0
+        return self._builder.count()
+
+    async def acount(self):
+        if self._result_cache is not None:
+            return len(self._result_cache)
+        if self._empty:
+            return 0
+        return await self._builder.acount()
+
+    def aggregate(self, *aggregates, **named):
+        """Calcula as agregações no banco e retorna {alias: valor}."""
+        aggregates = self._named_aggregates(aggregates, named)
+        if self._empty:
+            return {alias: aggregate.empty_result() for alias, aggregate in aggregates.items()}
+        return self._builder.aggregate(aggregates)
+
+    async def aaggregate(self, *aggregates, **named):
+        aggregates = self._named_aggregates(aggregates, named)
+        if self._empty:
+            return {alias: aggregate.empty_result() for alias, aggregate in aggregates.items()}
+        return await self._builder.aaggregate(aggregates)
+
+    def _keyset(self, cursor, order_by, size):
+        if size < 1:
+            raise ValueError("size deve ser maior que zero")
+        fields = [field.lstrip("-") for field in order_by]
+        descending = {field.startswith("-") for field in order_by}
+        if len(descending) > 1:
+            raise ValueError("paginate_after exige a mesma direção em todos os campos de ordenação")
+        descending = descending.pop() if descending else False
+        if "id" not in fields:
+            # id desempata linhas com o mesmo valor nas demais colunas
+            fields.append("id")
+            order_by = list(order_by) + ["-id" if descending else "id"]
+
+        clone = self._clone()
+        clone._builder._order_by = []
+        clone._builder.order_by(*order_by).limit(size + 1)
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != len(fields):
+                raise ValueError("Cursor de paginação inválido")
+            clone._builder.where_after(fields, values, descending)
+        return clone, fields
+
+    def _page(self, rows, fields, size):
+        items = rows[:size]
+        next_cursor = None
+        if len(rows) > size and items:
+            last = items[-1]
+            if self._shape == "values":
+                values = [last[field] for field in fields]
+            elif self._shape == "flat":
+                values = [last]
+            elif self._shape is not None:
+                values = [last[self._shape_fields.index(field)] for field in fields]
+            else:
+                values = [
+                    getattr(last, field if field == "id" else self.model._resolve_column(field)[0])
+                    for field in fields
+                ]
+            next_cursor = encode_cursor(values)
+        return Page(items, next_cursor, size)
+
+    def paginate_after(self, cursor=None, order_by=("id",), size=50):
+        """Paginação por chave: WHERE (a, b) > (%s, %s) em vez de OFFSET.
+
+        Os campos de ordenação não devem aceitar NULL; o id é incluído
+        automaticamente como desempate.
+        """
+        queryset, fields = self._keyset(cursor, order_by, size)
+        return self._page(queryset._fetch_all(), fields, size)
+
+    async def apaginate_after(self, cursor=None, order_by=("id",), size=50):
+        queryset, fields = self._keyset(cursor, order_by, size)
+        return self._page(await queryset._afetch_all(), fields, size)
+
+    def select_related(self, *paths):
+        clone = self._clone()
+        clone._builder.select_related(*paths)
+        return clone
+
+    def prefetch_related(self, *names):
+        clone = self._clone()
+        clone._builder.prefetch_related(*names)
+        return clone
+
+    def build(self):
+        return self._builder.build()
+
+    def exists(self):
+        if self._result_cache is not None or self._cache_key is not None:
+            return bool(self._fetch_all())
+        if self._empty:
+            return False
+        if self._builder._annotations or self._builder._group_by is not None:
+            return self._builder.clone().limit(1).count() > 0
+
+        builder = self._builder.clone()
+        builder._related = []
+        builder._prefetch = []
+        builder.select("id").limit(1)
+        return bool(builder.execute())
+
+    def iterator(self, batch_size=2000):
+        if self._result_cache is not None:
+            return iter(self._result_cache)
+        if self._empty:
+            return iter([])
+        if self._shape is not None:
+            return self._iterate_shaped(batch_size)
+        return self._builder.iterate(batch_size)
+
+    def _iterate_shaped(self, batch_size):
+        for rows in self._builder.iterate_tuples(batch_size):
+            yield from self._shape_rows(rows)
+
+    async def aexists(self):
+        if self._result_cache is not None:
+            return bool(self._result_cache)
+        if self._empty:
+            return False
+        if self._builder._annotations or self._builder._group_by is not None:
+            return await self._builder.clone().limit(1).acount() > 0
+
+        builder = self._builder.clone()
+        builder._related = []
+        builder._prefetch = []
+        builder.select("id").limit(1)
+        return bool(await builder.aexecute())
+
+    async def aiterator(self, batch_size=2000):
+        if self._result_cache is not None or self._empty:
+            for instance in self._result_cache or []:
+                yield instance
+            return
+        if self._shape is not None:
+            async for rows in self._builder.aiterate_tuples(batch_size):
+                for row in self._shape_rows(rows):
+                    yield row
+            return
+        async for instance in self._builder.aiterate(batch_size):
+            yield instance
+
+    def first(self):
+        if self._result_cache is not None:
+            return self._result_cache[0] if self._result_cache else None
+        results = self[:1]
+        return results[0] if results else None
+
+    async def afirst(self):
+        if self._result_cache is not None:
+            return self._result_cache[0] if self._result_cache else None
+        if self._empty:
+            return None
+        clone = self._clone()
+        if self._sliceable():
+            clone._builder.limit(1)
+        results = await clone._afetch_all()
+        return results[0] if results else None
+
+    def _sliceable(self):
+        return self._cache_key is None and self._builder._limit is None and not self._builder._offset
+
+    def __getitem__(self, key):
+        if self._result_cache is not None or self._empty or not self._sliceable():
+            return self._fetch_all()[key]
+
+        if isinstance(key, slice):
+            start, stop, step = key.start or 0, key.stop, key.step
+            if start < 0 or (stop is not None and stop < 0) or step not in (None, 1):
+                return self._fetch_all()[key]
+            clone = self._clone()
+            clone._builder.offset(start)
+            if stop is not None:
+                clone._builder.limit(max(stop - start, 0))
+            return clone._fetch_all()
+
+        if key < 0:
+            return self._fetch_all()[key]
+        clone = self._clone()
+        clone._builder.offset(key).limit(1)
+        results = clone._fetch_all()
+        if not results:
+            raise IndexError("Índice fora do intervalo da consulta")
+        return results[0]
+
+    def __iter__(self):
+        return iter(self._fetch_all())
+
+    async def __aiter__(self):
+        for instance in await self._afetch_all():
+            yield instance
+
+    def __len__(self):
+        return len(self._fetch_all())
+
+    def __bool__(self):
+        return bool(self._fetch_all())
+
+    def __repr__(self):
+        if self._result_cache is None:
+            return f"<QuerySet {self.model.__name__} (não avaliado)>"
+        return f"<QuerySet {self._result_cache!r}>"
@@ -9,14 +9,36 @@ class AbstractRelationship(ABC):
         self.back_populates = back_populates
         self.parent_model = None
         self.attribute_name = None
+        self._related_model = None
+        self.reverse_column = f"{back_populates}_id" if back_populates else None
     
     def contribute_to_class(self, model, name):
         self.parent_model = model
         self.attribute_name = name
+        self.cache_name = f"_{name}_cache"
+        self.fk_column = f"{name}_id"
     
     def get_related_model(self):
-        from modules.database.abstract.model_register import ModelRegistry
-        return ModelRegistry.get_model(self.model_class)
+        related_model = self._related_model
+        if related_model is None:
+            from modules.database.abstract.model_register import ModelRegistry
+
+            related_model = ModelRegistry.get_model(self.model_class)
+            if related_model is not None:
+                self._related_model = related_model
+        return related_model
+
+    def resolve(self):
+        """Resolve e congela os metadados da relação; devolve as referências não resolvidas."""
+        label = f"{self.parent_model.__name__}.{self.attribute_name}"
+        related_model = self.get_related_model()
+        if related_model is None:
+            return [f"{label}: modelo {self.model_class} não encontrado"]
+
+        if self.back_populates:
+            if self.back_populates not in related_model._fields:
+                return [f"{label}: back_populates {self.back_populates} não existe em {self.model_class}"]
+        return []
 
 class Relationship(AbstractRelationship, Field):
     def __init__(self, model_class, back_populates=None, **kwargs):
@@ -26,6 +48,65 @@ class Relationship(AbstractRelationship, Field):
     def get_sql_definition(self):
         return "INTEGER"  
 
+    def prefetch(self, instances):
+        from modules.database.db import DB
+
+        for query, params, apply in self._prefetch_steps(instances):
+            apply(DB.execute_read(query, params))
+
+    async def aprefetch(self, instances):
+        from modules.database.async_db import AsyncDB
+
+        for query, params, apply in self._prefetch_steps(instances):
+            apply(await AsyncDB.execute_query(query, params))
+
+    def _prefetch_steps(self, instances):
+        """Lista de (query, params, apply); apply distribui as linhas entre as instâncias."""
+        related_model = self.get_related_model()
+        fk_field = self.fk_column
+        cache_name = self.cache_name
+
+        saved = [instance for instance in instances if getattr(instance, "id", None) is not None]
+        forward = [instance for instance in saved if getattr(instance, fk_field, None)]
+        reverse = [instance for instance in saved if not getattr(instance, fk_field, None)]
+        steps = []
+
+        if forward:
+            by_id = {}
+            ids = []
+            for related_id in {getattr(instance, fk_field) for instance in forward}:
+                related = related_model._from_identity_map(related_id)
+                if related is not None:
+                    by_id[related_id] = related
+                else:
+                    ids.append(related_id)
+
+            def apply_forward(rows):
+                for row in rows:
+                    by_id[row["id"]] = related_model.from_db_row(row)
+                for instance in forward:
+                    setattr(instance, cache_name, by_id.get(getattr(instance, fk_field)))
+
+            if ids:
+                query = f"SELECT * FROM {related_model.__tablename__} WHERE id = ANY(%s)"
+                steps.append((query, (ids,), apply_forward))
+            else:
+                apply_forward([])
+
+        if reverse and self.back_populates:
+            related_fk = self.reverse_column
+
+            def apply_reverse(rows):
+                by_parent = {}
+                for row in rows:
+                    by_parent.setdefault(row[related_fk], related_model.from_db_row(row))
+                for instance in reverse:
+                    setattr(instance, cache_name, by_parent.get(instance.id))
+
+            query = f"SELECT * FROM {related_model.__tablename__} WHERE {related_fk} = ANY(%s)"
+            steps.append((query, ([instance.id for instance in reverse],), apply_reverse))
+        return steps
+
 class OneToOneField(Relationship):
     def __init__(self, model_class, back_populates=None, **kwargs):
         super().__init__(model_class, back_populates, **kwargs)
@@ -34,7 +115,7 @@ class OneToOneField(Relationship):
         if instance is None:
             return self
 
-        cache_name = f"_{self.attribute_name}_cache"
+        cache_name = self.cache_name
         if hasattr(instance, cache_name):
             return getattr(instance, cache_name)
 
@@ -43,13 +124,12 @@ class OneToOneField(Relationship):
         return related_instance
 
     def __set__(self, instance, value):
-        cache_name = f"_{self.attribute_name}_cache"
-        setattr(instance, cache_name, value)
+        setattr(instance, self.cache_name, value)
 
         if value is not None and self.back_populates:
             related_field = getattr(self.get_related_model(), self.back_populates, None)
             if related_field and isinstance(related_field, OneToOneField):
-                setattr(value, f"_{related_field.attribute_name}_cache", instance)
+                setattr(value, related_field.cache_name, instance)
 
     def get_related_instance(self, instance):
         from modules.database.db import DB
@@ -60,23 +140,22 @@ class OneToOneField(Relationship):
         if instance_id is None:
             return None
 
-        fk_field = f"{self.attribute_name}_id"
+        fk_field = self.fk_column
         if hasattr(instance, fk_field):
             related_id = getattr(instance, fk_field)
             if related_id:
-                query = f"SELECT * FROM {related_model.__tablename__} WHERE id = %s"
-                result = DB.execute_query(query, (related_id,))
-                if result and len(result) > 0:
-                    return related_model(**result[0])
+                related = related_model.find_by_id(related_id)
+                if related is not None:
+                    return related
 
         if self.back_populates:
-            related_fk = f"{self.back_populates}_id"
+            related_fk = self.reverse_column
             query = (
                 f"SELECT * FROM {related_model.__tablename__} WHERE {related_fk} = %s"
             )
-            result = DB.execute_query(query, (instance_id,))
+            result = DB.execute_read(query, (instance_id,))
             if result and len(result) > 0:
-                return related_model(**result[0])
+                return related_model.from_db_row(result[0])
 
         return None
 
@@ -92,7 +171,7 @@ class ForeignKey(Relationship, Field):
         if instance is None:
             return self
 
-        cache_name = f"_{self.attribute_name}_cache"
+        cache_name = self.cache_name
         if hasattr(instance, cache_name):
             cached_value = getattr(instance, cache_name)
             if cached_value is not None:
@@ -105,13 +184,9 @@ class ForeignKey(Relationship, Field):
         return related_instance
 
     def __set__(self, instance, value):
-        cache_name = f"_{self.attribute_name}_cache"
-        setattr(instance, cache_name, value)
+        setattr(instance, self.cache_name, value)
 
-        if value is not None:
-            setattr(instance, f"{self.attribute_name}_id", getattr(value, "id", value))
-        else:
-            setattr(instance, f"{self.attribute_name}_id", None)
+        setattr(instance, self.fk_column, None if value is None else getattr(value, "id", value))
 
         if value is not None and self.back_populates:
             related_field = getattr(self.get_related_model(), self.back_populates, None)
@@ -126,21 +201,20 @@ class ForeignKey(Relationship, Field):
         if instance_id is None:
             return None
 
-        fk_field = f"{self.attribute_name}_id"
+        fk_field = self.fk_column
         if hasattr(instance, fk_field):
             related_id = getattr(instance, fk_field)
             if related_id:
-                query = f"SELECT * FROM {related_model.__tablename__} WHERE id = %s"
-                result = DB.execute_query(query, (related_id,))
-                if result and len(result) > 0:
-                    return related_model(**result[0])
+                related = related_model.find_by_id(related_id)
+                if related is not None:
+                    return related
 
         if self.back_populates:
-            related_fk = f"{self.back_populates}_id"
+            related_fk = self.reverse_column
             query = f"SELECT * FROM {related_model.__tablename__} WHERE {related_fk} = %s LIMIT 1"
-            result = DB.execute_query(query, (instance_id,))
+            result = DB.execute_read(query, (instance_id,))
             if result and len(result) > 0:
-                return related_model(**result[0])
+                return related_model.from_db_row(result[0])
 
         return None
 
@@ -165,36 +239,51 @@ class ManyToManyField(Relationship):
 
     def contribute_to_class(self, model, name):
         super().contribute_to_class(model, name)
+        self.cache_name = f"_{name}_prefetch"
+        self.parent_column = f"{model.__name__.lower()}_id"
+        self.related_column = f"{self.model_class.lower()}_id"
+        self._through_model = None
 
         if not hasattr(model, "_m2m_fields"):
             model._m2m_fields = {}
         model._m2m_fields[name] = self
 
+    def resolve(self):
+        errors = super().resolve()
+        try:
+            self.get_through_model()
+        except ValueError as e:
+            errors.append(f"{self.parent_model.__name__}.{self.attribute_name}: {e}")
+        return errors
+
     def get_through_model(self):
+        if self._through_model is not None:
+            return self._through_model
+
+        from modules.database.base_model import BaseModel
+        from modules.database.abstract.model_register import ModelRegistry
+
         if self.through:
-            for subclass in BaseModel.__subclasses__():
-                if subclass.__name__ == self.through:
-                    return subclass
-            raise ValueError(f"Modelo intermediário {self.through} não encontrado")
+            through_class = ModelRegistry.get_model(self.through)
+            if through_class is None:
+                raise ValueError(f"Modelo intermediário {self.through} não encontrado")
         else:
             models = sorted([self.parent_model.__name__, self.model_class])
             through_name = f"{models[0]}_{models[1]}"
-            from modules.database.base_model import BaseModel
-
-            for subclass in BaseModel.__subclasses__():
-                if subclass.__name__ == through_name:
-                    return subclass
-
-            through_class = type(
-                through_name,
-                (BaseModel,),
-                {
-                    "__tablename__": through_name.lower(),
-                    f"{self.parent_model.__name__.lower()}_id": IntegerField(),
-                    f"{self.model_class.lower()}_id": IntegerField(),
-                },
-            )
-            return through_class
+            through_class = ModelRegistry.get_model(through_name)
+            if through_class is None:
+                # O outro lado da relação pode ter criado o modelo; só sintetiza uma vez
+                through_class = type(
+                    through_name,
+                    (BaseModel,),
+                    {
+                        "__tablename__": through_name.lower(),
+                        self.parent_column: IntegerField(),
+                        self.related_column: IntegerField(),
+                    },
+                )
+        self._through_model = through_class
+        return through_class
 
     def get_related_instances(self, instance):
         related_model = self.get_related_model()
@@ -204,8 +293,7 @@ class ManyToManyField(Relationship):
         if instance_id is None:
             return []
 
-        parent_fk = f"{self.parent_model.__name__.lower()}_id"
-        related_fk = f"{self.model_class.lower()}_id"
+        parent_fk, related_fk = self.parent_column, self.related_column
 
         query = f"""
             SELECT r.* FROM {related_model.__tablename__} r
@@ -213,64 +301,217 @@ class ManyToManyField(Relationship):
             WHERE t.{parent_fk} = %s
         """
         from modules.database.db import DB
-        results = DB.execute_query(query, (instance_id,))
+        results = DB.execute_read(query, (instance_id,))
 
-        return [related_model(**row) for row in results]
+        return [related_model.from_db_row(row) for row in results]
 
-    def add(self, instance, related_obj):
-        through_model = self.get_through_model()
+    def count(self, instance):
+        from modules.database.db import DB
 
         instance_id = getattr(instance, "id", None)
-        related_id = getattr(related_obj, "id", None)
+        if instance_id is None:
+            return 0
+
+        through_model = self.get_through_model()
+        query = f"SELECT COUNT(*) AS total FROM {through_model.__tablename__} WHERE {self.parent_column} = %s"
+        return DB.execute_read(query, (instance_id,))[0]["total"]
+
+    def prefetch(self, instances):
+        from modules.database.db import DB
+
+        for query, params, apply in self._prefetch_steps(instances):
+            apply(DB.execute_read(query, params))
+
+    async def aprefetch(self, instances):
+        from modules.database.async_db import AsyncDB
+
+        for query, params, apply in self._prefetch_steps(instances):
+            apply(await AsyncDB.execute_query(query, params))
+
+    def _prefetch_steps(self, instances):
+        related_model = self.get_related_model()
+        through_model = self.get_through_model()
+        cache_name = self.cache_name
+
+        saved = [instance for instance in instances if getattr(instance, "id", None) is not None]
+        if not saved:
+            return []
+
+        parent_fk, related_fk = self.parent_column, self.related_column
+
+        query = f"""
+            SELECT r.*, t.{parent_fk} AS _prefetch_parent_id FROM {related_model.__tablename__} r
+            JOIN {through_model.__tablename__} t ON r.id = t.{related_fk}
+            WHERE t.{parent_fk} = ANY(%s)
+        """
 
-        if instance_id is None or related_id is None:
+        def apply(results):
+            related_by_id = {}
+            grouped = {}
+            for row in results:
+                parent_id = row.pop("_prefetch_parent_id")
+                related = related_by_id.get(row["id"])
+                if related is None:
+                    related = related_by_id[row["id"]] = related_model.from_db_row(row)
+                grouped.setdefault(parent_id, []).append(related)
+
+            for instance in saved:
+                setattr(instance, cache_name, grouped.get(instance.id, []))
+
+        return [(query, ([instance.id for instance in saved],), apply)]
+
+    def _link_columns(self):
+        return self.parent_column, self.related_column
+
+    @staticmethod
+    def _related_id(related_obj):
+        if isinstance(related_obj, int):
+            return related_obj
+        return getattr(related_obj, "id", None)
+
+    def _related_ids(self, related_objs):
+        ids = []
+        for related_obj in related_objs:
+            related_id = self._related_id(related_obj)
+            if related_id is None:
+                raise ValueError(
+                    "Ambos os objetos devem ser salvos antes de criar uma relação."
+                )
+            if related_id not in ids:
+                ids.append(related_id)
+        return ids
+
+    def _instance_id(self, instance):
+        instance_id = getattr(instance, "id", None)
+        if instance_id is None:
             raise ValueError(
                 "Ambos os objetos devem ser salvos antes de criar uma relação."
             )
+        return instance_id
 
-        parent_fk = f"{self.parent_model.__name__.lower()}_id"
-        related_fk = f"{self.model_class.lower()}_id"
+    def current_ids(self, instance):
+        from modules.database.db import DB
 
-        existing = through_model.find_by(
-            **{parent_fk: instance_id, related_fk: related_id}
-        )
+        parent_fk, related_fk = self._link_columns()
+        query = f"SELECT {related_fk} FROM {self.get_through_model().__tablename__} WHERE {parent_fk} = %s"
+        return {row[related_fk] for row in DB.execute_read(query, (self._instance_id(instance),))}
 
-        if not existing:
-            through_obj = through_model(
-                **{parent_fk: instance_id, related_fk: related_id}
-            )
-            through_obj.save()
+    def add(self, instance, *related_objs):
+        from modules.database.db import DB
 
-    def remove(self, instance, related_obj):
-        through_model = self.get_through_model()
+        instance_id = self._instance_id(instance)
+        related_ids = self._related_ids(related_objs)
+        if not related_ids:
+            return 0
 
-        instance_id = getattr(instance, "id", None)
-        related_id = getattr(related_obj, "id", None)
+        parent_fk, related_fk = self._link_columns()
+        through_table = self.get_through_model().__tablename__
+        # Uma única instrução para todos os vínculos. Tabelas through= não têm UNIQUE no par,
+        # então o NOT EXISTS filtra os existentes; o ON CONFLICT cobre inserções concorrentes onde há UNIQUE
+        query = f"""
+            INSERT INTO {through_table} ({parent_fk}, {related_fk})
+            SELECT %s::integer, novo.id FROM unnest(%s::integer[]) AS novo(id)
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {through_table} WHERE {parent_fk} = %s AND {related_fk} = novo.id
+            )
+            ON CONFLICT DO NOTHING
+        """
+        return DB.execute_query(query, (instance_id, related_ids, instance_id))
 
-        if instance_id is None or related_id is None:
-            return
+    def remove(self, instance, *related_objs):
+        from modules.database.db import DB
 
-        parent_fk = f"{self.parent_model.__name__.lower()}_id"
-        related_fk = f"{self.model_class.lower()}_id"
+        instance_id = getattr(instance, "id", None)
+        related_ids = [related_id for related_id in map(self._related_id, related_objs) if related_id is not None]
+        if instance_id is None or not related_ids:
+            return 0
 
+        parent_fk, related_fk = self._link_columns()
         query = f"""
-            DELETE FROM {through_model.__tablename__}
-            WHERE {parent_fk} = %s AND {related_fk} = %s
+            DELETE FROM {self.get_through_model().__tablename__}
+            WHERE {parent_fk} = %s AND {related_fk} = ANY(%s::integer[])
         """
-        DB.execute_query(query, (instance_id, related_id))
+        return DB.execute_query(query, (instance_id, related_ids))
+
+    def clear(self, instance):
+        from modules.database.db import DB
+
+        instance_id = getattr(instance, "id", None)
+        if instance_id is None:
+            return 0
+
+        parent_fk, _ = self._link_columns()
+        query = f"DELETE FROM {self.get_through_model().__tablename__} WHERE {parent_fk} = %s"
+        return DB.execute_query(query, (instance_id,))
+
+    def set(self, instance, related_objs):
+        from modules.database.db import DB
+
+        self._instance_id(instance)
+        wanted = self._related_ids(related_objs)
+        wanted_ids = set(wanted)
+        with DB.transaction():
+            current = self.current_ids(instance)
+            to_remove = [related_id for related_id in current if related_id not in wanted_ids]
+            to_add = [related_id for related_id in wanted if related_id not in current]
+            if to_remove:
+                self.remove(instance, *to_remove)
+            if to_add:
+                self.add(instance, *to_add)
+        return len(to_add), len(to_remove)
 
 
 class ManyToManyManager:
     def __init__(self, instance, m2m_field):
         self.instance = instance
         self.m2m_field = m2m_field
+        self.cache_name = m2m_field.cache_name
+
+    def add(self, *related_objs):
+        added = self.m2m_field.add(self.instance, *related_objs)
+        self.clear_cache()
+        return added
+
+    def remove(self, *related_objs):
+        removed = self.m2m_field.remove(self.instance, *related_objs)
+        self.clear_cache()
+        return removed
 
-    def add(self, related_obj):
-        self.m2m_field.add(self.instance, related_obj)
+    def set(self, related_objs):
+        changes = self.m2m_field.set(self.instance, related_objs)
+        self.clear_cache()
+        return changes
 
-    def remove(self, related_obj):
-        self.m2m_field.remove(self.instance, related_obj)
+    def clear(self):
+        removed = self.m2m_field.clear(self.instance)
+        self.clear_cache()
+        return removed
+
+    def get_cache(self):
+        return getattr(self.instance, self.cache_name, None)
+
+    def set_cache(self, related_instances):
+        setattr(self.instance, self.cache_name, list(related_instances))
+
+    def clear_cache(self):
+        if getattr(self.instance, self.cache_name, None) is not None:
+            setattr(self.instance, self.cache_name, None)
 
     def get_related_instances(self):
+        cached = self.get_cache()
+        if cached is not None:
+            return list(cached)
         return self.m2m_field.get_related_instances(self.instance)
 
+    def count(self):
+        cached = self.get_cache()
+        if cached is not None:
+            return len(cached)
+        return self.m2m_field.count(self.instance)
+
+    def exists(self):
+        return self.count() > 0
+
+    def __iter__(self):
+        return iter(self.get_related_instances())
+
@@ -0,0 +1,162 @@
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+import psycopg2
+from modules.utils.logger import Logger
+from modules.database.connection import DatabaseConnection, DatabaseError
+from modules.database.pool import PoolTimeoutError
+
+# Momento da última escrita no contexto atual (thread ou requisição)
+_last_write = ContextVar("last_write", default=None)
+
+
+def record_write():
+    _last_write.set(time.monotonic())
+
+
+def is_read_query(query):
+    # Composables e CTEs podem esconder escritas; na dúvida conta como escrita
+    return isinstance(query, str) and query.lstrip().upper().startswith("SELECT")
+
+
+def _is_unavailable(error):
+    # get_cursor embrulha o erro do driver em DatabaseError; olha a causa também
+    while error is not None:
+        if isinstance(error, (ConnectionError, PoolTimeoutError, psycopg2.OperationalError, psycopg2.InterfaceError)):
+            return True
+        error = error.__cause__
+    return False
+
+
+class ReplicaConnection(DatabaseConnection):
+    """Conexão com uma réplica; ao contrário de DatabaseConnection, não é singleton."""
+
+    def __new__(cls, *args, **kwargs):
+        instance = object.__new__(cls)
+        instance._initialized = False
+        return instance
+
+    def _create_connection(self):
+        conn = super()._create_connection()
+        # Leituras em autocommit não deixam transações abertas segurando o replay na réplica
+        conn.autocommit = True
+        return conn
+
+
+class ReplicaRouter:
+    """Envia leituras às réplicas e escritas ao primário."""
+
+    STRATEGIES = ("round_robin", "least_outstanding")
+
+    def __init__(self, primary, replicas, strategy="round_robin", sticky_window=2.0, retry_after=5.0):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Estratégia de roteamento inválida: {strategy}")
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.sticky_window = sticky_window
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._outstanding = {id(replica): 0 for replica in self.replicas}
+        self._down_until = {}
+        self._reads = {id(replica): 0 for replica in self.replicas}
+        self._primary_reads = 0
+        self._fallbacks = 0
+        self._logger = Logger("ReplicaRouter")
+
+    def _sticky(self):
+        last_write = _last_write.get()
+        return last_write is not None and time.monotonic() - last_write < self.sticky_window
+
+    def _use_primary(self):
+        return not self.replicas or self.primary.in_transaction() or self._sticky()
+
+    def _candidates(self):
+        now = time.monotonic()
+        with self._lock:
+            healthy = [replica for replica in self.replicas if self._down_until.get(id(replica), 0) <= now]
+            if not healthy:
+                return []
+            if self.strategy == "least_outstanding":
+                return sorted(healthy, key=lambda replica: self._outstanding[id(replica)])
+            start = next(self._counter) % len(healthy)
+            return healthy[start:] + healthy[:start]
+
+    def _mark_down(self, replica, error):
+        self._logger.warning(f"Réplica {replica.host} indisponível por {self.retry_after}s: {error}")
+        with self._lock:
+            self._down_until[id(replica)] = time.monotonic() + self.retry_after
+
+    def read_connection(self):
+        """Conexão para leituras que não podem ser repetidas (ex.: streaming)."""
+        if not self._use_primary():
+            candidates = self._candidates()
+            if candidates:
+                return candidates[0]
+        return self.primary
+
+    def run_read(self, operation):
+        """Executa operation(conexão) numa réplica, caindo para o primário se nenhuma responder."""
+        if not self._use_primary():
+            for replica in self._candidates():
+                key = id(replica)
+                with self._lock:
+                    self._outstanding[key] += 1
+                try:
+                    result = operation(replica)
+                except (ConnectionError, DatabaseError, psycopg2.Error) as e:
+                    if not _is_unavailable(e):
+                        raise
+                    self._mark_down(replica, e)
+                    continue
+                finally:
+                    with self._lock:
+                        self._outstanding[key] -= 1
+                with self._lock:
+                    self._reads[key] += 1
+                return result
+            with self._lock:
+                self._fallbacks += 1
+
+        with self._lock:
+            self._primary_reads += 1
+        return operation(self.primary)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "strategy": self.strategy,
+                "primary_reads": self._primary_reads,
+                "fallbacks": self._fallbacks,
+                "replicas": [
+                    {
+                        "host": replica.host,
+                        "reads": self._reads[id(replica)],
+                        "outstanding": self._outstanding[id(replica)],
+                        "down": self._down_until.get(id(replica), 0) > now,
+                    }
+                    for replica in self.replicas
+                ],
+            }
+
+    def close(self):
+        for replica in self.replicas:
+            replica.close()
+
+
+class ReplicaRouterMiddleware:
+    """Limita a janela de "ler a própria escrita" à requisição atual."""
+
+    def process_request(self, request):
+        request.replica_router_token = _last_write.set(None)
+        return request
+
+    def process_response(self, request, response):
+        token = getattr(request, "replica_router_token", None)
+        if token is not None:
+            _last_write.reset(token)
+            request.replica_router_token = None
+        return response
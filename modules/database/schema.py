@@ -0,0 +1,202 @@
+from modules.database.indexes import index_name
+
+# Tabelas, colunas, constraints e índices do schema atual em uma única consulta
+SNAPSHOT_QUERY = """
+    SELECT 'table' AS kind, c.relname AS table_name, NULL AS name
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p')
+    UNION ALL
+    SELECT 'column', c.relname, a.attname
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p')
+      AND a.attnum > 0 AND NOT a.attisdropped
+    UNION ALL
+    SELECT 'constraint', c.relname, con.conname
+    FROM pg_constraint con
+    JOIN pg_class c ON c.oid = con.conrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema()
+    UNION ALL
+    SELECT CASE WHEN x.indisvalid THEN 'index' ELSE 'invalid_index' END, t.relname, i.relname
+    FROM pg_index x
+    JOIN pg_class i ON i.oid = x.indexrelid
+    JOIN pg_class t ON t.oid = x.indrelid
+    JOIN pg_namespace n ON n.oid = t.relnamespace
+    WHERE n.nspname = current_schema()
+"""
+
+
+class SchemaSnapshot:
+    """Estado do schema lido do pg_catalog."""
+
+    def __init__(self, tables=None, constraints=(), indexes=(), invalid_indexes=()):
+        self.tables = tables or {}
+        self.constraints = set(constraints)
+        self.indexes = set(indexes)
+        self.invalid_indexes = set(invalid_indexes)
+
+    @classmethod
+    def load(cls, cursor):
+        cursor.execute(SNAPSHOT_QUERY)
+        snapshot = cls()
+        for kind, table, name in cursor.fetchall():
+            if kind == "table":
+                snapshot.tables.setdefault(table, set())
+            elif kind == "column":
+                snapshot.tables.setdefault(table, set()).add(name)
+            elif kind == "constraint":
+                snapshot.constraints.add(name)
+            elif kind == "index":
+                snapshot.indexes.add(name)
+            else:
+                snapshot.invalid_indexes.add(name)
+        return snapshot
+
+    def has_table(self, table):
+        return table.lower() in self.tables
+
+    def columns(self, table):
+        return self.tables.get(table.lower(), set())
+
+    def has_index(self, name):
+        return name.lower() in self.indexes
+
+
+class SchemaPlan:
+    """DDL necessário para levar o schema ao estado dos modelos."""
+
+    def __init__(self):
+        self.tables = []
+        self.columns = []
+        self.constraints = []
+        self.indexes = []
+        # CREATE INDEX CONCURRENTLY precisa rodar fora da transação
+        self.concurrent_indexes = []
+        # Desfaz cada comando; usado pelas migrações geradas
+        self.reverse = {}
+
+    @property
+    def statements(self):
+        return self.tables + self.columns + self.constraints + self.indexes
+
+    def __bool__(self):
+        return bool(self.statements or self.concurrent_indexes)
+
+    def __repr__(self):
+        return f"<SchemaPlan {len(self.statements) + len(self.concurrent_indexes)} comandos>"
+
+
+def column_definitions(model):
+    from modules.database.relationships import Relationship, OneToOneField, ForeignKey
+
+    columns = {}
+    for field_name, field in model._fields.items():
+        if isinstance(field, (OneToOneField, ForeignKey)):
+            columns[f"{field_name}_id"] = "INTEGER"
+        elif not isinstance(field, Relationship):
+            columns[field_name] = field.get_sql_definition()
+    return columns
+
+
+def _m2m_tables(models):
+    """Tabelas intermediárias geradas automaticamente; modelos through= são planejados como os demais."""
+    tables = {}
+    for model in models:
+        for field in getattr(model, "_m2m_fields", {}).values():
+            if field.through:
+                continue
+            table_name = field.get_through_model().__tablename__
+            if table_name not in tables:
+                tables[table_name] = (model, field)
+    return tables
+
+
+def _plan_index(plan, snapshot, name, statement, drop_statement, concurrently):
+    if name.lower() in snapshot.invalid_indexes:
+        # Sobra de um CREATE INDEX CONCURRENTLY interrompido; IF NOT EXISTS o ignoraria
+        target = plan.concurrent_indexes if concurrently else plan.indexes
+        target.extend([drop_statement, statement])
+    elif not snapshot.has_index(name):
+        (plan.concurrent_indexes if concurrently else plan.indexes).append(statement)
+    else:
+        return
+    plan.reverse[statement] = drop_statement
+
+
+def plan_schema(snapshot, models, concurrently=False):
+    from modules.database.relationships import OneToOneField, ForeignKey
+
+    plan = SchemaPlan()
+    m2m_tables = _m2m_tables(models)
+    drop = "DROP INDEX CONCURRENTLY IF EXISTS" if concurrently else "DROP INDEX IF EXISTS"
+
+    for model in models:
+        table_name = model.__tablename__
+        if table_name in m2m_tables:
+            continue
+        columns = column_definitions(model)
+        if not snapshot.has_table(table_name):
+            definitions = ["id SERIAL PRIMARY KEY"] + [f"{name} {sql_type}" for name, sql_type in columns.items()]
+            statement = f"CREATE TABLE IF NOT EXISTS {table_name} ({', '.join(definitions)})"
+            plan.tables.append(statement)
+            plan.reverse[statement] = f"DROP TABLE IF EXISTS {table_name} CASCADE"
+            continue
+        existing = snapshot.columns(table_name)
+        for name, sql_type in columns.items():
+            if name not in existing:
+                statement = f"ALTER TABLE {table_name} ADD COLUMN {name} {sql_type}"
+                plan.columns.append(statement)
+                plan.reverse[statement] = f"ALTER TABLE {table_name} DROP COLUMN IF EXISTS {name}"
+
+    for table_name, (model, field) in m2m_tables.items():
+        model1 = model.__name__.lower()
+        model2 = field.model_class.lower()
+        if not snapshot.has_table(table_name):
+            statement = (
+                f"CREATE TABLE IF NOT EXISTS {table_name} ("
+                f"id SERIAL PRIMARY KEY, "
+                f"{model1}_id INTEGER REFERENCES {model.__tablename__}(id), "
+                f"{model2}_id INTEGER REFERENCES {field.get_related_model().__tablename__}(id), "
+                f"UNIQUE({model1}_id, {model2}_id))"
+            )
+            plan.tables.append(statement)
+            plan.reverse[statement] = f"DROP TABLE IF EXISTS {table_name} CASCADE"
+        # O UNIQUE já cobre buscas pelo primeiro lado; o reverso precisa de índice
+        name = index_name("ix", table_name, [f"{model2}_id"])
+        keyword = "CREATE INDEX CONCURRENTLY" if concurrently else "CREATE INDEX"
+        _plan_index(
+            plan, snapshot, name,
+            f"{keyword} IF NOT EXISTS {name} ON {table_name} ({model2}_id)",
+            f"{drop} {name}", concurrently,
+        )
+
+    for model in models:
+        table_name = model.__tablename__
+        if table_name in m2m_tables:
+            continue
+        for field_name, field in model._fields.items():
+            if not isinstance(field, (OneToOneField, ForeignKey)):
+                continue
+            constraint = f"fk_{table_name}_{field_name}"
+            if constraint.lower() in snapshot.constraints:
+                continue
+            statement = (
+                f"ALTER TABLE {table_name} ADD CONSTRAINT {constraint} "
+                f"FOREIGN KEY ({field_name}_id) REFERENCES {field.get_related_model().__tablename__}(id) "
+                f"ON DELETE CASCADE"
+            )
+            plan.constraints.append(statement)
+            plan.reverse[statement] = f"ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {constraint}"
+
+        for index in model._collect_indexes():
+            name = index.get_name(model)
+            _plan_index(
+                plan, snapshot, name,
+                index.get_sql(model, concurrently=concurrently),
+                f"{drop} {name}", concurrently,
+            )
+
+    return plan
@@ -0,0 +1,80 @@
+import re
+from collections import OrderedDict
+
+_PLACEHOLDER = re.compile(r"%%|%s")
+_PREPARABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+def to_positional(query):
+    """Converte os placeholders %s do psycopg2 em $1, $2... do PREPARE."""
+    counter = 0
+
+    def replace(match):
+        nonlocal counter
+        if match.group(0) == "%%":
+            return "%%"
+        counter += 1
+        return f"${counter}"
+
+    return _PLACEHOLDER.sub(replace, query), counter
+
+
+def is_preparable(query, params):
+    if not params or not isinstance(params, (list, tuple)):
+        return False
+    if "%(" in query or ";" in query:
+        return False
+    return query.lstrip().upper().startswith(_PREPARABLE)
+
+
+class StatementCache:
+    """LRU de statements preparados no servidor para uma conexão."""
+
+    def __init__(self, max_size=100):
+        self.max_size = max_size
+        self._statements = OrderedDict()
+        self._pending_deallocate = []
+        # Nomes cuja existência no servidor ficou incerta depois de um erro
+        self._unverified = []
+        self._counter = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, query):
+        name = self._statements.get(query)
+        if name is not None:
+            self._statements.move_to_end(query)
+            self.hits += 1
+        return name
+
+    def add(self, query):
+        self.misses += 1
+        self._counter += 1
+        name = f"ps_{self._counter}"
+        self._statements[query] = name
+        while len(self._statements) > self.max_size:
+            _, evicted = self._statements.popitem(last=False)
+            self._pending_deallocate.append(evicted)
+            self.evictions += 1
+        return name
+
+    def discard(self, query, unsent=()):
+        """Esquece query após um erro; o nome dela e os DEALLOCATE não confirmados ficam para conferir."""
+        name = self._statements.pop(query, None)
+        self._unverified.extend(unsent)
+        if name is not None:
+            self._unverified.append(name)
+
+    def take_deallocations(self):
+        pending = self._pending_deallocate
+        self._pending_deallocate = []
+        return pending
+
+    def take_unverified(self):
+        unverified = self._unverified
+        self._unverified = []
+        return unverified
+
+    def __len__(self):
+        return len(self._statements)
@@ -6,6 +6,7 @@ from modules.database.abstract.model_register import ModelRegistry
 from modules.database.base_model import BaseModel
 from modules.database.fields import *
 from modules.database.relationships import OneToOneField, ForeignKey, ManyToManyField
+from modules.database.indexes import Index
 
 
 class Usuario(BaseModel):
@@ -24,6 +25,9 @@ class Categoria(BaseModel):
     descricao = StringField()
     produtos = ManyToManyField("Produto", back_populates="categoria")
 
+    class Meta:
+        cache = {"ttl": 60, "max_entries": 10000}
+
 class Produto(BaseModel):
     nome = StringField(required=True)
     preco = FloatField(required=True)
@@ -31,12 +35,19 @@ class Produto(BaseModel):
     categoria = ForeignKey("Categoria", back_populates="produtos")
     tag = ManyToManyField("Tag", back_populates="produtos")
 
+    class Meta:
+        # Atende a paginação por (preco, id) da listagem de produtos
+        indexes = [Index("preco", "id")]
+
 class Tag(BaseModel):
     nome = StringField(required=True, unique=True)
     produtos = ManyToManyField(
         "Produto", back_populates="tag"
     ) 
 
+    class Meta:
+        cache = {"ttl": 60, "max_entries": 10000}
+
 if __name__ == "__main__":
     # DB.create_tables([Usuario, Perfil, Categoria, Produto, Tag])
     DB.create_tables([Usuario, Perfil, Categoria, Tag, Produto])  # Tag antes de Produto
@@ -97,7 +108,9 @@ if __name__ == "__main__":
     print(f"Perfil do administrador: {admin.perfil.bio}")
     print(f"Email do usuário do perfil: {admin_perfil.usuario.email}")
     informatica.produtos.add(notebook)
-    produtos_informatica = informatica.produtos.get_related_instances()
+    produtos_informatica = Produto.prefetch_related(
+        informatica.produtos.get_related_instances(), "tag"
+    )
     print(f"Produtos da categoria Informática:")
     for produto in produtos_informatica:
         print(f"- {produto.nome}: R${produto.preco}")
@@ -105,7 +118,9 @@ if __name__ == "__main__":
             f"  Tags: {', '.join([tag.nome for tag in produto.tag.get_related_instances()])}"
         )
 
-    produtos_gamer = tag_gamer.produtos.get_related_instances()
+    produtos_gamer = Produto.prefetch_related(
+        tag_gamer.produtos.get_related_instances(), "categoria"
+    )
     print(f"Produtos com a tag Gamer:")
     for produto in produtos_gamer:
         print(f"- {produto.nome} (Categoria: {produto.categoria.nome})")
\ No newline at end of file
@@ -0,0 +1,120 @@
+import unittest
+from unittest.mock import patch
+from modules.database import BaseModel, StringField, FloatField, ForeignKey, ManyToManyField, DB
+from modules.database import Count, Sum, Avg, Max
+from modules.database.query_builder import QueryBuilder
+from tests.query_builder_test import render
+
+
+class AGCategoria(BaseModel):
+    nome = StringField()
+
+
+class AGTag(BaseModel):
+    nome = StringField()
+
+
+class AGProduto(BaseModel):
+    nome = StringField()
+    preco = FloatField()
+    categoria = ForeignKey("AGCategoria")
+    tags = ManyToManyField("AGTag")
+
+
+class TestAggregateSql(unittest.TestCase):
+    """Testes para a montagem de SQL de count, aggregate e annotate"""
+
+    def test_simple_count(self):
+        query, params = QueryBuilder(AGProduto).where(categoria=3).order_by("nome").count_query()
+        self.assertEqual(
+            render(query),
+            'SELECT COUNT(*) FROM "agproduto" WHERE "agproduto"."categoria_id" = %s'
+        )
+        self.assertEqual(params, [3])
+
+    def test_sliced_count_uses_subquery(self):
+        query, _ = QueryBuilder(AGProduto).limit(10).count_query()
+        self.assertEqual(
+            render(query),
+            'SELECT COUNT(*) FROM (SELECT "agproduto".* FROM "agproduto" LIMIT 10) AS "_sub"'
+        )
+
+    def test_aggregate(self):
+        query, _ = QueryBuilder(AGProduto).aggregate_query({
+            "total": Sum("preco"), "media": Avg("preco", distinct=True)
+        })
+        self.assertEqual(
+            render(query),
+            'SELECT SUM("agproduto"."preco") AS "total", '
+            'AVG(DISTINCT "agproduto"."preco") AS "media" FROM "agproduto"'
+        )
+
+    def test_annotate_groups_by_selected_columns(self):
+        builder = QueryBuilder(AGProduto).select("categoria_id").annotate(total=Count("id"))
+        builder.having(total=(">", 5)).order_by("-total")
+        query, params = builder.build()
+        self.assertEqual(
+            render(query),
+            'SELECT "agproduto"."categoria_id", COUNT("agproduto"."id") AS "total" FROM "agproduto" '
+            'GROUP BY "agproduto"."categoria_id" HAVING COUNT("agproduto"."id") > %s ORDER BY "total" DESC'
+        )
+        self.assertEqual(params, [5])
+
+    def test_annotate_models_groups_by_primary_key(self):
+        query, _ = QueryBuilder(AGProduto).annotate(maior=Max("preco")).build()
+        self.assertIn('GROUP BY "agproduto"."id"', render(query))
+
+    def test_having_requires_annotation(self):
+        with self.assertRaises(ValueError):
+            QueryBuilder(AGProduto).having(total=1)
+
+
+class TestAggregateQuerySet(unittest.TestCase):
+    """Testes para count, aggregate e annotate no QuerySet"""
+
+    @patch.object(QueryBuilder, '_fetch_one')
+    def test_count_returns_scalar(self, mock_fetch):
+        mock_fetch.return_value = (42,)
+        self.assertEqual(AGProduto.query().filter(nome="a").count(), 42)
+
+    @patch.object(QueryBuilder, '_fetch_one')
+    def test_count_uses_result_cache(self, mock_fetch):
+        self.assertEqual(AGProduto.find_by().count(), 0)
+        mock_fetch.assert_not_called()
+
+    @patch.object(QueryBuilder, '_fetch_one')
+    def test_aggregate_default_alias(self, mock_fetch):
+        mock_fetch.return_value = (10.5, 3)
+        result = AGProduto.query().aggregate(Sum("preco"), quantidade=Count())
+        self.assertEqual(result, {"preco__sum": 10.5, "quantidade": 3})
+
+    def test_aggregate_on_empty_queryset(self):
+        result = AGProduto.query().none().aggregate(Sum("preco"), Count())
+        self.assertEqual(result, {"preco__sum": None, "count": 0})
+
+    @patch.object(QueryBuilder, 'execute_tuples')
+    def test_values_annotate(self, mock_execute):
+        mock_execute.return_value = [(1, 4), (2, 7)]
+        rows = list(AGProduto.query().values("categoria").annotate(total=Count("id")))
+        self.assertEqual(rows, [{"categoria": 1, "total": 4}, {"categoria": 2, "total": 7}])
+
+    @patch.object(QueryBuilder, 'execute')
+    def test_annotated_instances(self, mock_execute):
+        mock_execute.return_value = [{"id": 1, "nome": "a", "preco": 1.0, "categoria_id": None, "maior": 9.0}]
+        produto = AGProduto.query().annotate(maior=Max("preco")).first()
+        self.assertEqual(produto.maior, 9.0)
+        self.assertEqual(produto.get_dirty_fields(), {})
+
+    @patch.object(DB, 'execute_query')
+    def test_many_to_many_count(self, mock_execute):
+        mock_execute.return_value = [{"total": 5}]
+        produto = AGProduto.from_db_row({"id": 1, "nome": "a", "preco": 1.0, "categoria_id": None})
+        self.assertEqual(produto.tags.count(), 5)
+        self.assertIn("COUNT(*)", mock_execute.call_args[0][0])
+
+        produto.tags.set_cache([AGTag(nome="x")])
+        self.assertEqual(produto.tags.count(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+from modules.database import async_db
+from modules.database.async_db import AsyncDB, to_async_sql
+from modules.database.base_model import BaseModel
+from modules.database.connection import DatabaseError
+from modules.database.fields import StringField, FloatField
+from modules.database.relationships import ForeignKey, ManyToManyField
+from modules.database.query_builder import QueryBuilder
+
+
+class AsyncProduto(BaseModel):
+    __tablename__ = "async_produtos"
+    nome = StringField(required=True)
+    preco = FloatField()
+
+
+class AsyncCategoria(BaseModel):
+    nome = StringField()
+
+
+class AsyncTag(BaseModel):
+    nome = StringField()
+
+
+class AsyncItem(BaseModel):
+    nome = StringField()
+    categoria = ForeignKey("AsyncCategoria")
+    tags = ManyToManyField("AsyncTag")
+
+
+@unittest.skipIf(async_db.psycopg is None, "psycopg 3 não instalado")
+class TestAsyncSql(unittest.TestCase):
+    """Testes para a conversão de SQL composto para o psycopg 3"""
+
+    def test_converts_composed_query(self):
+        query, params = QueryBuilder(AsyncProduto).where(nome="Caneta").limit(5).build()
+        converted = to_async_sql(query)
+
+        self.assertIsInstance(converted, async_db.pg3_sql.Composed)
+        self.assertEqual(
+            converted.as_string(None),
+            'SELECT "async_produtos".* FROM "async_produtos" '
+            'WHERE "async_produtos"."nome" = %s LIMIT 5'
+        )
+        self.assertEqual(params, ["Caneta"])
+
+    def test_plain_string_passthrough(self):
+        self.assertEqual(to_async_sql("SELECT 1"), "SELECT 1")
+
+    def test_unsupported_type(self):
+        with self.assertRaises(TypeError):
+            to_async_sql(42)
+
+
+class TestAsyncModel(unittest.IsolatedAsyncioTestCase):
+    """Testes para as operações assíncronas do modelo"""
+
+    async def test_connection_requires_connect(self):
+        with self.assertRaises(DatabaseError):
+            async with AsyncDB.connection():
+                pass
+
+    @patch.object(AsyncDB, 'execute_query', new_callable=AsyncMock)
+    async def test_asave_insert_and_update(self, mock_execute):
+        mock_execute.return_value = [{"id": 3}]
+        produto = AsyncProduto(nome="Caneta", preco=2.5)
+        await produto.asave()
+
+        self.assertEqual(produto.id, 3)
+        self.assertIs(mock_execute.call_args[0][0], AsyncProduto._statements["insert"])
+
+        mock_execute.reset_mock()
+        await produto.asave()
+        mock_execute.assert_not_called()
+
+        produto.preco = 3.0
+        await produto.asave()
+        query, params = mock_execute.call_args[0]
+        self.assertIn("SET preco = %s", query)
+        self.assertEqual(params, [3.0, 3])
+
+    @patch.object(AsyncDB, 'execute_query', new_callable=AsyncMock)
+    async def test_afind_by_id(self, mock_execute):
+        mock_execute.return_value = [{"id": 1, "nome": "Caneta", "preco": 2.5}]
+        produto = await AsyncProduto.afind_by_id(1)
+
+        self.assertEqual(produto.nome, "Caneta")
+        self.assertEqual(produto.get_dirty_fields(), {})
+
+    @patch.object(AsyncDB, 'execute_query', new_callable=AsyncMock)
+    async def test_gather_runs_queries_concurrently(self, mock_execute):
+        mock_execute.side_effect = lambda query, params: [{"id": params[0], "nome": "x", "preco": 1.0}]
+        produtos = await asyncio.gather(*(AsyncProduto.afind_by_id(i) for i in (1, 2, 3)))
+
+        self.assertEqual([produto.id for produto in produtos], [1, 2, 3])
+
+    @patch.object(AsyncDB, 'execute_query', new_callable=AsyncMock)
+    async def test_queryset_async_iteration(self, mock_execute):
+        mock_execute.return_value = [{"id": 1, "nome": "a", "preco": 1.0}, {"id": 2, "nome": "b", "preco": 2.0}]
+        queryset = AsyncProduto.query().filter(preco=(">", 0.5))
+
+        nomes = [produto.nome async for produto in queryset]
+        self.assertEqual(nomes, ["a", "b"])
+
+        # O resultado fica em cache no QuerySet
+        self.assertEqual(len(queryset), 2)
+        mock_execute.assert_called_once()
+
+    async def test_async_prefetch_related(self):
+        rows = [{"id": 1, "nome": "a", "categoria_id": 10}, {"id": 2, "nome": "b", "categoria_id": 10}]
+        categorias = [{"id": 10, "nome": "Papelaria"}]
+        tags = [{"id": 5, "nome": "Promo", "_prefetch_parent_id": 1}]
+        queryset = AsyncItem.query().prefetch_related("categoria", "tags")
+        with patch.object(AsyncDB, 'execute_query', new_callable=AsyncMock, side_effect=[rows, categorias, tags]) as mock_execute:
+            itens = [item async for item in queryset]
+
+        self.assertEqual(mock_execute.call_count, 3)
+        self.assertEqual(mock_execute.call_args_list[1][0][1], ([10],))
+        self.assertIn("= ANY(%s)", mock_execute.call_args_list[2][0][0])
+        self.assertEqual(mock_execute.call_args_list[2][0][1], ([1, 2],))
+        self.assertIs(itens[0]._categoria_cache, itens[1]._categoria_cache)
+        self.assertEqual([tag.nome for tag in itens[0].tags], ["Promo"])
+        self.assertEqual(itens[1].tags.get_related_instances(), [])
+
+    async def test_async_prefetch_unknown_relation(self):
+        queryset = AsyncProduto.query().prefetch_related("tags")
+        with patch.object(AsyncDB, 'execute_query', new_callable=AsyncMock, return_value=[]):
+            with self.assertRaises(ValueError):
+                await queryset.afirst()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import weakref
+from unittest.mock import patch
+from modules.database import BaseModel, StringField, FloatField, ForeignKey, DB
+
+
+class DirtyCategoria(BaseModel):
+    nome = StringField(required=True)
+
+
+class DirtyProduto(BaseModel):
+    nome = StringField(required=True)
+    preco = FloatField()
+    categoria = ForeignKey("DirtyCategoria")
+
+
+class TestDirtyTracking(unittest.TestCase):
+    """Testes para o rastreamento de campos alterados"""
+
+    def load(self):
+        return DirtyProduto.from_db_row({"id": 1, "nome": "Notebook", "preco": 10.0, "categoria_id": 3})
+
+    def test_loaded_instance_is_clean(self):
+        self.assertEqual(self.load().get_dirty_fields(), {})
+
+    def test_unsaved_instance_reports_all_columns(self):
+        produto = DirtyProduto(nome="Mouse", preco=1.0)
+        self.assertEqual(produto.get_dirty_fields(), {"nome": "Mouse", "preco": 1.0})
+
+    @patch.object(DB, 'execute_query')
+    def test_clean_save_skips_query(self, mock_execute_query):
+        self.load().save()
+        mock_execute_query.assert_not_called()
+
+    @patch.object(DB, 'execute_query')
+    def test_update_writes_only_changed_columns(self, mock_execute_query):
+        produto = self.load()
+        produto.preco = 12.5
+        produto.save()
+
+        query, values = mock_execute_query.call_args[0]
+        self.assertIn("SET preco = %s", query)
+        self.assertNotIn("nome", query)
+        self.assertEqual(values, [12.5, 1])
+
+    @patch.object(DB, 'execute_query')
+    def test_foreign_key_change_is_tracked(self, mock_execute_query):
+        produto = self.load()
+        produto.categoria = DirtyCategoria(id=4, nome="Games")
+        self.assertEqual(produto.get_dirty_fields(), {"categoria_id": 4})
+
+    @patch.object(DB, 'execute_query')
+    def test_save_marks_clean(self, mock_execute_query):
+        mock_execute_query.return_value = [{"id": 9}]
+        produto = DirtyProduto(nome="Teclado").save()
+        self.assertEqual(produto.get_dirty_fields(), {})
+        produto.save()
+        self.assertEqual(mock_execute_query.call_count, 1)
+
+
+class TestSlots(unittest.TestCase):
+    """Testes para as instâncias compactas baseadas em __slots__"""
+
+    def test_slots_generated_for_columns_and_caches(self):
+        self.assertEqual(
+            set(DirtyProduto.__slots__),
+            {"id", "_loaded_values", "nome", "preco", "categoria_id", "_categoria_cache"}
+        )
+        self.assertIsInstance(DirtyProduto._fields["nome"], StringField)
+
+    def test_hydrated_instance_has_no_dict_entries(self):
+        produto = DirtyProduto.from_db_row({"id": 1, "nome": "Notebook", "preco": 10.0, "categoria_id": 3})
+        self.assertEqual(produto.__dict__, {})
+        self.assertIsInstance(produto._loaded_values, tuple)
+
+    def test_unset_column_reads_as_none(self):
+        produto = DirtyProduto(nome="Mouse")
+        self.assertIsNone(produto.preco)
+        self.assertFalse(hasattr(produto, "id"))
+        with self.assertRaises(AttributeError):
+            produto.inexistente
+
+    def test_extra_attributes_and_weakrefs(self):
+        produto = DirtyProduto(nome="Mouse")
+        produto.total = 3
+        self.assertEqual(produto.__dict__, {"total": 3})
+        self.assertIs(weakref.ref(produto)(), produto)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import asyncio
+import unittest
+from datetime import date
+from unittest.mock import patch, MagicMock
+from modules.database import BaseModel, StringField, DateField, DB
+from modules.database.async_db import AsyncDB
+from modules.database.identity_map import session
+
+
+class BtCategoria(BaseModel):
+    nome = StringField()
+
+
+class BtPedido(BaseModel):
+    codigo = StringField()
+    criado_em = DateField()
+
+
+class TestBatch(unittest.TestCase):
+    """Testes para o agrupamento de leituras com DB.batch()"""
+
+    def test_lookups_for_one_model_share_a_query(self):
+        rows = [{"r0": [{"id": 1, "nome": "a"}, {"id": 2, "nome": "b"}]}]
+        with patch.object(DB, 'execute_read', return_value=rows) as execute_read:
+            with DB.batch() as batch:
+                first = batch.find_by_id(BtCategoria, 1)
+                second = batch.find_by_id(BtCategoria, 2)
+                missing = batch.find_by_id(BtCategoria, 3)
+                self.assertFalse(first.done())
+
+        query, params = execute_read.call_args[0]
+        self.assertIn(f"FROM (SELECT * FROM {BtCategoria.__tablename__} WHERE id = ANY(%s)) AS _b0", query)
+        self.assertEqual(params, ([1, 2, 3],))
+        self.assertFalse(execute_read.call_args[1]["prepare"])
+        self.assertEqual(first.result().nome, "a")
+        self.assertEqual(second.result().nome, "b")
+        self.assertIsNone(missing.result())
+
+    def test_raw_results_are_json_even_when_alone(self):
+        rows = [{"r0": [{"codigo": "X", "criado_em": "2024-05-01"}]}]
+        with patch.object(DB, 'execute_read', return_value=rows) as execute_read:
+            with DB.batch() as batch:
+                pedidos = batch.execute("SELECT codigo, criado_em FROM btpedido")
+        self.assertIn("json_agg", execute_read.call_args[0][0])
+        self.assertEqual(pedidos.result(), [{"codigo": "X", "criado_em": "2024-05-01"}])
+
+    def test_independent_reads_share_one_round_trip(self):
+        combined = [{
+            "r0": [{"id": 1, "nome": "a"}],
+            "r1": [{"id": 7, "codigo": "X", "criado_em": "2024-05-01"}],
+            "r2": [{"total": 3}],
+        }]
+        with patch.object(DB, 'execute_read', return_value=combined) as execute_read:
+            with DB.batch() as batch:
+                categoria = batch.find_by_id(BtCategoria, 1)
+                pedido = batch.find_by_id(BtPedido, 7)
+                total = batch.execute("SELECT count(*) AS total FROM btpedido WHERE codigo = %s;", ("X",))
+
+        execute_read.assert_called_once()
+        query, params = execute_read.call_args[0]
+        self.assertEqual(query.count("json_agg"), 3)
+        self.assertEqual(params, ([1], [7], "X"))
+        self.assertEqual(categoria.result().nome, "a")
+        self.assertEqual(pedido.result().criado_em, date(2024, 5, 1))
+        self.assertEqual(total.result(), [{"total": 3}])
+
+    def test_identity_map_skips_the_database(self):
+        with session():
+            cached = BtCategoria.from_db_row({"id": 5, "nome": "mapa"})
+            with patch.object(DB, 'execute_read') as execute_read:
+                with DB.batch() as batch:
+                    future = batch.find_by_id(BtCategoria, 5)
+                self.assertTrue(future.done())
+                self.assertIs(future.result(), cached)
+                execute_read.assert_not_called()
+
+    def test_result_flushes_pending_reads(self):
+        with patch.object(DB, 'execute_read', return_value=[{"r0": [{"id": 1, "nome": "a"}]}]) as execute_read:
+            batch = DB.batch()
+            future = batch.find_by_id(BtCategoria, 1)
+            self.assertEqual(future.result().nome, "a")
+            batch.flush()
+        execute_read.assert_called_once()
+
+    def test_exception_discards_the_batch(self):
+        with patch.object(DB, 'execute_read') as execute_read:
+            with self.assertRaises(ValueError):
+                with DB.batch() as batch:
+                    future = batch.find_by_id(BtCategoria, 1)
+                    raise ValueError("falhou")
+        execute_read.assert_not_called()
+        with self.assertRaises(RuntimeError):
+            future.result()
+
+    def test_query_error_reaches_every_future(self):
+        with patch.object(DB, 'execute_read', side_effect=RuntimeError("conexão perdida")):
+            batch = DB.batch()
+            first = batch.find_by_id(BtCategoria, 1)
+            second = batch.find_by_id(BtPedido, 2)
+            with self.assertRaises(RuntimeError):
+                batch.flush()
+        for future in (first, second):
+            with self.assertRaisesRegex(RuntimeError, "conexão perdida"):
+                future.result()
+
+
+class TestAsyncBatch(unittest.TestCase):
+    """Testes para o lote assíncrono em modo pipeline"""
+
+    def test_pipeline_sends_each_query(self):
+        conn = MagicMock()
+        cursors = []
+        results = [[{"id": 1, "nome": "a"}], []]
+
+        def make_cursor(row_factory=None):
+            cursor = MagicMock()
+            cursor.execute = MagicMock(side_effect=lambda *args, **kwargs: asyncio.sleep(0))
+            cursor.fetchone = MagicMock(side_effect=lambda rows=results[len(cursors)]: asyncio.sleep(0, result={"r0": rows}))
+            cursor.close = MagicMock(side_effect=lambda: asyncio.sleep(0))
+            cursors.append(cursor)
+            return cursor
+
+        conn.cursor.side_effect = make_cursor
+        conn.pipeline.return_value.__aenter__ = MagicMock(side_effect=lambda: asyncio.sleep(0))
+        conn.pipeline.return_value.__aexit__ = MagicMock(side_effect=lambda *args: asyncio.sleep(0, result=False))
+        conn.rollback = MagicMock(side_effect=lambda: asyncio.sleep(0))
+
+        class FakeConnection:
+            async def __aenter__(self):
+                return conn
+
+            async def __aexit__(self, *args):
+                return False
+
+        async def run():
+            async with AsyncDB.batch() as batch:
+                categoria = batch.find_by_id(BtCategoria, 1)
+                pedido = batch.find_by_id(BtPedido, 2)
+            return categoria, pedido
+
+        with patch.object(AsyncDB, 'connection', return_value=FakeConnection()):
+            categoria, pedido = asyncio.run(run())
+
+        self.assertEqual(len(cursors), 2)
+        self.assertFalse(cursors[0].execute.call_args[1]["prepare"])
+        conn.pipeline.assert_called_once()
+        self.assertEqual(categoria.result().id, 1)
+        self.assertIsNone(pedido.result())
+
+
+if __name__ == '__main__':
+    unittest.main()
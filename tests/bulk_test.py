@@ -0,0 +1,164 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from modules.database import BaseModel, StringField, FloatField, DB
+from modules.database.identity_map import session
+
+
+class BulkProduto(BaseModel):
+    nome = StringField(required=True)
+    preco = FloatField()
+
+
+def mock_cursor_context(mock_get_connection):
+    cursor = MagicMock()
+    db = MagicMock()
+    db.get_cursor.return_value.__enter__.return_value = cursor
+    mock_get_connection.return_value = db
+    return db, cursor
+
+
+class TestBulkCreate(unittest.TestCase):
+    """Testes para inserção em lote"""
+
+    @patch('psycopg2.extras.execute_values')
+    @patch.object(DB, 'get_connection')
+    def test_values_batches_and_assigns_ids(self, mock_get_connection, mock_execute_values):
+        db, cursor = mock_cursor_context(mock_get_connection)
+        mock_execute_values.side_effect = [[(1,), (2,)], [(3,)]]
+
+        objs = [BulkProduto(nome=f"p{i}", preco=1.0) for i in range(3)]
+        BulkProduto.bulk_create(objs, batch_size=2)
+
+        self.assertEqual([obj.id for obj in objs], [1, 2, 3])
+        self.assertEqual([obj.get_dirty_fields() for obj in objs], [{}, {}, {}])
+        self.assertEqual(mock_execute_values.call_count, 2)
+        query = mock_execute_values.call_args_list[0][0][1]
+        self.assertEqual(query, "INSERT INTO bulkproduto (nome, preco) VALUES %s RETURNING id")
+        self.assertEqual(mock_execute_values.call_args_list[1][0][2], [("p2", 1.0)])
+        db.get_cursor.assert_called_once()
+
+    @patch('psycopg2.extras.execute_values')
+    @patch.object(DB, 'get_connection')
+    def test_created_objects_join_identity_map(self, mock_get_connection, mock_execute_values):
+        mock_cursor_context(mock_get_connection)
+        mock_execute_values.return_value = [(4,)]
+        with session():
+            produto = BulkProduto(nome="a", preco=1.0)
+            BulkProduto.bulk_create([produto])
+            self.assertIs(BulkProduto.find_by_id(4), produto)
+
+    @patch.object(DB, 'get_connection')
+    def test_validates_before_any_query(self, mock_get_connection):
+        db, cursor = mock_cursor_context(mock_get_connection)
+        objs = [BulkProduto(nome="ok"), BulkProduto(nome=None)]
+        with self.assertRaises(ValueError):
+            BulkProduto.bulk_create(objs)
+        db.get_cursor.assert_not_called()
+
+    @patch.object(DB, 'get_connection')
+    def test_copy_reserves_ids(self, mock_get_connection):
+        db, cursor = mock_cursor_context(mock_get_connection)
+        cursor.fetchall.return_value = [(10,), (11,)]
+        copied = {}
+        cursor.copy_expert.side_effect = lambda sql, buffer: copied.update(sql=sql, data=buffer.read())
+
+        objs = [BulkProduto(nome='a "b"', preco=2.5), BulkProduto(nome="c")]
+        BulkProduto.bulk_create(objs, method="copy")
+
+        self.assertEqual([obj.id for obj in objs], [10, 11])
+        objs[1].preco = 3.0
+        self.assertEqual([obj.get_dirty_fields() for obj in objs], [{}, {"preco": 3.0}])
+        self.assertIn("COPY bulkproduto (id, nome, preco) FROM STDIN", copied["sql"])
+        self.assertEqual(copied["data"], '10,"a ""b""","2.5"\n11,"c",\n')
+
+    def test_invalid_method(self):
+        with self.assertRaises(ValueError):
+            BulkProduto.bulk_create([BulkProduto(nome="x")], method="csv")
+
+
+class TestBulkUpdateAndUpsert(unittest.TestCase):
+    """Testes para atualização em lote e upsert"""
+
+    @patch('psycopg2.extras.execute_values')
+    @patch.object(DB, 'get_connection')
+    def test_bulk_update_uses_typed_values_list(self, mock_get_connection, mock_execute_values):
+        db, cursor = mock_cursor_context(mock_get_connection)
+        cursor.rowcount = 2
+
+        objs = [BulkProduto(id=1, nome="a", preco=None), BulkProduto(id=2, nome="b", preco=3.0)]
+        updated = BulkProduto.bulk_update(objs, fields=["preco"])
+
+        self.assertEqual(updated, 2)
+        args, kwargs = mock_execute_values.call_args
+        self.assertIn("FROM (VALUES %s) AS v (id, preco)", args[1])
+        self.assertIn("SET preco = v.preco", args[1])
+        self.assertEqual(args[2], [(1, None), (2, 3.0)])
+        self.assertEqual(kwargs["template"], "(%s::INTEGER, %s::REAL)")
+
+    @patch.object(DB, 'execute_query')
+    @patch('psycopg2.extras.execute_values')
+    @patch.object(DB, 'get_connection')
+    def test_bulk_update_marks_written_columns_clean(self, mock_get_connection, mock_execute_values, mock_execute_query):
+        mock_cursor_context(mock_get_connection)
+        first = BulkProduto.from_db_row({"id": 1, "nome": "a", "preco": 1.0})
+        second = BulkProduto.from_db_row({"id": 2, "nome": "b", "preco": 2.0})
+        first.preco = 5.0
+        second.preco = 6.0
+        second.nome = "c"
+        BulkProduto.bulk_update([first, second], fields=["preco"])
+
+        first.save()
+        mock_execute_query.assert_not_called()
+        # Só a coluna gravada fica limpa; nome continua pendente
+        self.assertEqual(second.get_dirty_fields(), {"nome": "c"})
+
+    def test_bulk_update_requires_saved_objects(self):
+        with self.assertRaises(ValueError):
+            BulkProduto.bulk_update([BulkProduto(nome="a")], fields=["nome"])
+
+    def test_bulk_update_unknown_field(self):
+        with self.assertRaises(ValueError):
+            BulkProduto.bulk_update([BulkProduto(id=1, nome="a")], fields=["inexistente"])
+
+    @patch('psycopg2.extras.execute_values')
+    @patch.object(DB, 'get_connection')
+    def test_upsert_do_update_assigns_ids(self, mock_get_connection, mock_execute_values):
+        db, cursor = mock_cursor_context(mock_get_connection)
+        mock_execute_values.return_value = [(7, True), (8, False)]
+
+        objs = [BulkProduto(nome="a", preco=1.0), BulkProduto(nome="b", preco=2.0)]
+        with session():
+            BulkProduto.upsert(objs, conflict_fields=["nome"], update_fields=["preco"])
+            self.assertIs(BulkProduto.find_by_id(8), objs[1])
+
+        query = mock_execute_values.call_args[0][1]
+        self.assertIn("ON CONFLICT (nome) DO UPDATE SET preco = EXCLUDED.preco", query)
+        self.assertIn("RETURNING id, (xmax = 0) AS inserted", query)
+        self.assertEqual([obj.id for obj in objs], [7, 8])
+        self.assertEqual([obj.get_dirty_fields() for obj in objs], [{}, {}])
+
+    @patch('psycopg2.extras.execute_values')
+    @patch.object(DB, 'get_connection')
+    def test_upsert_do_nothing(self, mock_get_connection, mock_execute_values):
+        db, cursor = mock_cursor_context(mock_get_connection)
+        mock_execute_values.return_value = []
+
+        objs = [BulkProduto(nome="a")]
+        BulkProduto.upsert(objs, conflict_fields=["nome"])
+
+        self.assertIn("ON CONFLICT (nome) DO NOTHING", mock_execute_values.call_args[0][1])
+        self.assertIsNone(getattr(objs[0], "id", None))
+
+
+class TestSaveInsert(unittest.TestCase):
+    """Testes para o INSERT de save()"""
+
+    @patch.object(DB, 'execute_query')
+    def test_save_assigns_returned_id(self, mock_execute_query):
+        mock_execute_query.return_value = [{"id": 42}]
+        obj = BulkProduto(nome="p").save()
+        self.assertEqual(obj.id, 42)
+
+
+if __name__ == '__main__':
+    unittest.main()
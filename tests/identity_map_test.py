@@ -0,0 +1,100 @@
+import gc
+import unittest
+from unittest.mock import patch
+from modules.database import BaseModel, StringField, ForeignKey, DB
+from modules.database.identity_map import IdentityMap, IdentityMapMiddleware, current_identity_map
+
+
+class IMCategoria(BaseModel):
+    nome = StringField()
+
+
+class IMProduto(BaseModel):
+    nome = StringField()
+    categoria = ForeignKey("IMCategoria")
+
+
+class TestIdentityMap(unittest.TestCase):
+    """Testes para o mapa de identidade por unidade de trabalho"""
+
+    def test_session_scope(self):
+        self.assertIsNone(current_identity_map())
+        with DB.session() as outer:
+            with DB.session() as inner:
+                self.assertIs(outer, inner)
+            self.assertIs(current_identity_map(), outer)
+        self.assertIsNone(current_identity_map())
+
+    def test_without_session_builds_new_instances(self):
+        row = {"id": 1, "nome": "a"}
+        self.assertIsNot(IMCategoria.from_db_row(row), IMCategoria.from_db_row(row))
+
+    def test_from_db_row_reuses_instance(self):
+        with DB.session():
+            first = IMCategoria.from_db_row({"id": 1, "nome": "a"})
+            second = IMCategoria.from_db_row({"id": 1, "nome": "a"})
+            other_model = IMProduto.from_db_row({"id": 1, "nome": "a", "categoria_id": None})
+        self.assertIs(first, second)
+        self.assertIsNot(first, other_model)
+
+    @patch.object(DB, 'execute_query')
+    def test_partial_rows_stay_out_of_the_map(self, mock_execute):
+        mock_execute.return_value = [{"id": 3, "nome": "Caneta", "categoria_id": 10}]
+        with DB.session():
+            partial = IMProduto.from_db_row({"id": 3, "nome": "Caneta"})
+            full = IMProduto.find_by_id(3)
+            self.assertIsNot(full, partial)
+            self.assertEqual(full.categoria_id, 10)
+            self.assertIs(IMProduto.from_db_row({"id": 3, "nome": "Caneta"}), full)
+        mock_execute.assert_called_once()
+
+    def test_weak_references(self):
+        identity_map = IdentityMap()
+        identity_map.add(IMCategoria.from_db_row({"id": 5, "nome": "a"}))
+        gc.collect()
+        self.assertEqual(len(identity_map), 0)
+
+    @patch.object(DB, 'execute_query')
+    def test_find_by_id_hits_map(self, mock_execute):
+        mock_execute.return_value = [{"id": 10, "nome": "Papelaria"}]
+        with DB.session():
+            first = IMCategoria.find_by_id(10)
+            second = IMCategoria.find_by_id(10)
+        self.assertIs(first, second)
+        mock_execute.assert_called_once()
+
+    @patch.object(DB, 'execute_query')
+    def test_foreign_key_loaded_once(self, mock_execute):
+        mock_execute.return_value = [{"id": 10, "nome": "Papelaria"}]
+        with DB.session():
+            produtos = [
+                IMProduto.from_db_row({"id": i, "nome": str(i), "categoria_id": 10})
+                for i in range(1, 4)
+            ]
+            categorias = [produto.categoria for produto in produtos]
+        self.assertTrue(all(categoria is categorias[0] for categoria in categorias))
+        mock_execute.assert_called_once()
+
+    @patch.object(DB, 'execute_query')
+    def test_save_and_delete_update_map(self, mock_execute):
+        mock_execute.return_value = [{"id": 7}]
+        with DB.session() as identity_map:
+            categoria = IMCategoria(nome="Nova").save()
+            self.assertIn((IMCategoria, 7), identity_map)
+            categoria.delete()
+            self.assertNotIn((IMCategoria, 7), identity_map)
+
+    def test_middleware_scopes_request(self):
+        class FakeRequest:
+            pass
+
+        middleware = IdentityMapMiddleware()
+        request = middleware.process_request(FakeRequest())
+        self.assertIsNotNone(current_identity_map())
+        response = middleware.process_response(request, "ok")
+        self.assertEqual(response, "ok")
+        self.assertIsNone(current_identity_map())
+
+
+if __name__ == '__main__':
+    unittest.main()
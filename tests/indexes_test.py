@@ -0,0 +1,55 @@
+import unittest
+from modules.database import BaseModel, StringField, FloatField, ForeignKey, Index
+from modules.database.indexes import index_name
+
+
+class IXCategoria(BaseModel):
+    nome = StringField(unique=True)
+
+
+class IXProduto(BaseModel):
+    nome = StringField(index=True)
+    preco = FloatField()
+    descricao = StringField()
+    categoria = ForeignKey("IXCategoria")
+    fornecedor = ForeignKey("IXCategoria", index=False)
+
+    class Meta:
+        indexes = [
+            Index("categoria", "-preco", include=("nome",)),
+            Index("nome", name="ix_produtos_ativos", where="preco > 0", method="btree"),
+        ]
+
+
+class TestIndexes(unittest.TestCase):
+    """Testes para a declaração e criação de índices"""
+
+    def test_collects_field_and_meta_indexes(self):
+        sqls = [index.get_sql(IXProduto) for index in IXProduto._collect_indexes()]
+        self.assertEqual(sqls, [
+            "CREATE INDEX IF NOT EXISTS ix_ixproduto_nome ON ixproduto (nome)",
+            "CREATE INDEX IF NOT EXISTS ix_ixproduto_categoria_id ON ixproduto (categoria_id)",
+            "CREATE INDEX IF NOT EXISTS ix_ixproduto_categoria_id_preco ON ixproduto "
+            "(categoria_id, preco DESC) INCLUDE (nome)",
+            "CREATE INDEX IF NOT EXISTS ix_produtos_ativos ON ixproduto USING btree (nome) WHERE preco > 0",
+        ])
+
+    def test_unique_field(self):
+        index, = IXCategoria._collect_indexes()
+        self.assertEqual(
+            index.get_sql(IXCategoria, concurrently=True),
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_ixcategoria_nome ON ixcategoria (nome)"
+        )
+
+    def test_long_names_are_hashed(self):
+        name = index_name("ix", "tabela_" * 10, ["coluna"])
+        self.assertEqual(len(name), 63)
+        self.assertNotEqual(name, index_name("ix", "tabela_" * 10, ["outra"]))
+
+    def test_index_requires_fields(self):
+        with self.assertRaises(ValueError):
+            Index()
+
+
+if __name__ == '__main__':
+    unittest.main()
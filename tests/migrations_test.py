@@ -0,0 +1,181 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from modules.database import BaseModel, StringField, DB
+from modules.database.abstract.migration import Migration, MigrationManager, MIGRATION_LOCK_KEY
+from modules.database.migrations import load_migrations, make_migrations, render_migration
+from modules.database.operations import RunSQL, Backfill
+from modules.database.schema import SchemaSnapshot
+
+
+class MGCliente(BaseModel):
+    nome = StringField()
+
+
+def make_migration(*operations):
+    migration = Migration()
+    migration.operations = list(operations)
+    return migration
+
+
+class TestMigrations(unittest.TestCase):
+    """Testes para o MigrationManager e a geração de migrações"""
+
+    def setUp(self):
+        self.conn = MagicMock()
+        self.conn.autocommit = False
+        self.cursor = self.conn.cursor.return_value.__enter__.return_value
+        self.cursor.fetchall.return_value = [("0001_inicial",)]
+        database = MagicMock()
+        database.connection.return_value.__enter__.return_value = self.conn
+        self.manager = MigrationManager(database)
+
+    def executed(self):
+        return [call[0][0] for call in self.cursor.execute.call_args_list]
+
+    def test_pending_migrations_share_one_transaction(self):
+        migrations = [
+            ("0001_inicial", make_migration(RunSQL("CREATE TABLE a (id INT)"))),
+            ("0002_b", make_migration(RunSQL("CREATE TABLE b (id INT)"))),
+            ("0003_c", make_migration(RunSQL("CREATE TABLE c (id INT)"))),
+        ]
+        self.assertEqual(self.manager.migrate(migrations), ["0002_b", "0003_c"])
+
+        executed = self.executed()
+        self.assertTrue(executed[0].startswith("SELECT pg_advisory_lock"))
+        self.assertEqual(executed.count("SELECT name FROM migrations WHERE applied_at IS NOT NULL"), 1)
+        self.assertNotIn("CREATE TABLE a (id INT)", executed)
+        self.assertIn("INSERT INTO migrations (name) SELECT unnest(%s::text[])", executed)
+        self.assertTrue(executed[-1].startswith("SELECT pg_advisory_unlock"))
+        self.cursor.execute.assert_any_call(
+            "INSERT INTO migrations (name) SELECT unnest(%s::text[])", (["0002_b", "0003_c"],)
+        )
+        self.cursor.execute.assert_any_call("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+
+    def test_non_atomic_migration_runs_in_autocommit(self):
+        states = []
+        self.cursor.execute.side_effect = lambda statement, *args: states.append((statement, self.conn.autocommit))
+        index = RunSQL("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix ON a (id)", atomic=False)
+        self.manager.migrate([("0002_ix", make_migration(index))])
+
+        self.assertIn((index.sql, True), states)
+        self.assertFalse(self.conn.autocommit)
+
+    def test_failure_rolls_back_and_unlocks(self):
+        failing = make_migration(RunSQL("CREATE TABLE b (id INT)"))
+        failing.up = MagicMock(side_effect=RuntimeError("falhou"))
+        with self.assertRaises(RuntimeError):
+            self.manager.migrate([("0002_b", failing)])
+        self.conn.rollback.assert_called_once()
+        self.assertTrue(self.executed()[-1].startswith("SELECT pg_advisory_unlock"))
+
+    def test_revert_migration(self):
+        migration = make_migration(RunSQL("CREATE TABLE a (id INT)", reverse_sql="DROP TABLE a"))
+        self.assertTrue(self.manager.revert_migration(migration, "0001_inicial"))
+        self.assertIn("DROP TABLE a", self.executed())
+        self.assertFalse(self.manager.revert_migration(migration, "0009_inexistente"))
+
+    def test_irreversible_operation(self):
+        with self.assertRaises(NotImplementedError):
+            RunSQL("UPDATE a SET id = 1").backwards(self.conn)
+
+    def test_render_and_load_round_trip(self):
+        operations = [RunSQL("CREATE TABLE a (id INT)", reverse_sql="DROP TABLE a"),
+                      RunSQL("CREATE INDEX CONCURRENTLY ix ON a (id)", atomic=False)]
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "0001_auto.py"), "w") as f:
+                f.write(render_migration(operations))
+            (name, migration), = load_migrations(directory)
+        self.assertEqual(name, "0001_auto")
+        self.assertEqual(migration.operations, operations)
+        self.assertFalse(migration.atomic)
+
+    def test_make_migrations_writes_missing_ddl(self):
+        manager = MagicMock()
+        manager.get_applied_migrations.return_value = set()
+        snapshot = SchemaSnapshot()
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.object(DB, "connection"), patch.object(SchemaSnapshot, "load", return_value=snapshot):
+            paths = make_migrations(directory, models=[MGCliente], manager=manager)
+            self.assertEqual([os.path.basename(path) for path in paths], ["0001_auto.py"])
+            (_, migration), = load_migrations(directory)
+
+            operation, = migration.operations
+            self.assertTrue(operation.sql.startswith("CREATE TABLE IF NOT EXISTS mgcliente"))
+            self.assertEqual(operation.reverse_sql, "DROP TABLE IF EXISTS mgcliente CASCADE")
+
+            # Com a migração ainda pendente, gerar outra duplicaria o DDL
+            with self.assertRaises(RuntimeError):
+                make_migrations(directory, models=[MGCliente], manager=manager)
+
+
+class TestBackfill(unittest.TestCase):
+    """Testes para o backfill em lotes"""
+
+    def setUp(self):
+        self.conn = MagicMock()
+        self.conn.autocommit = True
+        self.cursor = self.conn.cursor.return_value.__enter__.return_value
+        self.cursor.rowcount = 10
+
+    def updates(self):
+        return [call[0][1] for call in self.cursor.execute.call_args_list if call[0][0].startswith("UPDATE")]
+
+    def test_walks_id_ranges_and_commits_each_chunk(self):
+        self.cursor.fetchone.side_effect = [(1, 25), None]
+        progress = []
+        backfill = Backfill("produto", "preco_centavos = round(preco * 100)", where="preco_centavos IS NULL",
+                            batch_size=10, name="preco_centavos",
+                            on_progress=lambda done, total, rows: progress.append((done, total)))
+
+        self.assertEqual(backfill.forwards(self.conn), 30)
+        self.assertEqual(self.updates(), [(1, 10), (11, 20), (21, 25)])
+        self.cursor.execute.assert_any_call(
+            "UPDATE produto SET preco_centavos = round(preco * 100) WHERE id BETWEEN %s AND %s "
+            "AND (preco_centavos IS NULL)", (1, 10)
+        )
+        checkpoints = [call[0][1] for call in self.cursor.execute.call_args_list
+                       if call[0][0].startswith("INSERT INTO migrations")]
+        self.assertEqual(checkpoints, [("backfill:preco_centavos", 10), ("backfill:preco_centavos", 20),
+                                       ("backfill:preco_centavos", 25)])
+        self.cursor.execute.assert_called_with("DELETE FROM migrations WHERE name = %s", ("backfill:preco_centavos",))
+        self.assertEqual(progress, [(10, 25), (20, 25), (25, 25)])
+        self.assertEqual(self.conn.commit.call_count, 5)
+        self.assertTrue(self.conn.autocommit)
+
+    def test_resumes_from_checkpoint(self):
+        self.cursor.fetchone.side_effect = [(1, 25), (20,)]
+        Backfill("produto", "ativo = true", batch_size=10).forwards(self.conn)
+        self.assertEqual(self.updates(), [(21, 25)])
+
+    def test_empty_table(self):
+        self.cursor.fetchone.side_effect = [(None, None), None]
+        self.assertEqual(Backfill("produto", "ativo = true").forwards(self.conn), 0)
+        self.assertEqual(self.updates(), [])
+
+    @patch("modules.database.operations.time.sleep")
+    def test_throttles_by_rate_and_replica_lag(self, sleep):
+        self.cursor.fetchone.side_effect = [(1, 10), None, (5.0,), (0,)]
+        Backfill("produto", "ativo = true", batch_size=10, rows_per_second=5, max_lag=1, lag_pause=0.5)\
+            .forwards(self.conn)
+        delays = [call[0][0] for call in sleep.call_args_list]
+        self.assertGreater(delays[0], 1.5)
+        self.assertEqual(delays[1], 0.5)
+
+    def test_failure_rolls_back_chunk(self):
+        self.cursor.fetchone.side_effect = [(1, 25), None]
+        self.cursor.execute.side_effect = [None, None, RuntimeError("falhou")]
+        with self.assertRaises(RuntimeError):
+            Backfill("produto", "ativo = true", batch_size=10).forwards(self.conn)
+        self.conn.rollback.assert_called_once()
+
+    def test_repr_round_trip(self):
+        backfill = Backfill("produto", "ativo = true", batch_size=500, name="ativo")
+        self.assertEqual(repr(backfill), "Backfill('produto', 'ativo = true', name='ativo', batch_size=500)")
+        self.assertFalse(backfill.atomic)
+        self.assertFalse(backfill.reversible)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+from unittest.mock import patch
+from modules.database import BaseModel, StringField, DB
+from modules.database.model_cache import ModelCache
+
+
+class MCTag(BaseModel):
+    nome = StringField(required=True, unique=True)
+    descricao = StringField()
+
+    class Meta:
+        cache = {"ttl": 60, "max_entries": 2}
+
+
+class MCProduto(BaseModel):
+    nome = StringField()
+
+
+class TestModelCache(unittest.TestCase):
+    """Testes para o cache LRU com TTL de modelos"""
+
+    def test_lru_eviction(self):
+        cache = ModelCache(ttl=None, max_entries=2)
+        cache.set("id", 1, {"id": 1})
+        cache.set("id", 2, {"id": 2})
+        cache.get("id", 1)
+        cache.set("id", 3, {"id": 3})
+
+        self.assertIsNone(cache.get("id", 2))
+        self.assertEqual(cache.get("id", 1), {"id": 1})
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_expiration(self):
+        cache = ModelCache(ttl=10)
+        with patch('modules.database.model_cache.time.monotonic', return_value=100.0):
+            cache.set("id", 1, {"id": 1})
+        with patch('modules.database.model_cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get("id", 1))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_invalidate_removes_every_key_of_row(self):
+        cache = ModelCache()
+        cache.set("id", 1, {"id": 1, "nome": "a"})
+        cache.set("nome", "a", {"id": 1, "nome": "a"})
+        cache.invalidate(1)
+        self.assertEqual(len(cache), 0)
+
+    def test_hit_ratio(self):
+        cache = ModelCache()
+        cache.set("id", 1, {"id": 1})
+        cache.get("id", 1)
+        cache.get("id", 2)
+        self.assertEqual(cache.stats()["hit_ratio"], 0.5)
+
+
+class TestModelReadThrough(unittest.TestCase):
+    """Testes para a leitura via cache em find_by_id e find_by"""
+
+    def setUp(self):
+        MCTag._model_cache.clear()
+
+    def test_only_models_with_meta_are_cached(self):
+        self.assertIsNone(MCProduto._model_cache)
+        self.assertIsNone(MCProduto.cache_stats())
+        self.assertEqual(MCTag._model_cache.max_entries, 2)
+        self.assertIn("MCTag", DB.cache_stats())
+        self.assertNotIn("MCProduto", DB.cache_stats())
+
+    @patch.object(DB, 'execute_query')
+    def test_find_by_id_reads_through(self, mock_execute):
+        mock_execute.return_value = [{"id": 1, "nome": "promo", "descricao": None}]
+        first = MCTag.find_by_id(1)
+        second = MCTag.find_by_id(1)
+
+        mock_execute.assert_called_once()
+        self.assertIsNot(first, second)
+        self.assertEqual(second.nome, "promo")
+        self.assertEqual(second.get_dirty_fields(), {})
+
+    @patch('modules.database.query_builder.QueryBuilder.execute')
+    def test_find_by_unique_field(self, mock_execute):
+        mock_execute.return_value = [{"id": 1, "nome": "promo", "descricao": None}]
+        self.assertEqual(MCTag.find_by(nome="promo").first().id, 1)
+        self.assertEqual(MCTag.find_by(nome="promo").first().id, 1)
+        mock_execute.assert_called_once()
+
+        # Campos não únicos não passam pelo cache
+        list(MCTag.find_by(descricao="x"))
+        list(MCTag.find_by(descricao="x"))
+        self.assertEqual(mock_execute.call_count, 3)
+
+    @patch.object(DB, 'execute_query')
+    def test_save_and_delete_invalidate(self, mock_execute):
+        mock_execute.return_value = [{"id": 1, "nome": "promo", "descricao": None}]
+        tag = MCTag.find_by_id(1)
+        tag.descricao = "nova"
+        tag.save()
+        MCTag.find_by_id(1)
+        self.assertEqual(mock_execute.call_count, 3)
+
+        tag.delete()
+        self.assertEqual(len(MCTag._model_cache), 0)
+        self.assertEqual(MCTag.cache_stats()["invalidations"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import json
+import unittest
+from unittest.mock import patch
+from modules.controller.response import Response
+from modules.database import BaseModel, StringField, FloatField
+from modules.database.pagination import Page, decode_cursor, encode_cursor
+from modules.database.query_builder import QueryBuilder
+from tests.query_builder_test import render
+
+
+class PGProduto(BaseModel):
+    nome = StringField()
+    preco = FloatField()
+
+
+def rows(*pairs):
+    return [{"id": id, "nome": f"p{id}", "preco": preco} for id, preco in pairs]
+
+
+class TestCursor(unittest.TestCase):
+    """Testes para a codificação do cursor opaco"""
+
+    def test_roundtrip(self):
+        cursor = encode_cursor([9.9, 42])
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor), [9.9, 42])
+
+    def test_invalid_cursor(self):
+        for cursor in ("%%%", encode_cursor([1])[:-2] + "!!", "eyJhIjoxfQ"):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+
+class TestPaginateAfter(unittest.TestCase):
+    """Testes para a paginação por chave do QuerySet"""
+
+    @patch.object(QueryBuilder, 'execute', autospec=True)
+    def test_first_page(self, mock_execute):
+        mock_execute.return_value = rows((1, 1.0), (2, 2.0), (3, 2.0))
+        page = PGProduto.query().order_by("nome").paginate_after(order_by=("preco",), size=2)
+
+        query, params = mock_execute.call_args[0][0].build()
+        self.assertEqual(
+            render(query),
+            'SELECT "pgproduto".* FROM "pgproduto" '
+            'ORDER BY "pgproduto"."preco" ASC, "pgproduto"."id" ASC LIMIT 3'
+        )
+        self.assertEqual([produto.id for produto in page], [1, 2])
+        self.assertTrue(page.has_next)
+        self.assertEqual(decode_cursor(page.next_cursor), [2.0, 2])
+
+    @patch.object(QueryBuilder, 'execute', autospec=True)
+    def test_next_page_uses_row_value_predicate(self, mock_execute):
+        mock_execute.return_value = rows((3, 2.0))
+        page = PGProduto.query().filter(nome="x").paginate_after(
+            encode_cursor([2.0, 2]), order_by=("preco", "id"), size=2
+        )
+
+        query, params = mock_execute.call_args[0][0].build()
+        self.assertIn(
+            'WHERE "pgproduto"."nome" = %s AND ("pgproduto"."preco", "pgproduto"."id") > (%s::REAL, %s::INTEGER)',
+            render(query)
+        )
+        self.assertEqual(params, ["x", 2.0, 2])
+        self.assertFalse(page.has_next)
+        self.assertIsNone(page.next_cursor)
+
+    @patch.object(QueryBuilder, 'execute', autospec=True)
+    def test_descending(self, mock_execute):
+        mock_execute.return_value = []
+        PGProduto.query().paginate_after(encode_cursor([5.0, 1]), order_by=("-preco",))
+        query, _ = mock_execute.call_args[0][0].build()
+        self.assertIn(') < (', render(query))
+        self.assertIn('"pgproduto"."id" DESC', render(query))
+
+    def test_mixed_directions_rejected(self):
+        with self.assertRaises(ValueError):
+            PGProduto.query().paginate_after(order_by=("-preco", "id"))
+
+    def test_cursor_size_mismatch(self):
+        with self.assertRaises(ValueError):
+            PGProduto.query().paginate_after(encode_cursor([1]), order_by=("preco",))
+
+    @patch.object(QueryBuilder, 'execute_tuples')
+    def test_values_mode(self, mock_execute):
+        mock_execute.return_value = [(1, 1.0), (2, 2.0)]
+        page = PGProduto.query().values("id", "preco").paginate_after(order_by=("preco",), size=1)
+        self.assertEqual(page.items, [{"id": 1, "preco": 1.0}])
+        self.assertEqual(decode_cursor(page.next_cursor), [1.0, 1])
+
+
+class TestPageResponse(unittest.TestCase):
+    """Testes para a integração da página com Response.json"""
+
+    def test_response_json_serializes_page(self):
+        produto = PGProduto.from_db_row({"id": 1, "nome": "a", "preco": 1.5})
+        response = Response.json(Page([produto], "abc", 1))
+
+        self.assertEqual(json.loads(response.body), {
+            "items": [{"id": 1, "nome": "a", "preco": 1.5}],
+            "next_cursor": "abc",
+            "has_next": True,
+        })
+        self.assertIn(("X-Next-Cursor", "abc"), response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
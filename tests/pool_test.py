@@ -0,0 +1,188 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from psycopg2 import extensions
+from modules.database.connection import DatabaseConnection, DatabaseError
+from modules.database.pool import ConnectionPool, PoolTimeoutError
+
+
+def fake_connection():
+    conn = MagicMock()
+    conn.closed = 0
+    conn.get_transaction_status.return_value = extensions.TRANSACTION_STATUS_IDLE
+    return conn
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Testes para o pool de conexões"""
+
+    def test_prefills_min_size(self):
+        factory = MagicMock(side_effect=fake_connection)
+        pool = ConnectionPool(factory, min_size=2, max_size=4)
+        self.assertEqual(factory.call_count, 2)
+        self.assertEqual(pool.stats()["idle"], 2)
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            ConnectionPool(fake_connection, min_size=5, max_size=2)
+
+    def test_reentrant_checkout_in_same_thread(self):
+        pool = ConnectionPool(fake_connection, min_size=0, max_size=2)
+        with pool.connection() as outer:
+            with pool.connection() as inner:
+                self.assertIs(outer, inner)
+                self.assertEqual(pool.stats()["in_use"], 1)
+        self.assertEqual(pool.stats()["in_use"], 0)
+        self.assertEqual(pool.stats()["idle"], 1)
+
+    def test_interleaved_borrows_release_on_last_exit(self):
+        pool = ConnectionPool(fake_connection, min_size=0, max_size=2)
+
+        def borrow():
+            with pool.connection() as conn:
+                yield conn
+                yield conn
+
+        first, second = borrow(), borrow()
+        conn = next(first)
+        self.assertIs(next(second), conn)
+        list(first)
+        # O segundo gerador ainda lê da conexão; ela não pode voltar ao pool
+        self.assertEqual(pool.stats()["in_use"], 1)
+        self.assertIsNot(pool.getconn(), conn)
+        list(second)
+        self.assertIsNone(pool.current())
+
+    def test_rollback_on_checkin_when_in_transaction(self):
+        pool = ConnectionPool(fake_connection, min_size=0, max_size=1)
+        with pool.connection() as conn:
+            conn.get_transaction_status.return_value = extensions.TRANSACTION_STATUS_INTRANS
+        conn.rollback.assert_called_once()
+
+    def test_closed_connection_is_discarded(self):
+        pool = ConnectionPool(fake_connection, min_size=0, max_size=1)
+        with pool.connection() as conn:
+            conn.closed = 1
+        stats = pool.stats()
+        self.assertEqual(stats["size"], 0)
+        self.assertEqual(stats["discarded"], 1)
+
+    def test_health_check_replaces_dead_connection(self):
+        factory = MagicMock(side_effect=fake_connection)
+        pool = ConnectionPool(factory, min_size=1, max_size=1, health_check_interval=0)
+        dead = pool._idle[0][0]
+        dead.cursor.side_effect = Exception("conexão perdida")
+        with pool.connection() as conn:
+            self.assertIsNot(conn, dead)
+        self.assertEqual(factory.call_count, 2)
+        self.assertEqual(pool.stats()["discarded"], 1)
+
+    def test_wait_timeout(self):
+        pool = ConnectionPool(fake_connection, min_size=0, max_size=1, timeout=0.05)
+        held = pool.getconn()
+        with self.assertRaises(PoolTimeoutError):
+            pool.getconn()
+        stats = pool.stats()
+        self.assertEqual(stats["waits"], 1)
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertGreater(stats["wait_time"], 0)
+        pool.putconn(held)
+
+    def test_waiter_receives_released_connection(self):
+        pool = ConnectionPool(fake_connection, min_size=0, max_size=1, timeout=2)
+        held = pool.getconn()
+        received = []
+
+        def worker():
+            with pool.connection() as conn:
+                received.append(conn)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        time.sleep(0.05)
+        pool.putconn(held)
+        thread.join()
+        self.assertEqual(received, [held])
+
+    def test_reap_idle_keeps_min_size(self):
+        pool = ConnectionPool(fake_connection, min_size=1, max_size=3, max_idle=0)
+        a, b, c = pool.getconn(), pool.getconn(), pool.getconn()
+        pool._idle.extend([(a, 0), (b, 0), (c, 0)])
+        pool._in_use = 0
+        self.assertEqual(pool.reap_idle(), 2)
+        self.assertEqual(pool.stats()["size"], 1)
+
+
+class TestDatabaseConnectionPooled(unittest.TestCase):
+    """Testes para o modo com pool do DatabaseConnection"""
+
+    def setUp(self):
+        DatabaseConnection._instance = None
+        self.addCleanup(setattr, DatabaseConnection, "_instance", None)
+
+    @patch('psycopg2.connect')
+    def test_execute_query_borrows_and_returns(self, mock_connect):
+        mock_connect.side_effect = lambda **kwargs: fake_connection()
+        db = DatabaseConnection(pool={"min_size": 0, "max_size": 2})
+        db.execute_query("UPDATE produto SET preco = %s", (1.0,))
+        stats = db.pool_stats()
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["idle"], 1)
+
+    @patch('psycopg2.connect')
+    def test_streams_use_their_own_connection(self, mock_connect):
+        def streaming_connection(**kwargs):
+            conn = fake_connection()
+            conn.cursor.return_value.fetchmany.side_effect = [[(1,)], []]
+            conn.cursor.return_value.description = [("id",)]
+            return conn
+
+        mock_connect.side_effect = streaming_connection
+        db = DatabaseConnection(pool={"min_size": 0, "max_size": 3})
+        first = db.iterate_query("SELECT id FROM produto")
+        second = db.iterate_query("SELECT id FROM tag")
+        self.assertEqual(next(first), [{"id": 1}])
+        self.assertEqual(next(second), [{"id": 1}])
+        self.assertEqual(db.pool_stats()["in_use"], 2)
+        list(first)
+        list(second)
+        self.assertEqual(db.pool_stats()["in_use"], 0)
+
+    @patch('psycopg2.connect')
+    def test_stream_runs_in_its_own_transaction(self, mock_connect):
+        conn = fake_connection()
+        conn.autocommit = True
+        conn.cursor.return_value.fetchmany.side_effect = [[(1,)], []]
+        conn.cursor.return_value.description = [("id",)]
+        mock_connect.return_value = conn
+        db = DatabaseConnection(pool={"min_size": 0, "max_size": 1})
+
+        rows = db.iterate_query("SELECT id FROM produto")
+        self.assertEqual(next(rows), [{"id": 1}])
+        self.assertFalse(conn.autocommit)
+        self.assertFalse(conn.cursor.call_args[1]["withhold"])
+        list(rows)
+        conn.rollback.assert_called_once()
+        self.assertTrue(conn.autocommit)
+
+    @patch('psycopg2.connect')
+    def test_single_connection_stream_keeps_withhold(self, mock_connect):
+        conn = fake_connection()
+        conn.cursor.return_value.fetchmany.side_effect = [[(1,)], []]
+        conn.cursor.return_value.description = [("id",)]
+        mock_connect.return_value = conn
+        db = DatabaseConnection()
+
+        self.assertEqual(list(db.iterate_query("SELECT id FROM produto")), [[{"id": 1}]])
+        self.assertTrue(conn.cursor.call_args[1]["withhold"])
+
+    @patch('psycopg2.connect')
+    def test_get_connection_outside_checkout(self, mock_connect):
+        db = DatabaseConnection(pool={"min_size": 0, "max_size": 1})
+        with self.assertRaises(DatabaseError):
+            db.get_connection()
+
+
+if __name__ == '__main__':
+    unittest.main()
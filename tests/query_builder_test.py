@@ -0,0 +1,94 @@
+import unittest
+from unittest.mock import patch
+from psycopg2 import sql
+from modules.database import BaseModel, StringField, FloatField, ForeignKey, DB
+from modules.database.query_builder import QueryBuilder
+
+
+def render(composable):
+    if isinstance(composable, sql.Composed):
+        return "".join(render(part) for part in composable.seq)
+    if isinstance(composable, sql.Identifier):
+        return ".".join(f'"{name}"' for name in composable.strings)
+    if isinstance(composable, sql.Literal):
+        return repr(composable.wrapped)
+    return composable.string
+
+
+class QBSetor(BaseModel):
+    nome = StringField()
+
+
+class QBCategoria(BaseModel):
+    nome = StringField()
+    setor = ForeignKey("QBSetor")
+
+
+class QBProduto(BaseModel):
+    nome = StringField()
+    preco = FloatField()
+    categoria = ForeignKey("QBCategoria")
+
+
+class TestQueryBuilder(unittest.TestCase):
+    """Testes para a montagem de SQL do QueryBuilder"""
+
+    def test_where_clauses_are_combined(self):
+        query, params = QueryBuilder(QBProduto).where(nome="a").where(preco=(">", 10)).build()
+        self.assertEqual(
+            render(query),
+            'SELECT "qbproduto".* FROM "qbproduto" WHERE "qbproduto"."nome" = %s AND "qbproduto"."preco" > %s'
+        )
+        self.assertEqual(params, ["a", 10])
+
+    def test_select_related_joins(self):
+        query, _ = QueryBuilder(QBProduto).select_related("categoria").limit(5).build()
+        rendered = render(query)
+        self.assertIn('"r_categoria"."nome" AS "categoria__nome"', rendered)
+        self.assertIn(
+            'LEFT JOIN "qbcategoria" AS "r_categoria" ON "r_categoria"."id" = "qbproduto"."categoria_id"',
+            rendered
+        )
+        self.assertTrue(rendered.endswith("LIMIT 5"))
+
+    def test_select_related_chained_path(self):
+        query, _ = QueryBuilder(QBProduto).select_related("categoria__setor").build()
+        rendered = render(query)
+        self.assertIn('LEFT JOIN "qbcategoria" AS "r_categoria"', rendered)
+        self.assertIn(
+            'LEFT JOIN "qbsetor" AS "r_categoria__setor" ON "r_categoria__setor"."id" = "r_categoria"."setor_id"',
+            rendered
+        )
+
+    def test_select_related_rejects_plain_field(self):
+        with self.assertRaises(ValueError):
+            QueryBuilder(QBProduto).select_related("nome").build()
+
+    @patch.object(QueryBuilder, 'execute')
+    def test_select_related_hydrates_cache(self, mock_execute):
+        mock_execute.return_value = [{
+            "id": 1, "nome": "Notebook", "preco": 10.0, "categoria_id": 2,
+            "categoria__id": 2, "categoria__nome": "Informática", "categoria__setor_id": 3,
+            "categoria__setor__id": 3, "categoria__setor__nome": "Eletrônicos",
+        }]
+        produtos = list(QBProduto.query().select_related("categoria__setor"))
+
+        with patch.object(DB, 'execute_query') as mock_execute_query:
+            produto = produtos[0]
+            self.assertEqual(produto.categoria.nome, "Informática")
+            self.assertEqual(produto.categoria.setor.nome, "Eletrônicos")
+            mock_execute_query.assert_not_called()
+        self.assertEqual(produto.get_dirty_fields(), {})
+
+    @patch.object(QueryBuilder, 'execute')
+    def test_select_related_null_foreign_key(self, mock_execute):
+        mock_execute.return_value = [{
+            "id": 1, "nome": "Avulso", "preco": 1.0, "categoria_id": None,
+            "categoria__id": None, "categoria__nome": None, "categoria__setor_id": None,
+        }]
+        produto = QBProduto.query().select_related("categoria").first()
+        self.assertIsNone(produto._categoria_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
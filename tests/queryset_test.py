@@ -0,0 +1,197 @@
+import unittest
+from contextlib import contextmanager
+from unittest.mock import patch, MagicMock
+from modules.database import BaseModel, StringField, FloatField, ForeignKey, QuerySet
+from modules.database.query_builder import QueryBuilder
+from modules.database.connection import DatabaseConnection
+from tests.query_builder_test import render
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class QSCategoria(BaseModel):
+    nome = StringField()
+
+
+class QSProduto(BaseModel):
+    nome = StringField()
+    preco = FloatField()
+    descricao = StringField()
+    categoria = ForeignKey("QSCategoria")
+
+
+ROWS = [{"id": 1, "nome": "a", "preco": 1.0}, {"id": 2, "nome": "b", "preco": 2.0}]
+
+
+class TestQuerySet(unittest.TestCase):
+    """Testes para o QuerySet preguiçoso"""
+
+    @patch.object(QueryBuilder, 'execute')
+    def test_lazy_until_iteration(self, mock_execute):
+        mock_execute.return_value = ROWS
+        queryset = QSProduto.find_all().filter(nome="a").order_by("-preco")
+        self.assertIsInstance(queryset, QuerySet)
+        mock_execute.assert_not_called()
+
+        self.assertEqual([produto.id for produto in queryset], [1, 2])
+        self.assertEqual(len(queryset), 2)
+        list(queryset)
+        mock_execute.assert_called_once()
+
+    def test_chaining_does_not_mutate(self):
+        base = QSProduto.query().filter(nome="a")
+        ordered = base.order_by("preco").limit(10).offset(20)
+        self.assertEqual(
+            render(base.build()[0]),
+            'SELECT "qsproduto".* FROM "qsproduto" WHERE "qsproduto"."nome" = %s'
+        )
+        self.assertTrue(render(ordered.build()[0]).endswith(
+            'ORDER BY "qsproduto"."preco" ASC LIMIT 10 OFFSET 20'
+        ))
+
+    def test_exclude_and_foreign_key_filter(self):
+        categoria = QSCategoria(id=3, nome="Games")
+        query, params = QSProduto.query().filter(categoria=categoria).exclude(nome="x", descricao=None).build()
+        self.assertIn('"qsproduto"."categoria_id" = %s', render(query))
+        self.assertIn('NOT ("qsproduto"."nome" = %s AND "qsproduto"."descricao" IS NULL)', render(query))
+        self.assertEqual(params, [3, "x"])
+
+    def test_only_and_defer(self):
+        only = render(QSProduto.query().only("nome").build()[0])
+        self.assertTrue(only.startswith('SELECT "qsproduto"."id", "qsproduto"."nome" FROM'))
+        deferred = render(QSProduto.query().defer("descricao").build()[0])
+        self.assertNotIn("descricao", deferred)
+        self.assertIn('"qsproduto"."categoria_id"', deferred)
+
+    @patch.object(QueryBuilder, 'execute', autospec=True)
+    def test_slicing_applies_limit_offset(self, mock_execute):
+        mock_execute.return_value = ROWS[1:]
+        queryset = QSProduto.query()
+        result = queryset[5:7]
+        builder = mock_execute.call_args[0][0]
+        self.assertEqual((builder._offset, builder._limit), (5, 2))
+        self.assertEqual([produto.id for produto in result], [2])
+        self.assertIsNone(queryset._result_cache)
+
+    @patch.object(QueryBuilder, 'execute')
+    def test_exists_uses_limit_one(self, mock_execute):
+        mock_execute.return_value = [{"id": 1}]
+        self.assertTrue(QSProduto.query().filter(nome="a").exists())
+        mock_execute.return_value = []
+        self.assertFalse(QSProduto.query().exists())
+
+    @patch.object(QueryBuilder, 'execute')
+    def test_exists_uses_cache(self, mock_execute):
+        mock_execute.return_value = ROWS
+        queryset = QSProduto.query()
+        list(queryset)
+        self.assertTrue(queryset.exists())
+        self.assertEqual(queryset[1].id, 2)
+        mock_execute.assert_called_once()
+
+    @patch.object(QueryBuilder, 'execute')
+    def test_find_by_without_conditions_is_empty(self, mock_execute):
+        self.assertEqual(list(QSProduto.find_by()), [])
+        self.assertFalse(QSProduto.find_by().exists())
+        mock_execute.assert_not_called()
+
+
+
+class TestValues(unittest.TestCase):
+    """Testes para os modos values, values_list e columns"""
+
+    @patch.object(QueryBuilder, 'execute_tuples', autospec=True)
+    def test_values_selects_columns_and_returns_dicts(self, mock_execute):
+        mock_execute.return_value = [(1, 3), (2, None)]
+        queryset = QSProduto.query().select_related("categoria").values("id", "categoria")
+
+        self.assertEqual(queryset[0:2], [{"id": 1, "categoria": 3}, {"id": 2, "categoria": None}])
+        builder = mock_execute.call_args[0][0]
+        self.assertEqual(builder._columns, ["id", "categoria_id"])
+        self.assertEqual(builder._related, [])
+
+    @patch.object(QueryBuilder, 'execute_tuples')
+    def test_values_list(self, mock_execute):
+        mock_execute.return_value = [(1, "a"), (2, "b")]
+        self.assertEqual(list(QSProduto.query().values_list("id", "nome")), [(1, "a"), (2, "b")])
+
+        mock_execute.return_value = [(1.0,), (2.0,)]
+        self.assertEqual(list(QSProduto.query().values_list("preco", flat=True)), [1.0, 2.0])
+
+    def test_flat_requires_single_field(self):
+        with self.assertRaises(ValueError):
+            QSProduto.query().values_list("id", "nome", flat=True)
+
+    @patch.object(QueryBuilder, 'execute_tuples')
+    def test_values_without_fields_uses_all_columns(self, mock_execute):
+        mock_execute.return_value = [(1, "a", 1.0, None, 3)]
+        row = QSProduto.query().values().first()
+        self.assertEqual(row, {"id": 1, "nome": "a", "preco": 1.0, "descricao": None, "categoria_id": 3})
+
+
+class TestStreaming(unittest.TestCase):
+    """Testes para a iteração com cursor no servidor"""
+
+    def setUp(self):
+        self.conn = MagicMock()
+        self.conn.closed = 0
+        self.cursor = self.conn.cursor.return_value
+        self.cursor.description = [("id",), ("nome",), ("preco",)]
+        self.cursor.fetchmany.side_effect = [[(1, "a", 1.0), (2, "b", 2.0)], [(3, "c", 3.0)], []]
+
+        @contextmanager
+        def connection(db):
+            yield self.conn
+
+        for name in ('connection', '_stream_connection'):
+            patcher = patch.object(DatabaseConnection, name, connection)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_iterate_uses_named_cursor_in_batches(self):
+        iterator = QSProduto.iterate(batch_size=2)
+        self.conn.cursor.assert_not_called()
+
+        produtos = list(iterator)
+        self.assertEqual([produto.id for produto in produtos], [1, 2, 3])
+        self.assertEqual(produtos[2].get_dirty_fields(), {})
+
+        name = self.conn.cursor.call_args[1]["name"]
+        self.assertTrue(name.startswith("stream_"))
+        self.cursor.fetchmany.assert_called_with(2)
+        self.cursor.close.assert_called_once()
+
+    def test_cursor_closed_when_abandoned(self):
+        iterator = QSProduto.query().filter(nome="a").iterator(batch_size=2)
+        next(iterator)
+        iterator.close()
+        self.cursor.close.assert_called_once()
+
+    def test_columns_transposes_batches(self):
+        columns = QSProduto.query().columns("id", "nome", "preco", batch_size=2)
+        self.assertEqual(columns, {"id": [1, 2, 3], "nome": ["a", "b", "c"], "preco": [1.0, 2.0, 3.0]})
+        self.assertTrue(self.conn.cursor.call_args[1]["name"].startswith("stream_"))
+
+    @unittest.skipIf(numpy is None, "numpy não instalado")
+    def test_columns_as_numpy_arrays(self):
+        columns = QSProduto.query().columns("id", "nome", "preco", numpy=True)
+        self.assertIsInstance(columns["preco"], numpy.ndarray)
+        self.assertEqual(columns["preco"].sum(), 6.0)
+
+    def test_values_iterator_streams_tuples(self):
+        rows = list(QSProduto.query().values_list("id", "nome", "preco").iterator(batch_size=2))
+        self.assertEqual(rows, [(1, "a", 1.0), (2, "b", 2.0), (3, "c", 3.0)])
+
+    @patch.object(QueryBuilder, 'execute')
+    def test_iterator_does_not_fill_cache(self, mock_execute):
+        queryset = QSProduto.query()
+        list(queryset.iterator())
+        self.assertIsNone(queryset._result_cache)
+        mock_execute.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import unittest
+from unittest.mock import patch
+from modules.database import BaseModel, StringField, ForeignKey, OneToOneField, ManyToManyField, DB, ModelRegistry
+
+
+class RelCategoria(BaseModel):
+    nome = StringField()
+
+
+class RelTag(BaseModel):
+    nome = StringField()
+    produtos = ManyToManyField("RelProduto", back_populates="tag")
+
+
+class RelProduto(BaseModel):
+    nome = StringField()
+    categoria = ForeignKey("RelCategoria")
+    tag = ManyToManyField("RelTag", back_populates="produtos")
+
+
+class RelUsuario(BaseModel):
+    nome = StringField()
+    perfil = OneToOneField("RelPerfil", back_populates="usuario")
+
+
+class RelPerfil(BaseModel):
+    bio = StringField()
+
+
+class TestPrefetchRelated(unittest.TestCase):
+    """Testes para o carregamento antecipado de relacionamentos"""
+
+    def produtos(self):
+        return [
+            RelProduto.from_db_row({"id": 1, "nome": "a", "categoria_id": 10}),
+            RelProduto.from_db_row({"id": 2, "nome": "b", "categoria_id": 10}),
+            RelProduto.from_db_row({"id": 3, "nome": "c", "categoria_id": None}),
+        ]
+
+    @patch.object(DB, 'execute_query')
+    def test_many_to_many_single_query(self, mock_execute_query):
+        mock_execute_query.return_value = [
+            {"id": 5, "nome": "Gamer", "_prefetch_parent_id": 1},
+            {"id": 5, "nome": "Gamer", "_prefetch_parent_id": 2},
+            {"id": 6, "nome": "Premium", "_prefetch_parent_id": 1},
+        ]
+        produtos = RelProduto.prefetch_related(self.produtos(), "tag")
+
+        self.assertEqual(mock_execute_query.call_count, 1)
+        query, params = mock_execute_query.call_args[0]
+        self.assertIn("WHERE t.relproduto_id = ANY(%s)", query)
+        self.assertEqual(params, ([1, 2, 3],))
+
+        mock_execute_query.reset_mock()
+        self.assertEqual([tag.nome for tag in produtos[0].tag], ["Gamer", "Premium"])
+        self.assertEqual([tag.id for tag in produtos[1].tag.get_related_instances()], [5])
+        self.assertEqual(produtos[2].tag.get_related_instances(), [])
+        self.assertIs(produtos[0].tag.get_related_instances()[0], produtos[1].tag.get_related_instances()[0])
+        mock_execute_query.assert_not_called()
+
+    @patch.object(DB, 'execute_query')
+    def test_add_invalidates_cache(self, mock_execute_query):
+        produto = self.produtos()[0]
+        produto.tag.set_cache([RelTag(id=5, nome="Gamer")])
+        with patch.object(ManyToManyField, 'add'):
+            produto.tag.add(RelTag(id=6, nome="Premium"))
+        self.assertIsNone(produto.tag.get_cache())
+
+    @patch.object(DB, 'execute_query')
+    def test_foreign_key_forward(self, mock_execute_query):
+        mock_execute_query.return_value = [{"id": 10, "nome": "Informática"}]
+        produtos = RelProduto.prefetch_related(self.produtos(), "categoria")
+
+        self.assertEqual(mock_execute_query.call_count, 1)
+        self.assertEqual(mock_execute_query.call_args[0][1], ([10],))
+        self.assertIs(produtos[0]._categoria_cache, produtos[1]._categoria_cache)
+        self.assertEqual(produtos[0].categoria.nome, "Informática")
+
+    @patch.object(DB, 'execute_query')
+    def test_one_to_one_reverse(self, mock_execute_query):
+        mock_execute_query.return_value = [{"id": 7, "bio": "admin", "usuario_id": 1}]
+        usuarios = [RelUsuario.from_db_row({"id": 1, "nome": "a"}), RelUsuario.from_db_row({"id": 2, "nome": "b"})]
+        RelUsuario.prefetch_related(usuarios, "perfil")
+
+        self.assertIn("WHERE usuario_id = ANY(%s)", mock_execute_query.call_args[0][0])
+        mock_execute_query.reset_mock()
+        self.assertEqual(usuarios[0].perfil.bio, "admin")
+        self.assertIsNone(usuarios[1].perfil)
+        mock_execute_query.assert_not_called()
+
+    def test_unknown_relation(self):
+        with self.assertRaises(ValueError):
+            RelProduto.prefetch_related([], "nome")
+
+
+
+class TestManyToManyBatch(unittest.TestCase):
+    """Testes para add/remove/set/clear em lote no ManyToManyManager"""
+
+    def produto(self):
+        return RelProduto.from_db_row({"id": 1, "nome": "Notebook", "categoria_id": None})
+
+    @patch.object(DB, 'execute_query', return_value=3)
+    def test_add_many_in_one_statement(self, mock_execute_query):
+        tags = [RelTag(id=5, nome="a"), RelTag(id=6, nome="b"), 7, RelTag(id=5, nome="a")]
+        self.assertEqual(self.produto().tag.add(*tags), 3)
+
+        mock_execute_query.assert_called_once()
+        query, params = mock_execute_query.call_args[0]
+        self.assertIn("INSERT INTO relproduto_reltag (relproduto_id, reltag_id)", query)
+        self.assertIn("WHERE NOT EXISTS", query)
+        self.assertEqual(params, (1, [5, 6, 7], 1))
+
+    @patch.object(DB, 'execute_query')
+    def test_add_requires_saved_objects(self, mock_execute_query):
+        with self.assertRaises(ValueError):
+            self.produto().tag.add(RelTag(nome="nova"))
+        with self.assertRaises(ValueError):
+            RelProduto(nome="novo").tag.add(RelTag(id=5, nome="a"))
+        self.assertEqual(self.produto().tag.add(), 0)
+        mock_execute_query.assert_not_called()
+
+    @patch.object(DB, 'execute_query', return_value=2)
+    def test_remove_and_clear(self, mock_execute_query):
+        produto = self.produto()
+        produto.tag.remove(RelTag(id=5, nome="a"), 6)
+        query, params = mock_execute_query.call_args[0]
+        self.assertIn("reltag_id = ANY(%s::integer[])", query)
+        self.assertEqual(params, (1, [5, 6]))
+
+        produto.tag.clear()
+        query, params = mock_execute_query.call_args[0]
+        self.assertIn("DELETE FROM relproduto_reltag WHERE relproduto_id = %s", query)
+        self.assertEqual(params, (1,))
+
+    @patch.object(DB, 'transaction')
+    @patch.object(DB, 'execute_query')
+    def test_set_applies_diff(self, mock_execute_query, mock_transaction):
+        mock_execute_query.side_effect = [[{"reltag_id": 5}, {"reltag_id": 6}], 1, 1]
+        produto = self.produto()
+        produto.tag.set_cache([])
+
+        self.assertEqual(produto.tag.set([6, RelTag(id=8, nome="c")]), (1, 1))
+        self.assertEqual(mock_execute_query.call_count, 3)
+        delete, insert = mock_execute_query.call_args_list[1][0], mock_execute_query.call_args_list[2][0]
+        self.assertTrue(delete[0].strip().startswith("DELETE"))
+        self.assertEqual(delete[1], (1, [5]))
+        self.assertEqual(insert[1], (1, [8], 1))
+        mock_transaction.assert_called_once()
+        self.assertIsNone(produto.tag.get_cache())
+
+
+
+class RelOrfao(BaseModel):
+    dono = ForeignKey("RelInexistente")
+    tags = ManyToManyField("RelTag", through="RelOrfaoTags")
+
+
+class TestRelationshipMetadata(unittest.TestCase):
+    """Testes para a resolução antecipada dos metadados das relações"""
+
+    def test_metadata_is_frozen(self):
+        self.assertEqual(ModelRegistry.check([RelProduto]), [])
+        field = RelProduto._fields["tag"]
+        self.assertEqual((field.parent_column, field.related_column), ("relproduto_id", "reltag_id"))
+        self.assertEqual(field.get_through_model().__tablename__, "relproduto_reltag")
+        self.assertIs(RelProduto._fields["categoria"].get_related_model(), RelCategoria)
+
+        with patch.object(ModelRegistry, "get_model") as get_model:
+            self.assertIs(field.get_through_model(), field.get_through_model())
+            self.assertIs(field.get_related_model(), RelTag)
+            get_model.assert_not_called()
+
+    def test_both_sides_share_through_model(self):
+        self.assertIs(RelProduto._fields["tag"].get_through_model(), RelTag._fields["produtos"].get_through_model())
+
+    def test_check_reports_unresolved_references(self):
+        errors = ModelRegistry.check([RelOrfao])
+        self.assertEqual(errors, [
+            "RelOrfao.dono: modelo RelInexistente não encontrado",
+            "RelOrfao.tags: Modelo intermediário RelOrfaoTags não encontrado",
+        ])
+        with self.assertRaises(ValueError):
+            DB.check_models([RelOrfao])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import psycopg2
+from modules.database import DB
+from modules.database.connection import DatabaseConnection, DatabaseError
+from modules.database.router import (
+    ReplicaConnection, ReplicaRouter, ReplicaRouterMiddleware, record_write, _last_write
+)
+
+
+def make_connection(host):
+    connection = MagicMock()
+    connection.host = host
+    connection.in_transaction.return_value = False
+    connection.execute_query.return_value = [{"host": host}]
+    return connection
+
+
+def read(connection):
+    return connection.execute_query("SELECT 1")[0]["host"]
+
+
+class TestReplicaRouter(unittest.TestCase):
+    """Testes para o roteamento de leituras entre primário e réplicas"""
+
+    def setUp(self):
+        self.token = _last_write.set(None)
+        self.addCleanup(_last_write.reset, self.token)
+        self.primary = make_connection("primario")
+        self.replicas = [make_connection("replica1"), make_connection("replica2")]
+
+    def test_round_robin(self):
+        router = ReplicaRouter(self.primary, self.replicas)
+        self.assertEqual([router.run_read(read) for _ in range(4)], ["replica1", "replica2"] * 2)
+        self.assertEqual([replica["reads"] for replica in router.stats()["replicas"]], [2, 2])
+
+    def test_least_outstanding(self):
+        router = ReplicaRouter(self.primary, self.replicas, strategy="least_outstanding")
+        hosts = []
+
+        def nested(connection):
+            # Enquanto replica1 está ocupada, a próxima leitura vai para replica2
+            hosts.append(router.run_read(read))
+            return connection.host
+
+        self.assertEqual(router.run_read(nested), "replica1")
+        self.assertEqual(hosts, ["replica2"])
+
+    def test_transaction_stays_on_primary(self):
+        router = ReplicaRouter(self.primary, self.replicas)
+        self.primary.in_transaction.return_value = True
+        self.assertEqual(router.run_read(read), "primario")
+        self.assertIs(router.read_connection(), self.primary)
+
+    def test_read_your_writes(self):
+        router = ReplicaRouter(self.primary, self.replicas, sticky_window=60)
+        record_write()
+        self.assertEqual(router.run_read(read), "primario")
+
+        router.sticky_window = 0
+        self.assertEqual(router.run_read(read), "replica1")
+
+    def test_falls_back_when_replicas_are_down(self):
+        router = ReplicaRouter(self.primary, self.replicas, retry_after=60)
+        self.replicas[0].execute_query.side_effect = ConnectionError("recusada")
+        self.assertEqual(router.run_read(read), "replica2")
+
+        wrapped = DatabaseError("falhou")
+        wrapped.__cause__ = psycopg2.OperationalError("servidor caiu")
+        self.replicas[1].execute_query.side_effect = wrapped
+        self.assertEqual(router.run_read(read), "primario")
+
+        stats = router.stats()
+        self.assertEqual([replica["down"] for replica in stats["replicas"]], [True, True])
+        self.assertEqual(stats["fallbacks"], 1)
+        self.assertEqual(router.run_read(read), "primario")
+        self.assertEqual(self.replicas[0].execute_query.call_count, 1)
+
+    def test_query_errors_are_not_failover(self):
+        router = ReplicaRouter(self.primary, self.replicas)
+        self.replicas[0].execute_query.side_effect = DatabaseError("erro de sintaxe")
+        with self.assertRaises(DatabaseError):
+            router.run_read(read)
+        self.primary.execute_query.assert_not_called()
+
+    def test_invalid_strategy(self):
+        with self.assertRaises(ValueError):
+            ReplicaRouter(self.primary, self.replicas, strategy="aleatoria")
+
+    def test_middleware_scopes_stickiness_to_request(self):
+        middleware = ReplicaRouterMiddleware()
+        request = MagicMock()
+        middleware.process_request(request)
+        record_write()
+        middleware.process_response(request, None)
+        self.assertIsNone(_last_write.get())
+
+
+class TestDBReplicas(unittest.TestCase):
+    """Testes para DB.connect com réplicas"""
+
+    def setUp(self):
+        self.token = _last_write.set(None)
+        self.addCleanup(_last_write.reset, self.token)
+        DatabaseConnection._instance = None
+        self.addCleanup(setattr, DB, "_connection", None)
+        self.addCleanup(setattr, DB, "_router", None)
+        patcher = patch("psycopg2.connect")
+        self.addCleanup(patcher.stop)
+        self.connect = patcher.start()
+        self.connect.side_effect = lambda **kwargs: MagicMock(name=kwargs["host"])
+
+    def test_reads_go_to_replica_until_a_write(self):
+        DB.connect(replicas=["replica1", {"host": "replica2", "user": "leitor"}],
+                   router={"sticky_window": 60}, statement_cache={"enabled": False})
+        primary = DB.get_connection()
+        replica1, replica2 = DB._router.replicas
+
+        self.assertIsInstance(replica1, ReplicaConnection)
+        self.assertIsNot(replica1, replica2)
+        self.assertEqual(replica2.user, "leitor")
+
+        with patch.object(ReplicaConnection, "execute_query", return_value=[]) as replica_query, \
+                patch.object(DatabaseConnection, "execute_query", return_value=1) as primary_query:
+            DB.execute_read("SELECT * FROM produto")
+            self.assertEqual(replica_query.call_count, 1)
+
+            DB.execute_query("UPDATE produto SET preco = 1")
+            DB.execute_read("SELECT * FROM produto")
+            self.assertEqual(replica_query.call_count, 1)
+            self.assertEqual(primary_query.call_count, 2)
+        self.assertIs(DB.read_connection(), primary)
+
+    def test_raw_select_does_not_pin_to_primary(self):
+        DB.connect(replicas=["replica1"], router={"sticky_window": 60}, statement_cache={"enabled": False})
+
+        with patch.object(ReplicaConnection, "execute_query", return_value=[]) as replica_query, \
+                patch.object(DatabaseConnection, "execute_query", return_value=[{"total": 1}]):
+            DB.execute_query("SELECT count(*) AS total FROM produto")
+            with DB.transaction():
+                DB.execute_query("SELECT * FROM produto WHERE id = %s", (1,))
+            DB.execute_read("SELECT * FROM produto")
+            self.assertEqual(replica_query.call_count, 1)
+
+            DB.execute_query("INSERT INTO produto (nome) VALUES (%s) RETURNING id", ("a",))
+            DB.execute_read("SELECT * FROM produto")
+            self.assertEqual(replica_query.call_count, 1)
+
+    def test_replica_connections_use_autocommit(self):
+        replica = ReplicaConnection("replica1")
+        self.assertTrue(replica._create_connection().autocommit)
+
+
+if __name__ == '__main__':
+    unittest.main()
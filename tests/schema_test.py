@@ -0,0 +1,160 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from modules.database import BaseModel, StringField, FloatField, IntegerField, ForeignKey, ManyToManyField, DB
+from modules.database.schema import SchemaSnapshot, plan_schema
+
+
+class SchCategoria(BaseModel):
+    nome = StringField(unique=True)
+
+
+class SchTag(BaseModel):
+    nome = StringField()
+
+
+class SchProduto(BaseModel):
+    nome = StringField()
+    preco = FloatField()
+    categoria = ForeignKey("SchCategoria")
+    tags = ManyToManyField("SchTag")
+
+
+class SchPedido(BaseModel):
+    codigo = StringField()
+    tags = ManyToManyField("SchTag", through="SchPedidoTag")
+
+
+class SchPedidoTag(BaseModel):
+    schpedido = ForeignKey("SchPedido")
+    schtag = ForeignKey("SchTag")
+    quantidade = IntegerField()
+
+
+MODELS = [SchCategoria, SchTag, SchProduto]
+
+
+def full_snapshot():
+    return SchemaSnapshot(
+        tables={
+            "schcategoria": {"id", "nome"},
+            "schtag": {"id", "nome"},
+            "schproduto": {"id", "nome", "preco", "categoria_id"},
+            "schproduto_schtag": {"id", "schproduto_id", "schtag_id"},
+        },
+        constraints={"fk_schproduto_categoria"},
+        indexes={"ux_schcategoria_nome", "ix_schproduto_categoria_id", "ix_schproduto_schtag_schtag_id"},
+    )
+
+
+class TestSchema(unittest.TestCase):
+    """Testes para o snapshot do schema e o plano de DDL"""
+
+    def test_load_snapshot_in_one_query(self):
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [
+            ("table", "schtag", None),
+            ("column", "schtag", "id"),
+            ("column", "schtag", "nome"),
+            ("constraint", "schtag", "schtag_pkey"),
+            ("index", "schtag", "schtag_pkey"),
+            ("invalid_index", "schtag", "ix_schtag_nome"),
+        ]
+        snapshot = SchemaSnapshot.load(cursor)
+
+        cursor.execute.assert_called_once()
+        self.assertEqual(snapshot.columns("SchTag"), {"id", "nome"})
+        self.assertIn("schtag_pkey", snapshot.constraints)
+        self.assertTrue(snapshot.has_index("schtag_pkey"))
+        self.assertEqual(snapshot.invalid_indexes, {"ix_schtag_nome"})
+
+    def test_empty_schema_plan(self):
+        plan = plan_schema(SchemaSnapshot(), MODELS)
+
+        self.assertEqual(len(plan.tables), 4)
+        self.assertTrue(plan.tables[-1].startswith("CREATE TABLE IF NOT EXISTS schproduto_schtag"))
+        self.assertEqual(plan.constraints, [
+            "ALTER TABLE schproduto ADD CONSTRAINT fk_schproduto_categoria "
+            "FOREIGN KEY (categoria_id) REFERENCES schcategoria(id) ON DELETE CASCADE"
+        ])
+        self.assertIn("CREATE UNIQUE INDEX IF NOT EXISTS ux_schcategoria_nome ON schcategoria (nome)", plan.indexes)
+        self.assertIn(
+            "CREATE INDEX IF NOT EXISTS ix_schproduto_schtag_schtag_id ON schproduto_schtag (schtag_id)", plan.indexes
+        )
+
+    def test_explicit_through_model_keeps_its_columns(self):
+        plan = plan_schema(SchemaSnapshot(), [SchTag, SchPedido, SchPedidoTag])
+
+        through = [statement for statement in plan.tables if "schpedidotag" in statement]
+        self.assertEqual(through, [
+            "CREATE TABLE IF NOT EXISTS schpedidotag (id SERIAL PRIMARY KEY, "
+            "schpedido_id INTEGER, schtag_id INTEGER, quantidade INTEGER)"
+        ])
+        self.assertIn(
+            "ALTER TABLE schpedidotag ADD CONSTRAINT fk_schpedidotag_schtag "
+            "FOREIGN KEY (schtag_id) REFERENCES schtag(id) ON DELETE CASCADE",
+            plan.constraints
+        )
+
+    def test_up_to_date_schema_plans_nothing(self):
+        self.assertFalse(plan_schema(full_snapshot(), MODELS))
+
+    def test_missing_column_and_invalid_index(self):
+        snapshot = full_snapshot()
+        snapshot.tables["schproduto"].discard("preco")
+        snapshot.indexes.discard("ux_schcategoria_nome")
+        snapshot.invalid_indexes.add("ux_schcategoria_nome")
+
+        plan = plan_schema(snapshot, MODELS)
+        self.assertEqual(plan.tables, [])
+        self.assertEqual(plan.columns, ["ALTER TABLE schproduto ADD COLUMN preco REAL"])
+        self.assertEqual(plan.indexes, [
+            "DROP INDEX IF EXISTS ux_schcategoria_nome",
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_schcategoria_nome ON schcategoria (nome)",
+        ])
+
+    def test_create_tables_applies_single_batch(self):
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = []
+
+        plan = DB._create_tables(conn, MODELS)
+
+        self.assertEqual(cursor.execute.call_count, 2)
+        batch = cursor.execute.call_args_list[1][0][0]
+        self.assertEqual(batch, ";\n".join(plan.statements))
+        conn.commit.assert_called_once()
+
+    def test_concurrent_indexes_use_autocommit(self):
+        snapshot = full_snapshot()
+        snapshot.indexes.discard("ux_schcategoria_nome")
+        snapshot.invalid_indexes.add("ux_schcategoria_nome")
+        plan = plan_schema(snapshot, MODELS, concurrently=True)
+        self.assertEqual(plan.statements, [])
+
+        conn = MagicMock()
+        conn.autocommit = False
+        cursor = conn.cursor.return_value.__enter__.return_value
+
+        def check_autocommit(statement, *args):
+            self.assertTrue(conn.autocommit)
+
+        cursor.execute.side_effect = check_autocommit
+        DB._create_indexes_concurrently(conn, plan.concurrent_indexes)
+
+        executed = [call[0][0] for call in cursor.execute.call_args_list]
+        self.assertEqual(executed[0], "DROP INDEX CONCURRENTLY IF EXISTS ux_schcategoria_nome")
+        self.assertTrue(executed[1].startswith("CREATE UNIQUE INDEX CONCURRENTLY"))
+        self.assertFalse(conn.autocommit)
+
+    def test_create_tables_defaults_to_registry(self):
+        with patch.object(DB, "connection"), patch.object(DB, "check_models") as check, \
+                patch.object(DB, "_create_tables") as create:
+            create.return_value = plan_schema(full_snapshot(), MODELS)
+            DB.create_tables()
+        models = create.call_args[0][1]
+        self.assertIn(SchProduto, models)
+        check.assert_called_once_with(models)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from modules.database.base_model import BaseModel
+from modules.database.connection import DatabaseConnection
+from modules.database.fields import StringField, FloatField
+from modules.database.statement_cache import StatementCache, is_preparable, to_positional
+
+
+class SCProduto(BaseModel):
+    __tablename__ = "sc_produtos"
+    nome = StringField(required=True)
+    preco = FloatField()
+
+
+class TestStatementCache(unittest.TestCase):
+    """Testes para o cache LRU de statements preparados"""
+
+    def test_to_positional(self):
+        query, count = to_positional("SELECT * FROM t WHERE a = %s AND b LIKE 'x%%' AND c = %s")
+        self.assertEqual(query, "SELECT * FROM t WHERE a = $1 AND b LIKE 'x%%' AND c = $2")
+        self.assertEqual(count, 2)
+
+    def test_is_preparable(self):
+        self.assertTrue(is_preparable("SELECT * FROM t WHERE id = %s", (1,)))
+        self.assertFalse(is_preparable("SELECT * FROM t", None))
+        self.assertFalse(is_preparable("SELECT * FROM t WHERE id = %(id)s", {"id": 1}))
+        self.assertFalse(is_preparable("CREATE TABLE t (id INTEGER); SELECT %s", (1,)))
+
+    def test_lru_eviction_schedules_deallocate(self):
+        cache = StatementCache(max_size=2)
+        first = cache.add("q1")
+        cache.add("q2")
+        cache.get("q1")
+        cache.add("q3")
+
+        self.assertIsNone(cache.get("q2"))
+        self.assertEqual(cache.get("q1"), first)
+        self.assertEqual(cache.take_deallocations(), ["ps_2"])
+        self.assertEqual(cache.take_deallocations(), [])
+        self.assertEqual(cache.evictions, 1)
+
+
+class TestPreparedExecution(unittest.TestCase):
+    """Testes para a execução via PREPARE/EXECUTE"""
+
+    def setUp(self):
+        self.db = DatabaseConnection()
+        self.db.configure_statement_cache(max_size=100, enabled=True)
+        self.conn = MagicMock()
+        self.cursor = MagicMock()
+        self.cursor.description = None
+        self.conn.cursor.return_value.__enter__.return_value = self.cursor
+        patcher = patch.object(DatabaseConnection, 'get_connection', return_value=self.conn)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, self.db, '_pool', self.db._pool)
+        self.db._pool = None
+
+    def test_prepares_once_then_executes(self):
+        query = "DELETE FROM sc_produtos WHERE id = %s"
+        self.db.execute_query(query, (1,))
+        self.db.execute_query(query, (2,))
+
+        first, second = self.cursor.execute.call_args_list
+        self.assertEqual(
+            first[0][0],
+            "PREPARE ps_1 AS DELETE FROM sc_produtos WHERE id = $1; EXECUTE ps_1 (%s)"
+        )
+        self.assertEqual(second[0], ("EXECUTE ps_1 (%s)", (2,)))
+        stats = self.db.statement_cache_stats()
+        self.assertGreaterEqual(stats["hits"], 1)
+
+    def test_error_forgets_statement(self):
+        query = "UPDATE sc_produtos SET nome = %s WHERE id = %s"
+        self.cursor.execute.side_effect = [Exception("falha"), None, None]
+        self.cursor.fetchall.return_value = []
+        with self.assertRaises(Exception):
+            self.db.execute_query(query, ("a", 1))
+        self.db.execute_query(query, ("a", 1))
+
+        self.assertIn("pg_prepared_statements", self.cursor.execute.call_args_list[1][0][0])
+        self.assertTrue(self.cursor.execute.call_args_list[2][0][0].startswith("PREPARE"))
+
+    def test_error_deallocates_statements_left_on_server(self):
+        self.db._statement_caches[self.conn] = StatementCache(max_size=1)
+        self.db.execute_query("DELETE FROM sc_produtos WHERE id = %s", (1,))
+        self.db.execute_query("DELETE FROM sc_produtos WHERE nome = %s", ("a",))
+
+        # O comando combinado com DEALLOCATE ps_1 e PREPARE ps_3 falha em algum ponto
+        self.cursor.execute.side_effect = [Exception("violação de unicidade"), None, None]
+        with self.assertRaises(Exception):
+            self.db.execute_query("UPDATE sc_produtos SET nome = %s WHERE id = %s", ("a", 1))
+        self.assertTrue(self.cursor.execute.call_args[0][0].startswith("DEALLOCATE ps_1; PREPARE ps_3"))
+
+        self.cursor.fetchall.return_value = [("ps_3",)]
+        self.db.execute_query("DELETE FROM sc_produtos WHERE id = %s", (2,))
+        check, combined = [call[0] for call in self.cursor.execute.call_args_list[-2:]]
+        self.assertEqual(check[1], (["ps_1", "ps_3"],))
+        self.assertTrue(combined[0].startswith("DEALLOCATE ps_2; DEALLOCATE ps_3; PREPARE ps_4"))
+
+    def test_disabled_executes_plain_query(self):
+        self.db.configure_statement_cache(enabled=False)
+        self.db.execute_query("SELECT * FROM sc_produtos WHERE id = %s", (1,))
+        self.cursor.execute.assert_called_once_with("SELECT * FROM sc_produtos WHERE id = %s", (1,))
+
+    def test_prepare_false_executes_plain_query(self):
+        self.db.execute_query("SELECT * FROM sc_produtos WHERE id = %s", (1,), prepare=False)
+        self.cursor.execute.assert_called_once_with("SELECT * FROM sc_produtos WHERE id = %s", (1,))
+
+
+class TestCompiledStatements(unittest.TestCase):
+    """Testes para os statements canônicos compilados pelo ModelMeta"""
+
+    def test_model_statements(self):
+        self.assertEqual(SCProduto._statement_columns, ["nome", "preco"])
+        self.assertEqual(
+            SCProduto._statements["insert"],
+            "INSERT INTO sc_produtos (nome, preco) VALUES (%s, %s) RETURNING id"
+        )
+        self.assertEqual(SCProduto._statements["select_by_id"], "SELECT * FROM sc_produtos WHERE id = %s")
+
+    @patch('modules.database.db.DB.execute_query')
+    def test_save_uses_canonical_insert(self, mock_execute):
+        mock_execute.return_value = [{"id": 7}]
+        produto = SCProduto(nome="Caneta", preco=2.5)
+        produto.save()
+
+        self.assertIs(mock_execute.call_args[0][0], SCProduto._statements["insert"])
+        self.assertEqual(produto.id, 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from psycopg2 import extensions
+from modules.database import DB, atomic, BaseModel, StringField
+from modules.database.connection import DatabaseConnection, DatabaseError
+from modules.database.query_builder import QueryBuilder
+from modules.controller.response import Response
+
+
+class TxTag(BaseModel):
+    nome = StringField()
+
+    class Meta:
+        cache = True
+
+
+class TestTransaction(unittest.TestCase):
+    """Testes para DB.transaction, savepoints e o decorator atomic"""
+
+    def setUp(self):
+        DatabaseConnection._instance = None
+        patcher = patch("psycopg2.connect")
+        self.addCleanup(patcher.stop)
+        self.conn = MagicMock()
+        self.conn.closed = False
+        patcher.start().return_value = self.conn
+        self.cursor = self.conn.cursor.return_value.__enter__.return_value
+        self.cursor.description = None
+        self.cursor.rowcount = 1
+        DB._connection = None
+        DB.connect(statement_cache={"enabled": False})
+        self.addCleanup(setattr, DB, "_connection", None)
+
+    def executed(self):
+        return [call[0][0] for call in self.cursor.execute.call_args_list]
+
+    def test_writes_share_one_commit(self):
+        with DB.transaction():
+            self.assertTrue(DB.in_transaction())
+            DB.execute_query("UPDATE produto SET preco = %s WHERE id = %s", (1, 1))
+            DB.execute_query("INSERT INTO tag (nome) VALUES (%s)", ("a",))
+            self.conn.commit.assert_not_called()
+        self.conn.commit.assert_called_once()
+        self.assertFalse(DB.in_transaction())
+
+    def test_without_transaction_commits_each_write(self):
+        DB.execute_query("UPDATE produto SET preco = %s WHERE id = %s", (1, 1))
+        DB.execute_query("UPDATE produto SET preco = %s WHERE id = %s", (2, 2))
+        self.assertEqual(self.conn.commit.call_count, 2)
+
+    def test_exception_rolls_back(self):
+        with self.assertRaises(ValueError):
+            with DB.transaction():
+                DB.execute_query("DELETE FROM produto WHERE id = %s", (1,))
+                raise ValueError("falhou")
+        self.conn.rollback.assert_called_once()
+        self.conn.commit.assert_not_called()
+        self.assertFalse(DB.in_transaction())
+
+    def test_nested_blocks_use_savepoints(self):
+        with DB.transaction():
+            with DB.transaction():
+                DB.execute_query("DELETE FROM tag WHERE id = %s", (1,))
+            with self.assertRaises(ValueError):
+                with DB.transaction():
+                    raise ValueError("falhou")
+            DB.execute_query("DELETE FROM tag WHERE id = %s", (2,))
+
+        statements = [s for s in self.executed() if "SAVEPOINT" in s]
+        self.assertEqual(statements, [
+            "SAVEPOINT sp_1", "RELEASE SAVEPOINT sp_1",
+            "SAVEPOINT sp_2", "ROLLBACK TO SAVEPOINT sp_2",
+        ])
+        self.conn.rollback.assert_not_called()
+        self.conn.commit.assert_called_once()
+
+    def test_aborted_transaction_is_not_committed(self):
+        self.conn.get_transaction_status.return_value = extensions.TRANSACTION_STATUS_INERROR
+        with self.assertRaises(DatabaseError):
+            with DB.transaction():
+                pass
+        self.conn.rollback.assert_called_once()
+        self.conn.commit.assert_not_called()
+
+    def test_get_cursor_leaves_rollback_to_transaction(self):
+        with self.assertRaises(DatabaseError):
+            with DB.transaction():
+                with DB.get_connection().get_cursor():
+                    raise RuntimeError("falhou")
+        self.conn.rollback.assert_called_once()
+
+    def test_cache_invalidated_after_commit(self):
+        TxTag._model_cache.set("id", 1, {"id": 1, "nome": "antigo"})
+        tag = TxTag.from_db_row({"id": 1, "nome": "antigo"})
+        with DB.transaction():
+            tag.delete()
+            # Antes do commit a linha antiga continua valendo para os outros
+            self.assertIsNotNone(TxTag._model_cache.get("id", 1))
+        self.assertIsNone(TxTag._model_cache.get("id", 1))
+
+    def test_reads_own_write_inside_transaction(self):
+        TxTag._model_cache.set("id", 4, {"id": 4, "nome": "antigo"})
+        novo = [{"id": 4, "nome": "novo"}]
+        with DB.transaction():
+            with patch.object(DB, 'execute_read', return_value=novo):
+                self.assertEqual(TxTag.find_by_id(4).nome, "novo")
+            with patch.object(QueryBuilder, 'get_all', return_value=[TxTag.from_db_row(novo[0])]):
+                self.assertEqual(TxTag.find_by(id=4).first().nome, "novo")
+            with patch.object(DB, 'execute_read', return_value=[{"r0": novo}]):
+                with DB.batch() as batch:
+                    future = batch.find_by_id(TxTag, 4)
+                self.assertEqual(future.result().nome, "novo")
+        self.assertEqual(TxTag.find_by_id(4).nome, "antigo")
+
+    def test_rollback_discards_invalidation(self):
+        TxTag._model_cache.set("id", 2, {"id": 2, "nome": "antigo"})
+        tag = TxTag.from_db_row({"id": 2, "nome": "antigo"})
+        with self.assertRaises(ValueError):
+            with DB.transaction():
+                tag.delete()
+                raise ValueError("falhou")
+        self.assertIsNotNone(TxTag._model_cache.get("id", 2))
+
+    def test_failed_commit_still_invalidates(self):
+        TxTag._model_cache.set("id", 3, {"id": 3, "nome": "antigo"})
+        tag = TxTag.from_db_row({"id": 3, "nome": "antigo"})
+        self.conn.commit.side_effect = Exception("conexão perdida no commit")
+        with self.assertRaises(Exception):
+            with DB.transaction():
+                tag.delete()
+        self.assertIsNone(TxTag._model_cache.get("id", 3))
+
+    def test_atomic_handler(self):
+        @atomic
+        def handler(request):
+            DB.execute_query("INSERT INTO tag (nome) VALUES (%s)", ("a",))
+            return Response.json({"ok": True})
+
+        self.assertEqual(handler(None).status, "200 OK")
+        self.conn.commit.assert_called_once()
+        self.assertEqual(handler.__name__, "handler")
+
+    def test_atomic_rolls_back_server_errors(self):
+        @atomic
+        def handler(request):
+            DB.execute_query("INSERT INTO tag (nome) VALUES (%s)", ("a",))
+            return Response.json({"error": "falhou"}, "500 Internal Server Error")
+
+        response = handler(None)
+        self.assertEqual(response.status, "500 Internal Server Error")
+        self.conn.rollback.assert_called_once()
+        self.conn.commit.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()